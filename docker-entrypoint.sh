@@ -32,6 +32,9 @@ python manage.py runmodwsgi \
   --mount-point "$MOUNT_POINT" \
   --url-alias /media media
 
+# Create the tables for the database caches
+python manage.py createcachetable
+
 # Collect static files
 python manage.py collectstatic --clear --noinput --skip-checks --verbosity 0
 
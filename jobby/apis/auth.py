@@ -0,0 +1,90 @@
+import threading
+import time
+from typing import Callable
+
+from django.core.cache import DEFAULT_CACHE_ALIAS, caches
+
+
+class TokenManager:
+    """
+    Keep an access token in Django's cache framework, so that all processes
+    can share the same token.
+
+    The token is stored with a cache timeout that is a little shorter than the
+    lifetime reported by the token endpoint, so that it is refreshed shortly
+    before it actually expires. Refreshes are guarded by a lock, so that only
+    one refresh runs if many requests need a new token at the same time.
+    """
+
+    # Refresh the token this many seconds before it expires:
+    leeway = 30
+    # How long (in seconds) a process may hold the refresh lock:
+    lock_timeout = 10
+    # How long (in seconds) to wait between checking whether another process
+    # has finished refreshing the token:
+    poll_interval = 0.1
+
+    def __init__(self, cache_key: str, fetch_token: Callable[[], tuple[str, int]], cache_alias=DEFAULT_CACHE_ALIAS):
+        """
+        Create a token manager.
+
+        :param cache_key: the key under which the token is stored in the cache
+        :param fetch_token: a callable that requests a new token and returns a
+          2-tuple of the token and its lifetime in seconds
+        :param cache_alias: the alias of the cache to store the token in
+        """
+        self.cache_key = cache_key
+        self.lock_key = f"{cache_key}:lock"
+        self.fetch_token = fetch_token
+        self.cache_alias = cache_alias
+        self._lock = threading.Lock()
+
+    @property
+    def cache(self):
+        return caches[self.cache_alias]
+
+    def get_token(self) -> str:
+        """Return the cached token, or fetch a new one if there is none."""
+        token = self.cache.get(self.cache_key)
+        if token is None:
+            token = self.refresh()
+        return token
+
+    def refresh(self) -> str:
+        """Fetch a new token and store it in the cache."""
+        with self._lock:
+            # Another thread may have refreshed the token while this thread
+            # was waiting for the lock.
+            token = self.cache.get(self.cache_key)
+            if token is not None:
+                return token
+            if self.cache.add(self.lock_key, True, self.lock_timeout):
+                try:
+                    return self._fetch_and_store()
+                finally:
+                    self.cache.delete(self.lock_key)
+            # Another process is refreshing the token. Wait for it to finish,
+            # and only fetch a token ourselves if it takes too long.
+            return self._wait_for_token() or self._fetch_and_store()
+
+    def invalidate(self, token: str) -> None:
+        """
+        Remove the given token from the cache, if it is still the current
+        token.
+        """
+        if self.cache.get(self.cache_key) == token:
+            self.cache.delete(self.cache_key)
+
+    def _fetch_and_store(self) -> str:
+        token, expires_in = self.fetch_token()
+        self.cache.set(self.cache_key, token, max(expires_in - self.leeway, 1))
+        return token
+
+    def _wait_for_token(self) -> str | None:
+        deadline = time.monotonic() + self.lock_timeout
+        while time.monotonic() < deadline:
+            time.sleep(self.poll_interval)
+            token = self.cache.get(self.cache_key)
+            if token is not None:
+                return token
+        return None
@@ -5,11 +5,13 @@ from functools import cached_property
 from django.utils.timezone import make_aware
 from requests import Response
 
-from jobby.models import Stellenangebot
+from jobby.models import SearchHit, Stellenangebot
 
 
 class BaseAPI(ABC):
     name: str
+    # The SearchResponse subclass that wraps the responses of this API:
+    response_class: type["SearchResponse"]
 
     def __init__(self):
         if not self.name:
@@ -23,6 +25,15 @@ class BaseAPI(ABC):
     def get_details_url(self, refnr: str) -> str:
         """Return the URL to the details page of the given reference number."""
 
+    @abstractmethod
+    def get_description(self, refnr: str) -> str:
+        """
+        Return the description (as HTML) of the job with the given reference
+        number.
+
+        Raise a BadRequest exception if the description could not be fetched.
+        """
+
 
 class SearchResponse(ABC):
 
@@ -36,7 +47,7 @@ class SearchResponse(ABC):
         return self.response.status_code
 
     @cached_property
-    def results(self) -> list[Stellenangebot]:  # pragma: no cover
+    def results(self) -> list[Stellenangebot | SearchHit]:  # pragma: no cover
         return self._set_api_on_results(self._get_results(self.data))
 
     @property
@@ -51,7 +62,7 @@ class SearchResponse(ABC):
     def _get_total_result_count(self, data) -> int: ...
 
     @abstractmethod
-    def _get_results(self, data) -> list[Stellenangebot]: ...
+    def _get_results(self, data) -> list[Stellenangebot | SearchHit]: ...
 
     @staticmethod
     def _make_aware(datetime_string: str) -> datetime | str:
@@ -61,7 +72,7 @@ class SearchResponse(ABC):
         except ValueError:
             return ""
 
-    def _set_api_on_results(self, results: list[Stellenangebot]) -> list[Stellenangebot]:
+    def _set_api_on_results(self, results: list[Stellenangebot | SearchHit]) -> list[Stellenangebot | SearchHit]:
         """Set the value for Stellenangebot.api field on each result."""
         for result in results:
             if not result.api:
@@ -1,9 +1,100 @@
+import base64
+import json
+import re
+
 import requests
+from bs4 import BeautifulSoup, SoupStrainer
 from django.conf import settings
+from django.core.exceptions import BadRequest
+from django.utils.html import escape, linebreaks
 
+from jobby.apis.auth import TokenManager
 from jobby.apis.base import BaseAPI, SearchResponse
 from jobby.apis.decorator import register
-from jobby.models import Stellenangebot, _update_stellenangebot
+from jobby.descriptions import fetch_description
+from jobby.http_client import get_session
+from jobby.models import SearchHit, Stellenangebot, _merge_stellenangebot, make_fingerprint
+
+# The id of the element on the job details page that contains the description:
+DETAILS_BESCHREIBUNG_ID = "detail-beschreibung-beschreibung"
+# The id of the link on the job details page that links to the external page
+# that contains the job description:
+EXTERNAL_BESCHREIBUNG_LINK = "detail-beschreibung-externe-url-btn"
+# The elements that have no end tag:
+VOID_ELEMENTS = {"area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta", "source", "track", "wbr"}
+
+
+def _find_element_end(html, start):
+    """
+    Return the position in the given HTML document after the end tag of the
+    element whose start tag begins at position ``start``.
+
+    Return the length of the document if the end tag cannot be found.
+    """
+    tag = re.match(r"<([\w-]+)", html[start:])
+    if not tag:
+        return len(html)
+    tag = tag.group(1).lower()
+    depth = 0
+    # Count the start tags and the end tags of elements with the same name, so
+    # that the end tag of a nested element does not end the element.
+    for match in re.compile(rf"<(/?){re.escape(tag)}(?=[\s/>])[^>]*>", re.IGNORECASE).finditer(html, start):
+        if match.group(1):
+            depth -= 1
+        elif tag not in VOID_ELEMENTS and not match.group(0).endswith("/>"):
+            depth += 1
+        if depth <= 0:
+            return match.end()
+    return len(html)
+
+
+def _find_element(html, element_id):
+    """
+    Return the element with the given id from the given HTML document, or
+    None if there is no such element.
+
+    Only the part of the document that contains the element is parsed, and
+    only the element itself is added to the parse tree.
+    """
+    match = re.search(rf"""(?<![\w-])id\s*=\s*["']?{re.escape(element_id)}["'\s>/]""", html)
+    if not match:
+        return None
+    start = html.rfind("<", 0, match.start())
+    end = _find_element_end(html, start)
+    soup = BeautifulSoup(html[start:end], "html.parser", parse_only=SoupStrainer(id=element_id))
+    return soup.find(id=element_id)
+
+
+def _parse_details_page(html):
+    """Return the 'beschreibung' part of the given job details page."""
+    if beschreibung := _find_element(html, DETAILS_BESCHREIBUNG_ID):
+        return "".join(str(elem) for elem in beschreibung.children)
+    elif extern_link := _find_element(html, EXTERNAL_BESCHREIBUNG_LINK):
+        return f"""Beschreibung auf externer Seite: <a href="{extern_link["href"]}">{extern_link.string}</a>"""
+    else:
+        return "Keine Beschreibung gegeben!"
+
+
+def _parse_jobdetails(text):
+    """
+    Return the 'beschreibung' from the given job details JSON data.
+
+    Raise a BadRequest exception if the data is not a JSON object.
+    """
+    try:
+        data = json.loads(text)
+    except ValueError as e:
+        raise BadRequest from e
+    if not isinstance(data, dict):
+        raise BadRequest
+    if beschreibung := data.get("stellenbeschreibung"):
+        # The description is plain text:
+        return linebreaks(beschreibung, autoescape=True)
+    elif extern_url := data.get("externeUrl") or data.get("allianzpartnerUrl"):
+        extern_url = escape(extern_url)
+        return f"""Beschreibung auf externer Seite: <a href="{extern_url}">{extern_url}</a>"""
+    else:
+        return "Keine Beschreibung gegeben!"
 
 
 class BundesagenturResponse(SearchResponse):
@@ -12,7 +103,7 @@ class BundesagenturResponse(SearchResponse):
     def has_results(self) -> bool:
         return self._get_total_result_count(self.data) > 0 and "stellenangebote" in self.data
 
-    def _get_results(self, data: dict) -> list[Stellenangebot]:
+    def _get_results(self, data: dict) -> list[Stellenangebot | SearchHit]:
         if not self.has_results:
             return []
 
@@ -21,39 +112,48 @@ class BundesagenturResponse(SearchResponse):
         angebote = self._process_results(data["stellenangebote"])
         refs = set(s.refnr for s in angebote)
 
-        # Create the list of Stellenangebot instances.
+        # Create the list of results.
         # Use saved Stellenangebot instances whenever possible. Update
-        # saved instances if the data has changed.
+        # saved instances if the data has changed. Unsaved results remain
+        # search hits.
         results = []
-        existing = self._get_existing(refs)
-        existing_refs = set(existing.values_list("refnr", flat=True))
+        existing = {s.refnr: s for s in self._get_existing(refs)}
+        changed, changed_fields = [], set()
         for angebot in angebote:
-            if angebot.refnr in existing_refs:
-                stellenangebot = existing.get(refnr=angebot.refnr)
-                _update_stellenangebot(stellenangebot, angebot)
+            if stellenangebot := existing.get(angebot.refnr):
+                if fields := _merge_stellenangebot(stellenangebot, angebot):
+                    changed.append(stellenangebot)
+                    changed_fields.update(fields)
             else:
                 stellenangebot = angebot
             results.append(stellenangebot)
+        if changed:
+            # Save all changes with a single query:
+            Stellenangebot.objects.bulk_update(changed, sorted(changed_fields))
         return results
 
-    def _process_results(self, results: list[dict]) -> list[Stellenangebot]:
+    def _process_results(self, results: list[dict]) -> list[SearchHit]:
         """
         Walk through the dictionaries of search results and return them as
-        Stellenangebot instances.
+        SearchHit instances.
         """
         processed = []
         # TODO: use SearchResultForm here?
         for result in results:
-            instance = Stellenangebot(
-                titel=result.get("titel", ""),
+            data = {
+                "titel": result.get("titel", ""),
+                "beruf": result.get("beruf", ""),
+                "arbeitgeber": result.get("arbeitgeber", ""),
+                "arbeitsort": self._parse_arbeitsort(result.get("arbeitsort", {})),
+                "eintrittsdatum": result.get("eintrittsdatum", ""),
+                "veroeffentlicht": result.get("aktuelleVeroeffentlichungsdatum", ""),
+                "modified": result.get("modifikationsTimestamp", ""),
+                "externe_url": result.get("externeUrl", ""),
+            }
+            instance = SearchHit(
                 refnr=result.get("refnr", ""),
-                beruf=result.get("beruf", ""),
-                arbeitgeber=result.get("arbeitgeber", ""),
-                arbeitsort=self._parse_arbeitsort(result.get("arbeitsort", {})),
-                eintrittsdatum=result.get("eintrittsdatum", ""),
-                veroeffentlicht=result.get("aktuelleVeroeffentlichungsdatum", ""),
-                modified=self._make_aware(result.get("modifikationsTimestamp", "")),
-                externe_url=result.get("externeUrl", ""),
+                fingerprint=make_fingerprint(data),
+                **{**data, "modified": self._make_aware(data["modified"])},
             )
             processed.append(instance)
         return processed
@@ -83,9 +183,14 @@ class BundesagenturResponse(SearchResponse):
 class BundesagenturAPI(BaseAPI):
 
     name = "bundesagentur"
+    response_class = BundesagenturResponse
+
+    def __init__(self):
+        super().__init__()
+        self.token_manager = TokenManager(f"jobby:{self.name}:token", self._fetch_jwt)
 
-    def _get_jwt(self):  # pragma: no cover
-        """Fetch the jwt token object."""
+    def _fetch_jwt(self):  # pragma: no cover
+        """Fetch a new jwt token and return it together with its lifetime."""
         headers = {
             "User-Agent": "Jobsuche/2.9.2 (de.arbeitsagentur.jobboerse; build:1077; iOS 15.1.0) Alamofire/5.4.4",
             "Host": "rest.arbeitsagentur.de",
@@ -107,10 +212,15 @@ class BundesagenturAPI(BaseAPI):
         if settings.DEBUG:
             # Do not verify certificates during development:
             kwargs["verify"] = False
-        response = requests.post(**kwargs)
-        return response.json()["access_token"]
+        response = get_session().post(**kwargs)
+        token_data = response.json()
+        return token_data["access_token"], int(token_data.get("expires_in", 0))
 
-    def _search(self, **params):  # pragma: no cover
+    def _get_jwt(self):
+        """Return the jwt token, fetching a new one only if necessary."""
+        return self.token_manager.get_token()
+
+    def _search(self, **params):
         """
         Search for jobs.
 
@@ -119,27 +229,83 @@ class BundesagenturAPI(BaseAPI):
         # TODO: The API supports an undocumented "pav" parameter that affects
         #  results. What is that? "Private Arbeitsvermittler"?
         # params.setdefault("pav", "false")
+        token = self._get_jwt()
+        response = self._request_jobs(token, params)
+        if response.status_code == requests.codes.unauthorized:
+            # The token was rejected; it may have been revoked before it
+            # expired. Try again, once, with a fresh token.
+            self.token_manager.invalidate(token)
+            response = self._request_jobs(self._get_jwt(), params)
+        return response
 
-        headers = {
+    @staticmethod
+    def _get_headers(token):
+        return {
             "User-Agent": "Jobsuche/2.9.2 (de.arbeitsagentur.jobboerse; build:1077; iOS 15.1.0) Alamofire/5.4.4",
             "Host": "rest.arbeitsagentur.de",
-            "OAuthAccessToken": self._get_jwt(),
+            "OAuthAccessToken": token,
             "Connection": "keep-alive",
         }
 
+    def _request_jobs(self, token, params):
         kwargs = {
             "url": "https://rest.arbeitsagentur.de/jobboerse/jobsuche-service/pc/v4/app/jobs",
-            "headers": headers,
+            "headers": self._get_headers(token),
             "params": params,
         }
         if settings.DEBUG:
             # Do not verify certificates during development:
             kwargs["verify"] = False
-        return requests.get(**kwargs)
+        return get_session().get(**kwargs)
 
     def search(self, **params) -> SearchResponse:
         response = self._search(**params)
-        return BundesagenturResponse(response, self)
+        return self.response_class(response, self)
 
     def get_details_url(self, refnr: str) -> str:
         return f"https://www.arbeitsagentur.de/jobsuche/jobdetail/{refnr}"
+
+    @staticmethod
+    def get_jobdetails_url(refnr: str) -> str:
+        """Return the URL of the job details endpoint for the given refnr."""
+        encoded = base64.b64encode(refnr.encode("utf-8")).decode("ascii")
+        return f"https://rest.arbeitsagentur.de/jobboerse/jobsuche-service/pc/v2/jobdetails/{encoded}"
+
+    def get_description(self, refnr: str) -> str:
+        """
+        Return the description from the job details endpoint of the API.
+
+        If the endpoint does not respond with the job details, fall back to
+        the description on the job details page.
+        """
+        try:
+            return fetch_description(refnr, self.get_jobdetails_url(refnr), _parse_jobdetails, self._request_jobdetails)
+        except BadRequest:
+            return fetch_description(refnr, self.get_details_url(refnr), _parse_details_page)
+
+    def _request_jobdetails(self, url, headers):
+        """
+        Request the job details at the given URL with the given (conditional)
+        headers and the cached token.
+
+        Raise a BadRequest exception if no token could be fetched.
+        """
+        kwargs = {}
+        if settings.DEBUG:
+            # Do not verify certificates during development:
+            kwargs["verify"] = False
+        token = self._get_jwt_or_bad_request()
+        response = get_session().get(url, headers={**self._get_headers(token), **headers}, **kwargs)
+        if response.status_code == requests.codes.unauthorized:
+            # The token was rejected; try again, once, with a fresh token.
+            self.token_manager.invalidate(token)
+            token = self._get_jwt_or_bad_request()
+            response = get_session().get(url, headers={**self._get_headers(token), **headers}, **kwargs)
+        return response
+
+    def _get_jwt_or_bad_request(self):
+        try:
+            return self._get_jwt()
+        except (requests.RequestException, KeyError, ValueError) as e:
+            # The token endpoint failed or responded without a token.
+            raise BadRequest from e
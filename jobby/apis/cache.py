@@ -0,0 +1,129 @@
+"""
+Cache for the responses of the job search APIs.
+
+The responses are stored in the cache with the alias ``search`` (or in the
+default cache, if there is no such cache), so that all server processes share
+them. The lifetime and the maximum number of cached responses are set with the
+``TIMEOUT`` and ``MAX_ENTRIES`` options of that cache, for example:
+
+    CACHES = {
+        "search": {
+            "BACKEND": "django.core.cache.backends.db.DatabaseCache",
+            "LOCATION": "jobby_search_cache",
+            "TIMEOUT": 600,
+            "OPTIONS": {"MAX_ENTRIES": 1000},
+        },
+    }
+
+The data of the search hits of a rendered results page is stored under a page
+token in the cache with the alias ``hits`` (or in the default cache), so that a
+hit can be added to the watchlist with just its refnr and the page token. Its
+``TIMEOUT`` sets how long a results page can be worked with, and is usually much
+longer than that of the search responses.
+"""
+
+import hashlib
+import json
+
+import requests
+from django.conf import settings
+from django.core.cache import DEFAULT_CACHE_ALIAS, caches
+
+from jobby.apis.base import BaseAPI, SearchResponse
+from jobby.models import SearchHit, Stellenangebot, _as_dict
+
+SEARCH_CACHE_ALIAS = "search"
+HITS_CACHE_ALIAS = "hits"
+
+
+class CachedResponse:
+    """Stand-in for the ``requests.Response`` of a cached search response."""
+
+    def __init__(self, status_code: int, data: dict):
+        self.status_code = status_code
+        self._data = data
+
+    def json(self) -> dict:
+        return self._data
+
+
+def get_search_cache():
+    """Return the cache that stores the search responses."""
+    if SEARCH_CACHE_ALIAS in settings.CACHES:
+        return caches[SEARCH_CACHE_ALIAS]
+    return caches[DEFAULT_CACHE_ALIAS]
+
+
+def get_hits_cache():
+    """Return the cache that stores the data of the hits of the results pages."""
+    if HITS_CACHE_ALIAS in settings.CACHES:
+        return caches[HITS_CACHE_ALIAS]
+    return caches[DEFAULT_CACHE_ALIAS]
+
+
+def make_cache_key(api_name: str, params: dict) -> str:
+    """
+    Return the cache key for a search of the given API with the given
+    parameters.
+
+    The parameters are normalized: the order of the parameters does not matter
+    and parameters with None values are ignored.
+    """
+    normalized = sorted((k, v) for k, v in params.items() if v is not None)
+    # Hash the API name as well: it may contain characters that are not
+    # allowed in cache keys.
+    digest = hashlib.sha1(json.dumps([api_name, normalized], default=str).encode("utf-8")).hexdigest()
+    return f"jobby:search:{digest}"
+
+
+def get_cached_response(api: BaseAPI, params: dict) -> SearchResponse | None:
+    """
+    Return the cached response of the given API for the given search
+    parameters, or None if there is no cached response.
+    """
+    cached = get_search_cache().get(make_cache_key(api.name, params))
+    if cached is None:
+        return None
+    status_code, data = cached
+    return api.response_class(CachedResponse(status_code, data), api)
+
+
+def cache_response(api: BaseAPI, params: dict, search_response: SearchResponse) -> None:
+    """Store the given response of a successful search in the cache."""
+    if search_response.status_code != requests.codes.ok:
+        return
+    get_search_cache().set(make_cache_key(api.name, params), (search_response.status_code, search_response.data))
+
+
+def cache_hits(hits: list[Stellenangebot | SearchHit]) -> str:
+    """
+    Store the data of the given search results by refnr in the cache and
+    return the page token under which they are stored.
+
+    Saved results are stored as well, since they may be deleted when they are
+    removed from the watchlist, and then need to be created again. Only the
+    data of the search hit is stored for them, not the data of the user.
+    """
+    data = {}
+    for hit in hits:
+        if isinstance(hit, Stellenangebot):
+            hit = SearchHit(**{name: getattr(hit, name) for name in SearchHit.__slots__})
+        data[hit.refnr] = _as_dict(hit)
+    # Derive the token from the data, so that a results page that is rendered
+    # again reuses the stored data.
+    token = hashlib.sha1(json.dumps(data, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+    get_hits_cache().set(f"jobby:hits:{token}", data)
+    return token
+
+
+def get_cached_hit(page_token: str, refnr: str) -> dict | None:
+    """
+    Return the data of the search hit with the given refnr from the results
+    page with the given token, or None if there is no such hit.
+    """
+    if not page_token:
+        return None
+    data = get_hits_cache().get(f"jobby:hits:{page_token}")
+    if data is None:
+        return None
+    return data.get(refnr)
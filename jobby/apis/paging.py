@@ -0,0 +1,102 @@
+"""
+Map the pages of the search results page onto the pages of the APIs.
+
+The search results page shows a fixed number of results per page, while the
+APIs are asked for pages of ``size`` results. One page of the results page may
+therefore cover several pages of an API. The registry fetches those pages
+concurrently, and PagedSearchResponse merges their results in order, without
+duplicates.
+"""
+
+from functools import cached_property
+
+import requests
+
+from jobby.apis.base import SearchResponse
+from jobby.models import SearchHit, Stellenangebot
+
+
+def get_api_pages(page: int, page_size: int, api_page_size: int) -> tuple[range, int]:
+    """
+    Return the numbers of the API pages that cover the given page of the
+    results page, and the offset of the page's first result within the first
+    of those API pages.
+
+    :param page: the number of the page of the results page, starting at 1
+    :param page_size: the number of results per page of the results page
+    :param api_page_size: the number of results per page of the API
+    """
+    start = (page - 1) * page_size
+    first, offset = divmod(start, api_page_size)
+    last = (start + page_size - 1) // api_page_size
+    return range(first + 1, last + 2), offset
+
+
+def get_api_params(params: dict, page_size: int) -> tuple[list[dict], int]:
+    """
+    Return the search parameters for each API page that covers the page of
+    the results page given by the ``page`` parameter, and the offset of the
+    page's first result within the first API page.
+
+    :param params: the search parameters; ``page`` is the number of the page
+      of the results page and ``size`` the number of results per API page
+      (defaults to page_size)
+    :param page_size: the number of results per page of the results page
+    """
+    api_page_size = params.get("size") or page_size
+    pages, offset = get_api_pages(params.get("page") or 1, page_size, api_page_size)
+    return [{**params, "page": page, "size": api_page_size} for page in pages], offset
+
+
+class PagedSearchResponse:
+
+    def __init__(self, search_responses: list[SearchResponse], offset: int, page_size: int):
+        """
+        Combine the search responses of one API for the API pages that cover
+        a page of the results page.
+
+        :param search_responses: the responses for the API pages, in order
+        :param offset: the offset of the page's first result within the
+          results of the first response
+        :param page_size: the number of results per page of the results page
+        """
+        self.search_responses = search_responses
+        self.offset = offset
+        self.page_size = page_size
+
+    @property
+    def api(self):
+        return self.search_responses[0].api
+
+    @property
+    def status_code(self) -> int:
+        return self.search_responses[0].status_code
+
+    @property
+    def result_count(self) -> int:
+        return self.search_responses[0].result_count
+
+    @property
+    def has_results(self) -> bool:
+        return self.search_responses[0].has_results
+
+    @cached_property
+    def results(self) -> list[Stellenangebot | SearchHit]:
+        merged = []
+        for search_response in self.search_responses:
+            if search_response.status_code != requests.codes.ok:
+                # The results of any later pages would end up at the wrong
+                # positions.
+                break
+            merged.extend(search_response.results)
+        # The results can shift between the requests for the pages, so that
+        # the same result shows up at the end of one page and at the start of
+        # the next page.
+        results, seen = [], set()
+        for result in merged[self.offset : self.offset + self.page_size]:
+            if result.refnr:
+                if result.refnr in seen:
+                    continue
+                seen.add(result.refnr)
+            results.append(result)
+        return results
@@ -1,15 +1,46 @@
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
 from functools import cached_property
 
 import requests
+from django.conf import settings
+from django.core.exceptions import BadRequest
+from django.db import close_old_connections
 
+from jobby import background
 from jobby.apis.base import BaseAPI, SearchResponse
-from jobby.models import Stellenangebot
+from jobby.apis.cache import cache_response, get_cached_response
+from jobby.apis.paging import PagedSearchResponse, get_api_params
+from jobby.models import SearchHit, Stellenangebot
+
+logger = logging.getLogger(__name__)
+
+# The default time (in seconds) each API has to respond to a search:
+SEARCH_TIMEOUT = 15
+
+
+def get_search_timeout() -> float:
+    """Return the time (in seconds) each API has to respond to a search."""
+    return getattr(settings, "JOBBY_SEARCH_TIMEOUT", SEARCH_TIMEOUT)
 
 
 class RegistryResponse:
 
-    def __init__(self, *search_responses: SearchResponse):
+    def __init__(self, *search_responses: SearchResponse | PagedSearchResponse, timed_out=(), failed=()):
+        """
+        Aggregate the search responses of the registered APIs.
+
+        :param search_responses: the responses of the APIs that responded in
+          time
+        :param timed_out: the names of the APIs that did not respond in time
+        :param failed: the names of the APIs that raised an exception
+        """
         self.search_responses = search_responses
+        self.timed_out = list(timed_out)
+        self.failed = list(failed)
 
     @property
     def has_results(self) -> bool:  # pragma: no cover
@@ -20,7 +51,7 @@ class RegistryResponse:
         return sum(r.result_count for r in self.search_responses)
 
     @cached_property
-    def results(self) -> list[Stellenangebot]:
+    def results(self) -> list[Stellenangebot | SearchHit]:
         results = []
         for search_response in self.search_responses:
             if search_response.status_code != requests.codes.ok:
@@ -30,9 +61,23 @@ class RegistryResponse:
 
 
 class APIRegistry:
+    # The maximum number of searches that run at the same time:
+    max_workers = 10
+    # The maximum number of prefetches that run at the same time:
+    max_prefetches = 2
 
     def __init__(self):
         self._apis: list[BaseAPI] = []
+        self._executor = None
+        self._prefetch_semaphore = threading.BoundedSemaphore(self.max_prefetches)
+
+    @property
+    def executor(self) -> ThreadPoolExecutor:
+        # Create the executor lazily, so that each (forked) process gets its
+        # own worker threads.
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="jobby-search")
+        return self._executor
 
     def register(self, api: "BaseAPI"):
         """Register an API with this registry."""
@@ -44,19 +89,86 @@ class APIRegistry:
         if api in self._apis:
             self._apis.remove(api)
 
-    def search(self, **params) -> RegistryResponse:
+    def search(self, page_size=None, **params) -> RegistryResponse:
         """
-        Call the search method of each registered API and return the aggregate
-        results.
+        Call the search method of each registered API concurrently and return
+        the aggregate results.
+
+        Responses of previous searches with the same parameters are served
+        from the search cache. Each API has until the search timeout to
+        respond. APIs that do not respond in time, or that raise an exception,
+        are reported in the ``timed_out`` and ``failed`` lists of the registry
+        response.
+
+        If page_size is given, the ``page`` parameter is the number of a page
+        of page_size results. That page is mapped onto the pages (of ``size``
+        results) of the APIs, which are all requested concurrently (see
+        jobby.apis.paging).
         """
-        search_responses = []
-        for api in self._apis:
+        params = {k: v for k, v in params.items() if v is not None}
+        if page_size:
+            page_params, offset = get_api_params(params, page_size)
+        else:
+            page_params, offset = [params], 0
+        futures = [
+            (api, [self.executor.submit(self._search_api, api, api_params) for api_params in page_params])
+            for api in self._apis
+        ]
+
+        deadline = time.monotonic() + get_search_timeout()
+        search_responses, timed_out, failed = [], [], []
+        for api, api_futures in futures:
             try:
-                api_response = api.search(**{k: v for k, v in params.items() if v is not None})
+                responses = [future.result(timeout=max(deadline - time.monotonic(), 0)) for future in api_futures]
+            except FutureTimeoutError:
+                logger.warning("Search of API %s timed out.", api.name)
+                timed_out.append(api.name)
             except Exception:  # noqa
-                continue
-            search_responses.append(api_response)
-        return RegistryResponse(*search_responses)
+                logger.exception("Search of API %s failed.", api.name)
+                failed.append(api.name)
+            else:
+                if page_size:
+                    search_responses.append(PagedSearchResponse(responses, offset, page_size))
+                else:
+                    search_responses.append(responses[0])
+        return RegistryResponse(*search_responses, timed_out=timed_out, failed=failed)
+
+    def prefetch(self, **params) -> bool:
+        """
+        Run a search with the given parameters in the background, so that the
+        responses are already in the search cache when they are requested.
+
+        Return False if the search was not started because the maximum number
+        of prefetches are already running.
+        """
+        if not self._prefetch_semaphore.acquire(blocking=False):
+            return False
+        try:
+            future = background.submit(self.search, **params)
+        except Exception:
+            self._prefetch_semaphore.release()
+            raise
+        future.add_done_callback(lambda f: self._prefetch_semaphore.release())
+        return True
+
+    @staticmethod
+    def _search_api(api: BaseAPI, params: dict) -> SearchResponse:
+        """
+        Return the cached response of the given API, or call the search
+        method of the API in a worker thread.
+        """
+        # Worker threads have their own database connections (an API may use
+        # the database cache, for example); treat each search like a request
+        # and close connections that should not be kept around.
+        close_old_connections()
+        try:
+            search_response = get_cached_response(api, params)
+            if search_response is None:
+                search_response = api.search(**params)
+                cache_response(api, params, search_response)
+            return search_response
+        finally:
+            close_old_connections()
 
     def get_details_url(self, api_name, refnr):
         """Return the URL to the details page for the given API and refnr."""
@@ -66,5 +178,21 @@ class APIRegistry:
         else:  # pragma: no cover
             return ""
 
+    def get_description(self, api_name, refnr):
+        """
+        Return the job description for the given API and refnr.
+
+        If there is no API with the given name (for example, for Stellenangebote
+        that were saved without an API), ask each registered API in turn. Raise
+        a BadRequest exception if no API could provide the description.
+        """
+        apis = [api for api in self._apis if api.name == api_name] or self._apis
+        for api in apis:
+            try:
+                return api.get_description(refnr)
+            except BadRequest:
+                logger.info("API %s could not provide the description for %s.", api.name, refnr)
+        raise BadRequest
+
 
 registry = APIRegistry()
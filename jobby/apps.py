@@ -7,3 +7,4 @@ class AppConfig(AppConfig):
 
     def ready(self):
         import jobby.apis.bundesagentur_api  # noqa  # register the api
+        import jobby.signals  # noqa  # connect the signal receivers
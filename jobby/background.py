@@ -0,0 +1,48 @@
+"""
+Run jobs in background threads of the server process.
+
+Use this for work that the response to a request does not need to wait for.
+The jobs share a small pool of worker threads per process.
+"""
+
+import logging
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from django.db import close_old_connections
+
+logger = logging.getLogger(__name__)
+
+# The maximum number of jobs that run at the same time:
+MAX_WORKERS = 4
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor() -> ThreadPoolExecutor:
+    """Return the executor of this process, creating it if necessary."""
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix="jobby-background")
+    return _executor
+
+
+def _run(fn, *args, **kwargs):
+    # Like the worker threads of the search, each job gets treated like a
+    # request: close database connections that should not be kept around.
+    close_old_connections()
+    try:
+        return fn(*args, **kwargs)
+    except Exception:
+        logger.exception("Background job %r failed.", fn)
+        raise
+    finally:
+        close_old_connections()
+
+
+def submit(fn, *args, **kwargs) -> Future:
+    """Run ``fn(*args, **kwargs)`` in a background thread."""
+    return get_executor().submit(_run, fn, *args, **kwargs)
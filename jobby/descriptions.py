@@ -0,0 +1,170 @@
+"""
+Store for the job descriptions fetched from the APIs.
+
+Fetched descriptions are stored by refnr and source URL in the cache with the alias
+``descriptions`` (or in the default cache, if there is no such cache), so that
+repeated views of the same job do not need to fetch the description again.
+
+A stored description is used without any request for ``JOBBY_DESCRIPTION_TTL``
+seconds. After that, the source is requested again with the validators
+(ETag, Last-Modified) of the previous response; if it has not changed,
+the stored description is used again. How long the descriptions are kept
+overall is set with the ``TIMEOUT`` option of the cache.
+
+Stellenangebote that are saved without a description (for example, when they
+are added to the watchlist from the search results) get their description
+filled in by a background job (see ``schedule_fill``).
+"""
+
+import hashlib
+import json
+import logging
+import time
+from typing import Callable
+
+import requests
+from bs4 import UnicodeDammit
+from django.conf import settings
+from django.core.cache import DEFAULT_CACHE_ALIAS, caches
+from django.core.exceptions import BadRequest
+from django.db import transaction
+
+from jobby import background
+from jobby.apis.registry import registry
+from jobby.http_client import get_session
+from jobby.models import Stellenangebot, html_to_text
+
+logger = logging.getLogger(__name__)
+
+DESCRIPTION_CACHE_ALIAS = "descriptions"
+
+# The default time (in seconds) a stored description is used without
+# revalidating it:
+DESCRIPTION_TTL = 24 * 60 * 60
+
+
+def get_description_cache():
+    """Return the cache that stores the descriptions."""
+    if DESCRIPTION_CACHE_ALIAS in settings.CACHES:
+        return caches[DESCRIPTION_CACHE_ALIAS]
+    return caches[DEFAULT_CACHE_ALIAS]
+
+
+def get_description_ttl() -> int:
+    """Return the time (in seconds) a stored description is used as is."""
+    return getattr(settings, "JOBBY_DESCRIPTION_TTL", DESCRIPTION_TTL)
+
+
+def make_cache_key(refnr: str, url: str) -> str:
+    """
+    Return the cache key for the description of the given refnr that was
+    fetched from the given URL.
+
+    Descriptions from different sources are stored separately, so that a
+    description is only revalidated with the validators of its own source.
+    """
+    # Hash the refnr and the URL: they may contain characters that are not
+    # allowed in cache keys.
+    digest = hashlib.sha1(json.dumps([refnr, url]).encode("utf-8")).hexdigest()
+    return f"jobby:description:{digest}"
+
+
+def get_text(response: requests.Response) -> str:
+    """
+    Return the content of the given response decoded to text.
+
+    Use the encoding of the Content-Type header. If the header does not declare
+    an encoding, use the encoding that the document declares itself (for
+    example, with a meta tag) or UTF-8, instead of the ISO-8859-1 that requests
+    assumes for text responses.
+    """
+    if "charset=" in response.headers.get("Content-Type", "").lower():
+        return response.text
+    is_html = "html" in response.headers.get("Content-Type", "").lower()
+    return UnicodeDammit(response.content, user_encodings=["utf-8"], is_html=is_html).unicode_markup
+
+
+def fetch_description(
+    refnr: str,
+    url: str,
+    parse: Callable[[str], str],
+    get: Callable[..., requests.Response] | None = None,
+) -> str:
+    """
+    Return the description of the job with the given refnr.
+
+    Use the stored description, if it is still fresh or if the source has not
+    changed since it was stored. Otherwise, fetch the source at the given URL
+    and extract the description with the ``parse`` callable.
+
+    Raise a BadRequest exception if the source could not be fetched.
+
+    :param refnr: the reference number of the job
+    :param url: the URL of the source of the description
+    :param parse: a callable that returns the description from the text of
+      the response (see get_text)
+    :param get: a callable that requests the URL, called with the URL and the
+      keyword argument ``headers``; defaults to the ``get`` method of the
+      shared session
+    """
+    cache = get_description_cache()
+    key = make_cache_key(refnr, url)
+    entry = cache.get(key)
+    if entry and time.time() - entry["checked"] < get_description_ttl():
+        return entry["beschreibung"]
+
+    headers = {}
+    if entry and entry["etag"]:
+        headers["If-None-Match"] = entry["etag"]
+    if entry and entry["last_modified"]:
+        headers["If-Modified-Since"] = entry["last_modified"]
+    try:
+        response = (get or get_session().get)(url, headers=headers)
+    except requests.RequestException as e:
+        raise BadRequest from e
+
+    if entry and response.status_code == requests.codes.not_modified:
+        entry["checked"] = time.time()
+    elif response.status_code == requests.codes.ok:
+        entry = {
+            "beschreibung": parse(get_text(response)),
+            "etag": response.headers.get("ETag", ""),
+            "last_modified": response.headers.get("Last-Modified", ""),
+            "checked": time.time(),
+        }
+    else:
+        raise BadRequest
+    cache.set(key, entry)
+    return entry["beschreibung"]
+
+
+def fill_description(pk: int) -> bool:
+    """
+    Fetch the description for the Stellenangebot with the given primary key
+    and save it, if the Stellenangebot still has no description.
+
+    Return whether a description was saved.
+    """
+    obj = Stellenangebot.objects.filter(pk=pk, beschreibung="").only("refnr", "api").first()
+    if obj is None:
+        return False
+    try:
+        beschreibung = registry.get_description(obj.api, obj.refnr)
+    except BadRequest:
+        logger.info("Could not fetch the description for %s.", obj.refnr)
+        return False
+    # Do not overwrite a description that was added in the meantime:
+    updated = Stellenangebot.objects.filter(pk=pk, beschreibung="").update(
+        beschreibung=beschreibung,
+        beschreibung_text=html_to_text(beschreibung),
+    )
+    return bool(updated)
+
+
+def schedule_fill(obj: Stellenangebot) -> None:
+    """
+    Fill in the description of the given Stellenangebot in the background,
+    once the current transaction has been committed.
+    """
+    pk = obj.pk
+    transaction.on_commit(lambda: background.submit(fill_description, pk))
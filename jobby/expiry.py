@@ -0,0 +1,139 @@
+"""
+Check whether the Stellenangebot objects on the watchlists have expired.
+
+A Stellenangebot has expired if its details page can no longer be found. The
+checks run in the background, in batches, with a limited number of requests
+at the same time; the views only read the stored ``expired`` flag.
+
+The checks are started at most once per check interval, which can be set (in
+seconds) with the ``JOBBY_EXPIRY_CHECK_INTERVAL`` setting. Set it to None to
+disable the automatic checks, for example when running the ``check_expired``
+management command periodically instead.
+"""
+
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+import requests
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Exists, F, OuterRef, Q
+from django.utils import timezone
+
+from jobby import background
+from jobby.apis.registry import registry
+from jobby.http_client import get_session
+from jobby.models import Stellenangebot, WatchlistItem
+
+logger = logging.getLogger(__name__)
+
+# The default time (in seconds) between two checks of a Stellenangebot:
+CHECK_INTERVAL = 6 * 60 * 60
+# The number of Stellenangebot objects that are checked per batch:
+BATCH_SIZE = 50
+# The maximum number of requests that are made at the same time:
+MAX_WORKERS = 5
+
+SCHEDULE_CACHE_KEY = "jobby:expiry_check"
+
+
+def get_check_interval() -> int | None:
+    """Return the time (in seconds) between two checks of a Stellenangebot."""
+    return getattr(settings, "JOBBY_EXPIRY_CHECK_INTERVAL", CHECK_INTERVAL)
+
+
+def is_expired(url: str) -> bool | None:
+    """
+    Return whether the page at the given URL can no longer be found.
+
+    Return None if that could not be determined.
+    """
+    session = get_session()
+    kwargs = {}
+    if settings.DEBUG:  # pragma: no cover
+        # Do not verify certificates during development:
+        kwargs["verify"] = False
+    try:
+        response = session.head(url, allow_redirects=True, **kwargs)
+        if response.status_code in (requests.codes.method_not_allowed, requests.codes.not_implemented):
+            # The server does not support HEAD requests. Only fetch the
+            # headers of the response and not the body.
+            with session.get(url, stream=True, **kwargs) as response:
+                pass
+    except Exception:  # noqa
+        logger.warning("Expiry check of %s failed.", url, exc_info=True)
+        return None
+    if response.status_code == requests.codes.not_found:
+        return True
+    if response.ok:
+        return False
+    return None
+
+
+def get_due(interval: int | None = None):
+    """Return the watchlisted Stellenangebot objects that are due for a check."""
+    if interval is None:
+        interval = get_check_interval() or CHECK_INTERVAL
+    checked_before = timezone.now() - timedelta(seconds=interval)
+    return (
+        Stellenangebot.objects.filter(Exists(WatchlistItem.objects.filter(stellenangebot_id=OuterRef("id"))))
+        .filter(Q(last_checked__isnull=True) | Q(last_checked__lt=checked_before), expired=False)
+        .order_by(F("last_checked").asc(nulls_first=True), "pk")
+        .only("pk", "refnr", "api", "expired", "last_checked")
+    )
+
+
+def check_batch(stellenangebote: list[Stellenangebot], max_workers: int = MAX_WORKERS) -> int:
+    """
+    Check whether the given Stellenangebot objects have expired and save the
+    results.
+
+    Return the number of Stellenangebot objects that have expired.
+    """
+    urls = [registry.get_details_url(obj.api, obj.refnr) for obj in stellenangebote]
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="jobby-expiry") as executor:
+        results = list(executor.map(lambda url: is_expired(url) if url else None, urls))
+
+    now = timezone.now()
+    checked, expired_count = [], 0
+    for obj, expired in zip(stellenangebote, results):
+        if expired is None:
+            # Try again with the next check.
+            continue
+        obj.expired = expired
+        obj.last_checked = now
+        checked.append(obj)
+        expired_count += expired
+    Stellenangebot.objects.bulk_update(checked, ["expired", "last_checked"])
+    return expired_count
+
+
+def check_expired(batch_size: int = BATCH_SIZE, max_workers: int = MAX_WORKERS, interval: int | None = None) -> int:
+    """
+    Check the watchlisted Stellenangebot objects that are due for a check.
+
+    Return the number of Stellenangebot objects that have expired.
+    """
+    pks = list(get_due(interval).values_list("pk", flat=True))
+    expired_count = 0
+    for i in range(0, len(pks), batch_size):
+        batch = list(get_due(interval).filter(pk__in=pks[i : i + batch_size]))
+        expired_count += check_batch(batch, max_workers)
+    return expired_count
+
+
+def schedule_check() -> bool:
+    """
+    Start a check in the background, unless a check was started within the
+    check interval.
+
+    Return whether a check was started.
+    """
+    interval = get_check_interval()
+    if not interval:
+        return False
+    if not cache.add(SCHEDULE_CACHE_KEY, True, interval):
+        return False
+    background.submit(check_expired, interval=interval)
+    return True
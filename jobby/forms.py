@@ -63,6 +63,16 @@ class StellenangebotForm(forms.ModelForm):
             "expired": forms.HiddenInput(),
         }
 
+    def __init__(self, *args, fetch_beschreibung=True, **kwargs):
+        """
+        Create the form.
+
+        :param fetch_beschreibung: whether a missing description should be
+          fetched from the API during cleaning
+        """
+        super().__init__(*args, **kwargs)
+        self.fetch_beschreibung = fetch_beschreibung
+
     def get_initial_for_field(self, field, field_name):
         initial = super().get_initial_for_field(field, field_name)
         # Turn initial data for date/datetime fields into date/datetime objects
@@ -76,14 +86,13 @@ class StellenangebotForm(forms.ModelForm):
         return initial
 
     def clean_beschreibung(self):
-        # Fetch a job description from the job details page on arbeitsagentur.de
-        # if no description is given:
+        # Fetch a job description from the API if no description is given:
         beschreibung = self.cleaned_data.get("beschreibung", "")
-        if not beschreibung:
+        if not beschreibung and self.fetch_beschreibung:
             from jobby.views import _get_beschreibung  # avoid circular imports
 
             try:
-                beschreibung = _get_beschreibung(self.cleaned_data["refnr"])
+                beschreibung = _get_beschreibung(self.cleaned_data["refnr"], self["api"].value() or "")
             except BadRequest:
                 pass
         return beschreibung
@@ -0,0 +1,95 @@
+"""
+Shared HTTP session for all outgoing requests.
+
+Each process uses one ``requests.Session``, so that connections to the same
+host are pooled and kept alive between requests. Pool sizes, timeouts and the
+retry policy can be configured with the ``JOBBY_HTTP`` setting, for example:
+
+    JOBBY_HTTP = {
+        "POOL_CONNECTIONS": 10,  # number of hosts to keep connection pools for
+        "POOL_MAXSIZE": 10,  # number of connections to keep per host
+        "TIMEOUT": (3.05, 10),  # (connect timeout, read timeout) in seconds
+        "RETRIES": 2,  # how often a failed request is retried
+        "BACKOFF_FACTOR": 0.3,  # sleep between retries: factor * 2 ** (retry - 1)
+        "STATUS_FORCELIST": (502, 503, 504),  # response codes to retry on
+    }
+"""
+
+import threading
+
+import requests
+from django.conf import settings
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+DEFAULTS = {
+    "POOL_CONNECTIONS": 10,
+    "POOL_MAXSIZE": 10,
+    "TIMEOUT": (3.05, 10),
+    "RETRIES": 2,
+    "BACKOFF_FACTOR": 0.3,
+    "STATUS_FORCELIST": (502, 503, 504),
+}
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def get_config() -> dict:
+    """Return the HTTP settings, with defaults for any missing values."""
+    return {**DEFAULTS, **getattr(settings, "JOBBY_HTTP", {})}
+
+
+class TimeoutHTTPAdapter(HTTPAdapter):
+    """An HTTPAdapter that applies a default timeout to every request."""
+
+    def __init__(self, *args, timeout=None, **kwargs):
+        self.timeout = timeout
+        super().__init__(*args, **kwargs)
+
+    def send(self, request, timeout=None, **kwargs):
+        if timeout is None:
+            timeout = self.timeout
+        return super().send(request, timeout=timeout, **kwargs)
+
+
+def create_session(config: dict | None = None) -> requests.Session:
+    """Create a session with pooled connections according to the given config."""
+    config = config or get_config()
+    retry = Retry(
+        total=config["RETRIES"],
+        backoff_factor=config["BACKOFF_FACTOR"],
+        status_forcelist=config["STATUS_FORCELIST"],
+        # Return the last response instead of raising an error when the
+        # retries for a status code are exhausted:
+        raise_on_status=False,
+    )
+    adapter = TimeoutHTTPAdapter(
+        pool_connections=config["POOL_CONNECTIONS"],
+        pool_maxsize=config["POOL_MAXSIZE"],
+        max_retries=retry,
+        timeout=config["TIMEOUT"],
+    )
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def get_session() -> requests.Session:
+    """Return the session of this process, creating it if necessary."""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                _session = create_session()
+    return _session
+
+
+def close_session() -> None:
+    """Close the session of this process and release its connections."""
+    global _session
+    with _session_lock:
+        if _session is not None:
+            _session.close()
+            _session = None
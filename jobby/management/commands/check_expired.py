@@ -0,0 +1,35 @@
+from django.core.management import BaseCommand
+
+from jobby import expiry
+
+
+class Command(BaseCommand):
+    help = "Check whether the Stellenangebote on the watchlists have expired."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=expiry.BATCH_SIZE,
+            help="The number of Stellenangebote to check per batch.",
+        )
+        parser.add_argument(
+            "--max-workers",
+            type=int,
+            default=expiry.MAX_WORKERS,
+            help="The maximum number of requests to make at the same time.",
+        )
+        parser.add_argument(
+            "--interval",
+            type=int,
+            default=None,
+            help="Only check Stellenangebote that were not checked within this many seconds.",
+        )
+
+    def handle(self, *args, **options):
+        expired_count = expiry.check_expired(
+            batch_size=options["batch_size"],
+            max_workers=options["max_workers"],
+            interval=options["interval"],
+        )
+        self.stdout.write(f"Expired Stellenangebote found: {expired_count}")
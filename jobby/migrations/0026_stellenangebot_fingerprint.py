@@ -0,0 +1,18 @@
+# Generated by Django 5.0.6 on 2026-10-18 10:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("jobby", "0025_stellenangebot_expired"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="stellenangebot",
+            name="fingerprint",
+            field=models.CharField(blank=True, editable=False, max_length=40),
+        ),
+    ]
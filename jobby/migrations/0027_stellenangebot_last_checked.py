@@ -0,0 +1,18 @@
+# Generated by Django 5.0.6 on 2026-10-18 11:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("jobby", "0026_stellenangebot_fingerprint"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="stellenangebot",
+            name="last_checked",
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+    ]
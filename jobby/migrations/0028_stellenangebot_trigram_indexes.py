@@ -0,0 +1,38 @@
+# Generated by Django 5.0.6 on 2026-10-18 11:40
+
+import django.contrib.postgres.indexes
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("jobby", "0027_stellenangebot_last_checked"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="stellenangebot",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["titel"], name="jobby_titel_trgm", opclasses=["gin_trgm_ops"]
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="stellenangebot",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["beschreibung"], name="jobby_beschreibung_trgm", opclasses=["gin_trgm_ops"]
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="stellenangebot",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["arbeitgeber"], name="jobby_arbeitgeber_trgm", opclasses=["gin_trgm_ops"]
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="stellenangebot",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["arbeitsort"], name="jobby_arbeitsort_trgm", opclasses=["gin_trgm_ops"]
+            ),
+        ),
+    ]
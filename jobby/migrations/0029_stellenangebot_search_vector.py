@@ -0,0 +1,42 @@
+# Generated by Django 5.0.6 on 2026-10-18 12:05
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("jobby", "0028_stellenangebot_trigram_indexes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="stellenangebot",
+            name="search_vector",
+            field=models.GeneratedField(
+                db_persist=True,
+                expression=django.contrib.postgres.search.CombinedSearchVector(
+                    django.contrib.postgres.search.CombinedSearchVector(
+                        django.contrib.postgres.search.SearchVector("titel", config="german", weight="A"),
+                        "||",
+                        django.contrib.postgres.search.SearchVector(
+                            "beruf", "arbeitgeber", config="german", weight="B"
+                        ),
+                        django.contrib.postgres.search.SearchConfig("german"),
+                    ),
+                    "||",
+                    django.contrib.postgres.search.SearchVector("beschreibung", config="german", weight="C"),
+                    django.contrib.postgres.search.SearchConfig("german"),
+                ),
+                output_field=django.contrib.postgres.search.SearchVectorField(),
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="stellenangebot",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["search_vector"], name="stellenangebot_search_vector"
+            ),
+        ),
+    ]
@@ -0,0 +1,82 @@
+# Generated by Django 5.0.6 on 2026-10-18 12:31
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from bs4 import BeautifulSoup
+from django.db import migrations, models
+
+
+def html_to_text(html):
+    if not html:
+        return ""
+    return " ".join(BeautifulSoup(html, "html.parser").get_text(" ").split())
+
+
+def set_beschreibung_text(apps, schema_editor):
+    Stellenangebot = apps.get_model("jobby", "Stellenangebot")
+    changed = []
+    for obj in Stellenangebot.objects.exclude(beschreibung="").only("pk", "beschreibung").iterator():
+        obj.beschreibung_text = html_to_text(obj.beschreibung)
+        changed.append(obj)
+    Stellenangebot.objects.bulk_update(changed, ["beschreibung_text"], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("jobby", "0029_stellenangebot_search_vector"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="stellenangebot",
+            name="beschreibung_text",
+            field=models.TextField(blank=True, editable=False),
+        ),
+        migrations.RunPython(set_beschreibung_text, migrations.RunPython.noop, elidable=True),
+        # Search the plain text instead of the HTML:
+        migrations.RemoveIndex(
+            model_name="stellenangebot",
+            name="jobby_beschreibung_trgm",
+        ),
+        migrations.AddIndex(
+            model_name="stellenangebot",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["beschreibung_text"], name="jobby_beschreibung_text_trgm", opclasses=["gin_trgm_ops"]
+            ),
+        ),
+        # Generated fields cannot be altered; recreate the search vector.
+        migrations.RemoveIndex(
+            model_name="stellenangebot",
+            name="stellenangebot_search_vector",
+        ),
+        migrations.RemoveField(
+            model_name="stellenangebot",
+            name="search_vector",
+        ),
+        migrations.AddField(
+            model_name="stellenangebot",
+            name="search_vector",
+            field=models.GeneratedField(
+                db_persist=True,
+                expression=django.contrib.postgres.search.CombinedSearchVector(
+                    django.contrib.postgres.search.CombinedSearchVector(
+                        django.contrib.postgres.search.SearchVector("titel", config="german", weight="A"),
+                        "||",
+                        django.contrib.postgres.search.SearchVector(
+                            "beruf", "arbeitgeber", config="german", weight="B"
+                        ),
+                        django.contrib.postgres.search.SearchConfig("german"),
+                    ),
+                    "||",
+                    django.contrib.postgres.search.SearchVector("beschreibung_text", config="german", weight="C"),
+                    django.contrib.postgres.search.SearchConfig("german"),
+                ),
+                output_field=django.contrib.postgres.search.SearchVectorField(),
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="stellenangebot",
+            index=django.contrib.postgres.indexes.GinIndex(fields=["search_vector"], name="jobby_search_vector"),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.0.6 on 2026-10-18 15:02
+
+from django.db import migrations, models
+from django.db.models import Min
+
+
+def remove_duplicates(apps, schema_editor):
+    # Keep the oldest item of each (watchlist, stellenangebot) pair.
+    WatchlistItem = apps.get_model("jobby", "WatchlistItem")
+    keep = WatchlistItem.objects.values("watchlist_id", "stellenangebot_id").annotate(keep=Min("id")).values("keep")
+    WatchlistItem.objects.exclude(id__in=keep).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("jobby", "0030_stellenangebot_beschreibung_text"),
+    ]
+
+    operations = [
+        migrations.RunPython(remove_duplicates, migrations.RunPython.noop, elidable=True),
+        migrations.AddConstraint(
+            model_name="watchlistitem",
+            constraint=models.UniqueConstraint(
+                fields=("watchlist", "stellenangebot"), name="jobby_watchlistitem_unique"
+            ),
+        ),
+    ]
@@ -0,0 +1,49 @@
+# Generated by Django 5.0.6 on 2026-10-18 14:05
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("jobby", "0031_watchlistitem_unique"),
+    ]
+
+    operations = [
+        # Generated fields cannot be altered; recreate the search vector.
+        migrations.RemoveIndex(
+            model_name="stellenangebot",
+            name="jobby_search_vector",
+        ),
+        migrations.RemoveField(
+            model_name="stellenangebot",
+            name="search_vector",
+        ),
+        migrations.AddField(
+            model_name="stellenangebot",
+            name="search_vector",
+            field=models.GeneratedField(
+                db_persist=True,
+                expression=django.contrib.postgres.search.CombinedSearchVector(
+                    django.contrib.postgres.search.CombinedSearchVector(
+                        django.contrib.postgres.search.SearchVector("titel", config="german", weight="A"),
+                        "||",
+                        django.contrib.postgres.search.SearchVector(
+                            "beruf", "arbeitgeber", "arbeitsort", config="german", weight="B"
+                        ),
+                        django.contrib.postgres.search.SearchConfig("german"),
+                    ),
+                    "||",
+                    django.contrib.postgres.search.SearchVector("beschreibung_text", config="german", weight="C"),
+                    django.contrib.postgres.search.SearchConfig("german"),
+                ),
+                output_field=django.contrib.postgres.search.SearchVectorField(),
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="stellenangebot",
+            index=django.contrib.postgres.indexes.GinIndex(fields=["search_vector"], name="jobby_search_vector"),
+        ),
+    ]
@@ -1,57 +1,190 @@
-from django.contrib.postgres.search import TrigramWordSimilarity
-from django.db import models
-from django.db.models import QuerySet
-from django.db.models.functions import Greatest
-from django.forms import model_to_dict
+import functools
+import hashlib
+from itertools import chain
+
+from bs4 import BeautifulSoup
+from django.conf import settings
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import (
+    SearchQuery,
+    SearchRank,
+    SearchVector,
+    SearchVectorField,
+    TrigramWordSimilarity,
+)
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.db import connection, models, transaction
+from django.db.models import Exists, ExpressionWrapper, F, OuterRef, Q, QuerySet
+from django.db.models.functions import Cast, Greatest
 from django.urls import reverse
 from django.utils.http import urlencode
 
 CHARFIELD_MAX = 256
 
 
-def _update_stellenangebot(existing, other):
-    """Update the existing Stellenangebot object with data from the other."""
-    if not isinstance(existing, Stellenangebot) or not isinstance(other, Stellenangebot):
-        raise TypeError("Arguments must be Stellenangebot instances.")
+# The fields of Stellenangebot whose data is provided by the job search APIs.
+# All other fields either identify the Stellenangebot (refnr) or contain data
+# added by the user, and must not be overwritten with search results.
+API_FIELDS = (
+    "titel",
+    "beruf",
+    "arbeitgeber",
+    "arbeitsort",
+    "eintrittsdatum",
+    "veroeffentlicht",
+    "modified",
+    "externe_url",
+)
+
+
+def make_fingerprint(data):
+    """
+    Return a hash of the API data of a Stellenangebot.
+
+    ``data`` is a mapping of the names of the API_FIELDS to the values as
+    provided by the API (i.e. the raw strings for dates and timestamps).
+    """
+    content = "\x1f".join(str(data.get(field_name) or "") for field_name in API_FIELDS)
+    return hashlib.sha1(content.encode("utf-8")).hexdigest()
+
+
+class SearchHit:
+    """
+    A search result that has not been saved as a Stellenangebot.
+
+    Search hits are much cheaper to create than model instances. They provide
+    the attributes and methods that the templates need.
+    """
+
+    __slots__ = ("refnr", *API_FIELDS, "api", "fingerprint")
+
+    # Search hits are never saved:
+    pk = None
+
+    def __init__(self, refnr="", api="", fingerprint="", **data):
+        self.refnr = refnr
+        self.api = api
+        self.fingerprint = fingerprint
+        for field_name in API_FIELDS:
+            setattr(self, field_name, data.get(field_name, ""))
+
+    def __str__(self):
+        return self.titel
+
+    def __repr__(self):
+        return f"<SearchHit: {self.refnr}>"
+
+    def __eq__(self, other):
+        if not isinstance(other, SearchHit):
+            return NotImplemented
+        return all(getattr(self, name) == getattr(other, name) for name in self.__slots__)
+
+    __hash__ = None
+
+    def as_url(self):
+        """
+        Return the URL to the StellenangebotView add page, with the data of
+        this hit attached to the query string.
+        """
+        # noinspection PyTypeChecker
+        return f"{reverse('stellenangebot_add')}?{urlencode(_as_dict(self))}"
+
+
+def _merge_stellenangebot(existing, other):
+    """
+    Update the existing Stellenangebot object with the API data from the other
+    Stellenangebot object or search hit.
+
+    The changes are only applied to the existing instance; the instance is not
+    saved. Return the names of the fields that were changed.
+    """
+    if not isinstance(existing, Stellenangebot) or not isinstance(other, (Stellenangebot, SearchHit)):
+        raise TypeError("Arguments must be Stellenangebot instances or search hits.")
 
     if existing.refnr != other.refnr:
         # Not the same Stellenangebot.
-        return False
+        return []
+
+    if other.fingerprint:
+        if existing.fingerprint == other.fingerprint:
+            # The API data has not changed since the last merge.
+            return []
+        existing.fingerprint = other.fingerprint
+        changed = ["fingerprint"]
+    else:
+        changed = []
+
+    for field_name in API_FIELDS:
+        field = existing._meta.get_field(field_name)
+        other_value = field.value_from_object(other)
+        if other_value in field.empty_values:
+            other_value = None if field.null else ""
+        else:
+            # Search results may contain strings for date values; compare and
+            # store the python values.
+            try:
+                other_value = field.to_python(other_value)
+            except ValidationError:
+                continue
+        if field.value_from_object(existing) != other_value:
+            setattr(existing, field.attname, other_value)
+            changed.append(field_name)
+    return changed
+
+
+def html_to_text(html):
+    """Return the normalized plain text of the given HTML."""
+    if not html:
+        return ""
+    text = BeautifulSoup(html, "html.parser").get_text(" ")
+    return " ".join(text.split())
+
+
+@functools.cache
+def _get_dict_fields(model, names=None):
+    """
+    Return the fields of the given model that are included in the dictionary
+    returned by _as_dict.
 
-    update_dict = {}
-    for field in existing._meta.get_fields():
-        if not field.concrete or field.primary_key:
-            # This either a relation field or the field is a primary key
-            # (which should not be updated).
-            continue
-        existing_value = field.value_from_object(existing)
-        other_field = other._meta.get_field(field.name)
-        other_value = other_field.value_from_object(other)
-        if existing_value != other_value:
-            update_dict[field.name] = other_value
-    if update_dict:
-        Stellenangebot.objects.filter(refnr=existing.refnr).update(**update_dict)
-        return True
-    return False
+    The result is cached, so that the model's metadata is only looked up once.
+
+    :param model: the model class
+    :param names: if given, only include the fields with these names
+    :return: tuple of model fields
+    """
+    opts = model._meta
+    # The same fields as model_to_dict:
+    return tuple(
+        field
+        for field in chain(opts.concrete_fields, opts.private_fields, opts.many_to_many)
+        if field.editable and (names is None or field.name in names)
+    )
 
 
 def _as_dict(instance, empty=False, default=False):
     """
-    Return the model instance as a dictionary.
+    Return the model instance (or search hit) as a dictionary.
 
-    :param instance: the model instance
+    :param instance: the model instance or search hit
     :param empty: whether to include values that are considered empty
     :param default: whether to include default values
     :return: dictionary of model field name to field data
     """
+    is_hit = isinstance(instance, SearchHit)
+    if is_hit:
+        # Use the same fields, in the same order, as for a Stellenangebot:
+        fields = _get_dict_fields(Stellenangebot, SearchHit.__slots__)
+    else:
+        fields = _get_dict_fields(type(instance))
     r = {}
-    for field_name, value in model_to_dict(instance).items():
-        model_field = instance._meta.get_field(field_name)
-        if not empty and value in model_field.empty_values:
+    for field in fields:
+        value = getattr(instance, field.name) if is_hit else field.value_from_object(instance)
+        if not empty and value in field.empty_values:
             continue
-        if not default and value == model_field.default:
+        if not default and value == field.default:
             continue
-        r[field_name] = value
+        r[field.name] = value
     return r
 
 
@@ -86,7 +219,8 @@ class SucheModel(models.Model):
     corona = models.BooleanField(blank=True, null=True)
     umkreis = models.PositiveSmallIntegerField(blank=True, null=True, default=25)
 
-    # Query specific options
+    # Query specific options; page is the page of the search results page and
+    # size the number of results per page requested from the APIs.
     page = models.PositiveSmallIntegerField(blank=True, null=True, default=1)
     size = models.PositiveSmallIntegerField(blank=True, null=True, default=50)
 
@@ -95,21 +229,139 @@ class SucheModel(models.Model):
         verbose_name_plural = "Such-Parameter"
 
 
+ORPHAN_COUNT_CACHE_KEY = "jobby:orphan_count"
+# How long (in seconds) the orphan count may be cached. The count is
+# invalidated whenever Stellenangebot or WatchlistItem objects are created or
+# deleted; the timeout only limits how long changes that bypass the model
+# signals (bulk_create, raw SQL) can go unnoticed.
+ORPHAN_COUNT_TIMEOUT = 5 * 60
+
+
+def get_orphan_count():
+    """Return the number of Stellenangebot objects that are not on any watchlist."""
+    count = cache.get(ORPHAN_COUNT_CACHE_KEY)
+    if count is None:
+        count = Stellenangebot.objects.orphans().count()
+        cache.set(ORPHAN_COUNT_CACHE_KEY, count, ORPHAN_COUNT_TIMEOUT)
+    return count
+
+
+def _delete_orphan_count():
+    cache.delete(ORPHAN_COUNT_CACHE_KEY)
+
+
+def invalidate_orphan_count():
+    """
+    Remove the cached orphan count once the current transaction has been
+    committed.
+
+    Call this after changes that do not send the model signals, for example
+    after ``bulk_create`` or raw SQL. The count is only removed once per
+    transaction, however often this is called.
+    """
+    # Removing the count before the commit is pointless: a request may cache
+    # the old count again until the transaction is committed.
+    connection = transaction.get_connection()
+    if any(func is _delete_orphan_count for _sids, func, _robust in connection.run_on_commit):
+        return
+    transaction.on_commit(_delete_orphan_count)
+
+
+# The default minimum word similarity of a search term and a Stellenangebot
+# for the Stellenangebot to be included in the search results. This is the
+# default of pg_trgm.word_similarity_threshold.
+SEARCH_THRESHOLD = 0.6
+# The fields that are searched by StellenangebotQuerySet.search:
+SEARCH_FIELDS = ("titel", "beschreibung_text", "arbeitgeber", "arbeitsort")
+# The text search configuration of the full-text search:
+SEARCH_CONFIG = "german"
+# Queries with at most this many words are also searched with the (typo
+# tolerant) trigram search, if the full-text search does not find anything:
+SHORT_QUERY_WORDS = 2
+
+
+def get_search_threshold() -> float:
+    """
+    Return the minimum word similarity of a search term and a Stellenangebot
+    for the Stellenangebot to be included in the search results.
+
+    The threshold can be set with the ``JOBBY_SEARCH_THRESHOLD`` setting. The
+    pg_trgm.word_similarity_threshold setting of the database connections must
+    be set to the same value (with the "options" of the DATABASES setting), so
+    that the trigram indexes can be used to find the candidates.
+    """
+    return getattr(settings, "JOBBY_SEARCH_THRESHOLD", SEARCH_THRESHOLD)
+
+
 class StellenangebotQuerySet(QuerySet):
 
-    def search(self, q):
-        annotation = Greatest(
-            TrigramWordSimilarity(q, "titel"),
-            TrigramWordSimilarity(q, "beschreibung"),
-            TrigramWordSimilarity(q, "arbeitgeber"),
-            TrigramWordSimilarity(q, "arbeitsort"),
+    def orphans(self):
+        """Return the Stellenangebot objects that are not on any watchlist."""
+        return self.exclude(Exists(WatchlistItem.objects.filter(stellenangebot_id=OuterRef("id"))))
+
+    def with_user_data(self):
+        """
+        Annotate whether the user has added extra data to the Stellenangebot
+        objects (see Stellenangebot.has_user_data) as the boolean
+        ``user_data``.
+        """
+        user_data = (
+            ~Q(notizen="")
+            | Exists(StellenangebotURLs.objects.filter(angebot_id=OuterRef("id")))
+            | Exists(StellenangebotKontakt.objects.filter(angebot_id=OuterRef("id")))
+            | Exists(StellenangebotFiles.objects.filter(angebot_id=OuterRef("id")))
         )
+        return self.annotate(user_data=ExpressionWrapper(user_data, output_field=models.BooleanField()))
+
+    def without_user_data(self):
+        """
+        Return the Stellenangebot objects that do not have extra data added by
+        the user.
+        """
+        return self.with_user_data().filter(user_data=False)
+
+    def search(self, q):
+        # Use the trigram indexes to find the candidates with the word
+        # similarity operator, and only compute the similarity for those.
+        candidates = Q()
+        for field_name in SEARCH_FIELDS:
+            candidates |= Q(**{f"{field_name}__trigram_word_similar": q})
+        annotation = Greatest(*(TrigramWordSimilarity(q, field_name) for field_name in SEARCH_FIELDS))
+        # Cast the similarity (and the rank below) to double precision, so
+        # that the values survive the round trip through a pagination cursor.
         return (
-            self.annotate(similarity=annotation)
-            .filter(similarity__gt=0.2)
+            self.filter(candidates)
+            .annotate(similarity=Cast(annotation, models.FloatField()))
+            .filter(similarity__gt=get_search_threshold())
             .order_by("-similarity", *self.query.order_by)
         )
 
+    def fulltext(self, q):
+        """
+        Return the Stellenangebot objects that match the given search query,
+        ordered by rank.
+
+        The query supports the web search syntax: "quoted phrases", OR and
+        -excluded words.
+        """
+        query = SearchQuery(q, config=SEARCH_CONFIG, search_type="websearch")
+        return (
+            self.filter(search_vector=query)
+            .annotate(rank=Cast(SearchRank(F("search_vector"), query), models.FloatField()))
+            .order_by("-rank", *self.query.order_by)
+        )
+
+    def text_search(self, q):
+        """
+        Search with the full-text search, or, for short queries without
+        full-text matches, with the trigram search.
+        """
+        queryset = self.fulltext(q)
+        if len(q.split()) <= SHORT_QUERY_WORDS and not queryset.exists():
+            # Maybe the query contains a typo:
+            return self.search(q)
+        return queryset
+
 
 class Stellenangebot(models.Model):
     class BewerbungChoices(models.TextChoices):
@@ -136,8 +388,24 @@ class Stellenangebot(models.Model):
     modified = models.DateTimeField(blank=True, null=True, verbose_name="Zuletzt verändert am")
     externe_url = models.URLField(blank=True, null=True, verbose_name="Externe URL")
     beschreibung = models.TextField(blank=True, verbose_name="Beschreibung")
+    # The plain text of the (HTML) beschreibung, for searching:
+    beschreibung_text = models.TextField(blank=True, editable=False)
     api = models.CharField(max_length=CHARFIELD_MAX, blank=True)
     expired = models.BooleanField(default=False)
+    # When it was last checked whether the Stellenangebot has expired:
+    last_checked = models.DateTimeField(blank=True, null=True, editable=False)
+    # Hash of the data last received from the API (see make_fingerprint):
+    fingerprint = models.CharField(max_length=40, blank=True, editable=False)
+    # The document for the full-text search (see StellenangebotQuerySet.fulltext):
+    search_vector = models.GeneratedField(
+        expression=(
+            SearchVector("titel", weight="A", config=SEARCH_CONFIG)
+            + SearchVector("beruf", "arbeitgeber", "arbeitsort", weight="B", config=SEARCH_CONFIG)
+            + SearchVector("beschreibung_text", weight="C", config=SEARCH_CONFIG)
+        ),
+        output_field=SearchVectorField(),
+        db_persist=True,
+    )
 
     bewerbungsstatus = models.CharField(
         max_length=CHARFIELD_MAX,
@@ -154,15 +422,22 @@ class Stellenangebot(models.Model):
     class Meta:
         verbose_name = "Stellenangebot"
         verbose_name_plural = "Stellenangebote"
+        indexes = [
+            GinIndex(fields=[field_name], name=f"jobby_{field_name}_trgm", opclasses=["gin_trgm_ops"])
+            for field_name in SEARCH_FIELDS
+        ] + [GinIndex(fields=["search_vector"], name="jobby_search_vector")]
 
     def __str__(self):
         return self.titel
 
-    def as_search_result_form(self):  # TODO: rename to as_stellenangebot_form?
-        """Return a StellenangebotForm of this instance."""
-        from jobby.forms import StellenangebotForm
-
-        return StellenangebotForm(instance=self)
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get("update_fields")
+        if update_fields is None:
+            self.beschreibung_text = html_to_text(self.beschreibung)
+        elif "beschreibung" in update_fields:
+            self.beschreibung_text = html_to_text(self.beschreibung)
+            kwargs["update_fields"] = {*update_fields, "beschreibung_text"}
+        super().save(*args, **kwargs)
 
     def as_url(self):
         """
@@ -179,7 +454,11 @@ class Stellenangebot(models.Model):
             return f"{reverse('stellenangebot_add')}?{urlencode(_as_dict(self))}"
 
     def has_user_data(self):
-        """Return whether a user has added additional data to this instance."""
+        """
+        Return whether a user has added additional data to this instance.
+
+        Use StellenangebotQuerySet.with_user_data to check many instances.
+        """
         # This is indicated by any of the 'user data' fields or relations
         # having non-default values.
         local_user_data_fields = ["notizen"]
@@ -238,21 +517,121 @@ class Watchlist(models.Model):
         return self.items.filter(stellenangebot=stellenangebot).exists()
 
     def add_watchlist_item(self, stellenangebot):
-        if self.on_watchlist(stellenangebot):
-            return False
-        self.items.create(stellenangebot=stellenangebot)
-        return True
+        """
+        Add the given Stellenangebot instance to the watchlist.
+
+        Return False if the Stellenangebot already was on the watchlist.
+        """
+        table = WatchlistItem._meta.db_table
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"INSERT INTO {table} (watchlist_id, stellenangebot_id) VALUES (%s, %s) "
+                "ON CONFLICT (watchlist_id, stellenangebot_id) DO NOTHING RETURNING id",
+                [self.pk, stellenangebot.pk],
+            )
+            added = cursor.fetchone() is not None
+        if added:
+            # The raw INSERT does not send the model signals:
+            invalidate_orphan_count()
+        return added
+
+    def toggle_watchlist_item(self, stellenangebot):
+        """
+        Add the given Stellenangebot instance to the watchlist, or remove it if
+        it is already on the watchlist.
+
+        A removed Stellenangebot is deleted if it does not have extra data
+        added by the user; its primary key is then reset. Return whether the
+        Stellenangebot is on the watchlist afterward.
+        """
+        table = WatchlistItem._meta.db_table
+        stellenangebot_table = Stellenangebot._meta.db_table
+        without_user_data, without_user_data_params = (
+            Stellenangebot.objects.filter(pk=stellenangebot.pk).without_user_data().values("pk").query.sql_with_params()
+        )
+        # Delete the item, or insert it if there was nothing to delete, with a
+        # single statement. If the item was deleted, also delete the
+        # Stellenangebot if it has no user data, along with its items on other
+        # watchlists.
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "WITH deleted AS ("
+                f"  DELETE FROM {table} WHERE watchlist_id = %s AND stellenangebot_id = %s RETURNING id"
+                "), inserted AS ("
+                f"  INSERT INTO {table} (watchlist_id, stellenangebot_id)"
+                "  SELECT %s, %s WHERE NOT EXISTS (SELECT FROM deleted)"
+                "  ON CONFLICT (watchlist_id, stellenangebot_id) DO NOTHING"
+                "), removed AS ("
+                f"  DELETE FROM {stellenangebot_table}"
+                f"  WHERE EXISTS (SELECT FROM deleted) AND id IN ({without_user_data}) RETURNING id"
+                "), removed_items AS ("
+                f"  DELETE FROM {table} WHERE stellenangebot_id IN (SELECT id FROM removed)"
+                "  AND id NOT IN (SELECT id FROM deleted)"
+                ") "
+                "SELECT NOT EXISTS (SELECT FROM deleted), EXISTS (SELECT FROM removed)",
+                [self.pk, stellenangebot.pk] * 2 + list(without_user_data_params),
+            )
+            on_watchlist, removed = cursor.fetchone()
+        if removed:
+            # Like Model.delete(), reset the primary key of the deleted
+            # instance.
+            stellenangebot.pk = None
+        # The raw statement does not send the model signals:
+        invalidate_orphan_count()
+        return on_watchlist
 
     def remove_watchlist_item(self, stellenangebot):
         """
         Remove the given Stellenangebot instance from the watchlist.
 
         If the Stellenangebot does not have extra data added by the user,
-        delete the Stellenangebot instance.
+        delete the Stellenangebot instance. Return whether it was deleted.
+        """
+        with transaction.atomic():
+            WatchlistItem.objects.filter(watchlist=self, stellenangebot=stellenangebot)._raw_delete(self._state.db)
+            deleted = self._delete_without_user_data(stellenangebot)
+            # The raw deletes do not send the model signals:
+            invalidate_orphan_count()
+        return deleted
+
+    @staticmethod
+    def _delete_without_user_data(stellenangebot):
+        """
+        Delete the given Stellenangebot instance if it does not have extra
+        data added by the user, and return whether it was deleted.
+
+        Like Model.delete(), reset the primary key of a deleted instance, so
+        that it can be treated as an unsaved instance.
+        """
+        using = stellenangebot._state.db
+        stellenangebote = Stellenangebot.objects.filter(pk=stellenangebot.pk).without_user_data()
+        # A Stellenangebot without user data has no related objects other than
+        # its watchlist items:
+        WatchlistItem.objects.filter(stellenangebot__in=stellenangebote.values("pk"))._raw_delete(using)
+        if stellenangebote._raw_delete(using):
+            stellenangebot.pk = None
+            return True
+        return False
+
+    def remove_all_watchlist_items(self):
+        """
+        Remove all items from the watchlist.
+
+        Delete the Stellenangebot instances of the removed items that do not
+        have extra data added by the user.
         """
-        WatchlistItem.objects.filter(watchlist=self, stellenangebot=stellenangebot).delete()
-        if not stellenangebot.has_user_data():
-            stellenangebot.delete()
+        with transaction.atomic():
+            ids = list(self.get_stellenangebote().without_user_data().values_list("id", flat=True))
+            # Delete with one statement per table, instead of collecting the
+            # objects and sending signals for each of them. Stellenangebot
+            # objects without user data have no related objects other than
+            # their watchlist items, which are removed along with the items of
+            # this watchlist.
+            WatchlistItem.objects.filter(Q(watchlist=self) | Q(stellenangebot_id__in=ids))._raw_delete(self._state.db)
+            if ids:
+                Stellenangebot.objects.filter(id__in=ids)._raw_delete(self._state.db)
+            # The raw deletes do not send the model signals:
+            invalidate_orphan_count()
 
     def get_stellenangebote(self):
         return Stellenangebot.objects.filter(id__in=self.items.values_list("stellenangebot_id", flat=True))
@@ -270,6 +649,10 @@ class WatchlistItem(models.Model):
     stellenangebot = models.ForeignKey("jobby.Stellenangebot", on_delete=models.CASCADE, related_name="watchlist_items")
 
     class Meta:
+        constraints = [
+            # Also serves as the index for lookups by watchlist and Stellenangebot.
+            models.UniqueConstraint(fields=["watchlist", "stellenangebot"], name="jobby_watchlistitem_unique"),
+        ]
         verbose_name = "Gemerktes Stellenangebot"
         verbose_name_plural = "Gemerkte Stellenangebote"
 
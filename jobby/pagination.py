@@ -0,0 +1,140 @@
+"""
+Keyset (cursor) pagination for querysets.
+
+Instead of counting the rows and skipping to an offset, each page continues
+after the last row of the previous page. That way, fetching a page takes the
+same time no matter how far into the list it is. The position is passed
+between requests as an opaque cursor string.
+
+The page size of the list views can be set with the ``JOBBY_LIST_PAGE_SIZE``
+setting.
+"""
+
+import base64
+import binascii
+import json
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Field, Q, QuerySet
+
+CURSOR_VAR = "cursor"
+
+# The default number of objects per page of the list views:
+LIST_PAGE_SIZE = 50
+
+
+def get_list_page_size() -> int:
+    """Return the number of objects per page of the list views."""
+    return getattr(settings, "JOBBY_LIST_PAGE_SIZE", LIST_PAGE_SIZE)
+
+
+class KeysetPage:
+
+    def __init__(self, object_list: list, next_cursor: str | None, is_first: bool):
+        """
+        Create a page of a KeysetPaginator.
+
+        :param object_list: the objects on this page
+        :param next_cursor: the cursor of the next page, or None if this is
+          the last page
+        :param is_first: whether this is the first page
+        """
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.is_first = is_first
+
+    @property
+    def has_next(self) -> bool:
+        return self.next_cursor is not None
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+
+class KeysetPaginator:
+
+    def __init__(self, queryset: QuerySet, per_page: int, ordering=None):
+        """
+        Create a paginator for the given queryset.
+
+        :param queryset: the queryset to paginate
+        :param per_page: the maximum number of objects per page
+        :param ordering: the names of the fields (or annotations) to order by,
+          with a "-" prefix for descending order; defaults to the ordering of
+          the queryset. The primary key is added as the last key, so that the
+          ordering is unique.
+        """
+        ordering = list(ordering or queryset.query.order_by)
+        if not any(key.lstrip("-") in ("pk", "id") for key in ordering):
+            ordering.append("pk")
+        self.queryset = queryset
+        self.per_page = per_page
+        self.ordering = ordering
+        # The keys as (name, descending) tuples:
+        self.keys = [(key.lstrip("-"), key.startswith("-")) for key in ordering]
+
+    def page(self, cursor: str | None = None) -> KeysetPage:
+        """
+        Return the page that starts after the position of the given cursor,
+        or the first page if there is no (valid) cursor.
+        """
+        queryset = self.queryset.order_by(*self.ordering)
+        values = self.decode_cursor(cursor) if cursor else None
+        if values is not None:
+            queryset = queryset.filter(self._after(values))
+        # Fetch one more object to find out whether there is a next page:
+        objects = list(queryset[: self.per_page + 1])
+        next_cursor = None
+        if len(objects) > self.per_page:
+            objects = objects[: self.per_page]
+            next_cursor = self.encode_cursor(objects[-1])
+        return KeysetPage(objects, next_cursor, is_first=values is None)
+
+    def encode_cursor(self, obj) -> str:
+        """Return the cursor for the position after the given object."""
+        values = [getattr(obj, name) for name, _descending in self.keys]
+        data = json.dumps(values, cls=DjangoJSONEncoder).encode("utf-8")
+        return base64.urlsafe_b64encode(data).decode("ascii")
+
+    def decode_cursor(self, cursor: str) -> list | None:
+        """
+        Return the key values of the given cursor, converted to the types of
+        their fields, or None if the cursor is invalid.
+        """
+        try:
+            values = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        except (ValueError, binascii.Error):
+            return None
+        if not isinstance(values, list) or len(values) != len(self.keys):
+            return None
+        try:
+            return [self._get_field(name).to_python(value) for (name, _descending), value in zip(self.keys, values)]
+        except (ValidationError, TypeError, ValueError):
+            # The cursor was not created by this paginator.
+            return None
+
+    def _get_field(self, name: str) -> Field:
+        """Return the model field or the annotation output field with the given name."""
+        if name in self.queryset.query.annotations:
+            return self.queryset.query.annotations[name].output_field
+        if name == "pk":
+            return self.queryset.model._meta.pk
+        return self.queryset.model._meta.get_field(name)
+
+    def _after(self, values: list) -> Q:
+        """
+        Return the filter for the objects that come after the object with the
+        given key values.
+        """
+        # (a, b) after (x, y) means: a after x, or a equals x and b after y.
+        after = Q()
+        equal = Q()
+        for (name, descending), value in zip(self.keys, values):
+            after |= equal & Q(**{f"{name}__{'lt' if descending else 'gt'}": value})
+            equal &= Q(**{name: value})
+        return after
@@ -0,0 +1,23 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from jobby.models import Stellenangebot, WatchlistItem, invalidate_orphan_count
+
+
+@receiver(post_save, sender=Stellenangebot)
+def invalidate_on_stellenangebot_save(sender, instance, created, **kwargs):
+    if created:
+        invalidate_orphan_count()
+
+
+@receiver(post_save, sender=WatchlistItem)
+def invalidate_on_watchlist_item_save(sender, instance, **kwargs):
+    # Also invalidate on updates: the item may now refer to another
+    # Stellenangebot.
+    invalidate_orphan_count()
+
+
+@receiver(post_delete, sender=Stellenangebot)
+@receiver(post_delete, sender=WatchlistItem)
+def invalidate_on_delete(sender, instance, **kwargs):
+    invalidate_orphan_count()
@@ -24,21 +24,27 @@
   /**
    * Create a POST request that adds or removes an item from the watchlist.
    *
-   * The item's data is transferred via the form that is embedded within the
-   * button's inner HTML. The data is required when adding an item to the
-   * watchlist that does not yet exist in the database.
+   * The item is identified by the refnr set in the button's dataset. The
+   * page token of the results list lets the server look up the item's data,
+   * which is required when adding an item to the watchlist that does not yet
+   * exist in the database.
    *
    * @param {HTMLButtonElement} btn the toggle button
    * @returns a new Request instance
    */
   function createToggleRequest (btn) {
-    const form = btn.querySelector('form')
+    const form = new FormData()
+    form.append('refnr', btn.dataset.refnr)
+    const results = btn.closest('[data-page-token]')
+    if (results) {
+      form.append('page_token', results.dataset.pageToken)
+    }
     return new Request(btn.dataset.url, {
       method: 'POST',
       headers: {
         'X-CSRFToken': getCSRFToken()
       },
-      body: new FormData(form),
+      body: form,
       mode: 'same-origin'
     })
   }
@@ -127,7 +133,13 @@
     }
     const handleResponse = (btn, response) => {
       if (!response.ok) {
-        throw new Error(`Toggle response was not ok (status code: ${response.status})`)
+        // Show the error message of the response, if there is one.
+        return response.json()
+          .catch(() => ({}))
+          .then(data => {
+            if (data.error) window.alert(data.error)
+            throw new Error(`Toggle response was not ok (status code: ${response.status})`)
+          })
       }
       return response.json()
     }
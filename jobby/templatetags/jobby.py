@@ -1,12 +1,53 @@
-from urllib.parse import parse_qsl, unquote, urlparse, urlunparse
+from urllib.parse import parse_qsl, unquote
 
 from django import template
-from django.urls import Resolver404, get_script_prefix, resolve
+from django.urls import reverse
 from django.utils.http import urlencode
 
 register = template.Library()
 
 
+class PreparedSearchFilters:
+    """
+    The preserved search filters of a request, prepared for adding them to
+    many URLs.
+
+    The query strings are computed once per request, so that adding the
+    filters to a URL is just string concatenation.
+    """
+
+    def __init__(self, preserved_filters: str | None):
+        """
+        Prepare the given preserved search filters.
+
+        :param preserved_filters: the search filters query string of the
+          request, i.e. '_search_filters=was%3DFoo%26wo%3DBar'
+        """
+        self.preserved_filters = preserved_filters or ""
+        self.search_query = self.preserved_filters
+        if self.preserved_filters:
+            self.search_path = reverse("suche")
+            # The query string for URLs of the search page holds the search
+            # filters directly:
+            #  '_search_filters=was%3DFoo%26wo%3DBar' => 'was=Foo&wo=Bar'
+            filters = dict(parse_qsl(self.preserved_filters)).get("_search_filters")
+            if filters:
+                self.search_query = urlencode(parse_qsl(filters))
+
+    def add_to(self, url: str) -> str:
+        """Add the search filters to the query string of the given url."""
+        if not self.preserved_filters:
+            return url
+        url, hash_mark, fragment = url.partition("#")
+        path, _, query = url.partition("?")
+        if unquote(path) == self.search_path:
+            filters = self.search_query
+        else:
+            filters = self.preserved_filters
+        query = f"{filters}&{query}" if query else filters
+        return f"{path}?{query}{hash_mark}{fragment}"
+
+
 @register.simple_tag(takes_context=True)
 def paginator_url(context, page_number):
     from jobby.views import PAGE_VAR  # avoid circular import
@@ -27,36 +68,15 @@ def add_search_filters(context, url):
     When navigating back to the search page, the filters are recovered from the
     above query string parameter:
         '_search_filters=was%3DFoo%26wo%3DBar' => 'was=Foo&wo=Bar'
-    """
-    search_filters = context.get("preserved_search_filters")
-
-    parsed_url = list(urlparse(url))
-    parsed_qs = parse_qsl(parsed_url[4])
-    merged_qs = []
-
-    if search_filters:
-        # Check if the url is for a search page. If it is, parse the preserved
-        # filters and extract the search filters parameters, so that they
-        # can be added to the query string. For example:
-        #  search_filters is:         '_search_filters=was%3DFoo%26wo%3DBar'
-        #  search_filters should be:  'was=Foo&wo=Bar'
-        search_filters = parse_qsl(search_filters)  # [('_search_filters', 'was=Foo&wo=Bar')]
-        match_url = f"/{unquote(url).partition(get_script_prefix())[2]}"
-        try:
-            match = resolve(match_url)
-        except Resolver404:  # pragma: no cover
-            pass
-        else:
-            filters = dict(search_filters).get("_search_filters")
-            if match.url_name == "suche" and filters:
-                search_filters = parse_qsl(filters)  # [('was', 'Foo'), ('wo', 'Bar')]
 
-        merged_qs.extend(search_filters)
-
-    merged_qs.extend(parsed_qs)
-
-    parsed_url[4] = urlencode(merged_qs)
-    return urlunparse(parsed_url)
+    Views can put PreparedSearchFilters into the context under the name
+    'prepared_search_filters', so that the filters are only prepared once
+    per page.
+    """
+    prepared = context.get("prepared_search_filters")
+    if prepared is None:
+        prepared = PreparedSearchFilters(context.get("preserved_search_filters"))
+    return prepared.add_to(url)
 
 
 @register.simple_tag
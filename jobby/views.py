@@ -1,10 +1,7 @@
-import requests
-from bs4 import BeautifulSoup
 from django import forms
 from django.contrib import messages
 from django.core.exceptions import BadRequest, ObjectDoesNotExist
 from django.core.paginator import Paginator
-from django.db.models import Exists, OuterRef
 from django.http import HttpResponse, HttpResponseBadRequest, JsonResponse
 from django.shortcuts import redirect
 from django.urls import reverse
@@ -14,7 +11,10 @@ from django.views.generic import FormView, ListView, UpdateView
 from django.views.generic.base import ContextMixin
 from mizdb_inlines.views import InlineFormsetMixin
 
+from jobby.apis.cache import cache_hits, get_cached_hit
 from jobby.apis.registry import registry
+from jobby.descriptions import schedule_fill as schedule_description_fill
+from jobby.expiry import schedule_check as schedule_expiry_check
 from jobby.forms import StellenangebotForm, SucheForm, WatchlistSearchForm
 from jobby.models import (
     Stellenangebot,
@@ -23,12 +23,23 @@ from jobby.models import (
     StellenangebotURLs,
     Watchlist,
     WatchlistItem,
+    get_orphan_count,
 )
-from jobby.templatetags.jobby import add_search_filters
+from jobby.pagination import CURSOR_VAR, KeysetPaginator, get_list_page_size
+from jobby.templatetags.jobby import PreparedSearchFilters
 
 PAGE_VAR = "page"
+# The number of results per page of the search results page. The results are
+# requested from the APIs in pages of SucheModel.size results.
 PAGE_SIZE = 100
 
+# The columns of the Stellenangebot table that the list views render:
+PAPIERKORB_COLUMNS = ("titel", "arbeitsort", "arbeitgeber", "eintrittsdatum", "bewerbungsstatus")
+WATCHLIST_COLUMNS = (*PAPIERKORB_COLUMNS, "refnr", "expired")
+
+# The message for a watchlist toggle of a search result whose data has expired:
+HITS_EXPIRED_MESSAGE = "Die Suchergebnisse sind abgelaufen. Bitte die Suche erneut ausführen."
+
 
 class BaseMixin(ContextMixin):
     site_title = ""
@@ -36,10 +47,9 @@ class BaseMixin(ContextMixin):
     def get_context_data(self, **kwargs):  # pragma: no cover
         ctx = super().get_context_data(**kwargs)
         ctx["site_title"] = self.site_title
-        ctx["orphan_count"] = Stellenangebot.objects.exclude(
-            Exists(WatchlistItem.objects.filter(stellenangebot_id=OuterRef("id")))
-        ).count()
+        ctx["orphan_count"] = get_orphan_count()
         ctx["preserved_search_filters"] = self.get_search_filters(self.request)  # noqa
+        ctx["prepared_search_filters"] = PreparedSearchFilters(ctx["preserved_search_filters"])
         return ctx
 
     def get_search_filters(self, request):
@@ -60,6 +70,33 @@ class BaseMixin(ContextMixin):
         return ""
 
 
+class KeysetPaginationMixin:
+    """Paginate the object list of a ListView with keyset pagination."""
+
+    # The number of objects per page; defaults to the JOBBY_LIST_PAGE_SIZE
+    # setting:
+    page_size = None
+
+    def get_page_size(self):
+        return self.page_size or get_list_page_size()
+
+    def get_context_data(self, **kwargs):
+        paginator = KeysetPaginator(self.object_list, self.get_page_size())
+        page = paginator.page(self.request.GET.get(CURSOR_VAR))
+        ctx = super().get_context_data(object_list=page.object_list, **kwargs)
+        # The context object name is derived from the model of the queryset:
+        if context_object_name := self.get_context_object_name(self.object_list):
+            ctx[context_object_name] = page.object_list
+        ctx["keyset_page"] = page
+        query_dict = self.request.GET.copy()
+        query_dict.pop(CURSOR_VAR, None)
+        ctx["first_page_url"] = f"?{query_dict.urlencode()}"
+        if page.has_next:
+            query_dict[CURSOR_VAR] = page.next_cursor
+            ctx["next_page_url"] = f"?{query_dict.urlencode()}"
+        return ctx
+
+
 class SucheView(BaseMixin, FormView):
     site_title = "Suche"
     form_class = SucheForm
@@ -78,19 +115,45 @@ class SucheView(BaseMixin, FormView):
     def form_valid(self, form):
         ctx = self.get_context_data(form=form)
         try:
-            search_response = registry.search(**form.cleaned_data)
+            search_response = registry.search(page_size=PAGE_SIZE, **form.cleaned_data)
         except Exception as e:
             self._send_error_message(e)
         else:
+            self._send_unavailable_message(search_response)
             ctx.update(self.get_results_context(search_response))
             if search_response.has_results and search_response.result_count:
                 ctx.update(self.get_pagination_context(search_response.result_count))
+                self._prefetch_next_page(form, search_response.result_count)
             ctx["watchlist_toggle_url"] = reverse("watchlist_toggle")
         return self.render_to_response(ctx)
 
+    def _prefetch_next_page(self, form, result_count):
+        """
+        Fetch the results of the next page in the background, if there is a
+        next page.
+        """
+        page = form.cleaned_data.get("page") or 1
+        if page * PAGE_SIZE < result_count:
+            registry.prefetch(page_size=PAGE_SIZE, **{**form.cleaned_data, "page": page + 1})
+
     def _send_error_message(self, exception):  # pragma: no cover
         messages.add_message(self.request, level=messages.ERROR, message=f"Fehler bei der Suche: {exception}")
 
+    def _send_unavailable_message(self, search_response):
+        """Tell the user which APIs did not contribute to the search results."""
+        if search_response.timed_out:
+            messages.add_message(
+                self.request,
+                level=messages.WARNING,
+                message=f"Zeitüberschreitung bei der Suche: {', '.join(search_response.timed_out)}",
+            )
+        if search_response.failed:
+            messages.add_message(
+                self.request,
+                level=messages.WARNING,
+                message=f"Fehler bei der Suche: {', '.join(search_response.failed)}",
+            )
+
     def _get_watchlisted_ids(self, results):
         if results:
             queryset = WatchlistItem.objects.filter(stellenangebot__in=[r for r in results if r.pk])
@@ -104,6 +167,8 @@ class SucheView(BaseMixin, FormView):
         return {
             "results": [(result, result.pk in watchlist_item_ids) for result in results],
             "result_count": search_response.result_count,
+            # The data for adding the results to the watchlist:
+            "page_token": cache_hits(results),
         }
 
     def get_pagination_context(self, result_count, per_page=PAGE_SIZE):
@@ -225,14 +290,16 @@ class StellenangebotView(InlineFormsetMixin, BaseMixin, UpdateView):
             url = reverse("watchlist")
         else:
             url = reverse("stellenangebot_edit", kwargs={"id": self.object.pk})
-        return add_search_filters(context={"preserved_search_filters": self.get_search_filters(self.request)}, url=url)
+        return PreparedSearchFilters(self.get_search_filters(self.request)).add_to(url)
 
     def check_if_expired(self, request):
-        """Check whether the view's Stellenangebot is still available."""
-        if not self.object.expired and self.is_expired():
-            # The Stellenangebot has expired. Update the instance.
-            self.object.expired = True
-            self.object.save()
+        """
+        Check whether the view's Stellenangebot is still available.
+
+        Whether a Stellenangebot has expired is determined by the expiry checks
+        that run in the background (see jobby.expiry).
+        """
+        schedule_expiry_check()
         if self.object.expired:
             messages.add_message(
                 request,
@@ -241,29 +308,21 @@ class StellenangebotView(InlineFormsetMixin, BaseMixin, UpdateView):
             )
         return self.object.expired
 
-    def is_expired(self):
-        """
-        Return whether a request against the external job details url returns
-        a 404 response.
-
-        If the page can not be found, this implies that the Stellenangebot has
-        expired.
-        """
-        try:
-            return requests.get(self.get_details_url()).status_code == 404
-        except Exception:  # noqa
-            return False
-
 
 ################################################################################
 # Watchlist
 ################################################################################
 
 
-class WatchlistView(BaseMixin, ListView):
+class WatchlistView(BaseMixin, KeysetPaginationMixin, ListView):
     site_title = "Merkliste"
     template_name = "jobby/watchlist.html"
 
+    def get(self, request, *args, **kwargs):
+        # Look for expired Stellenangebote on the watchlists:
+        schedule_expiry_check()
+        return super().get(request, *args, **kwargs)
+
     def current_watchlist_name(self, request):
         return request.GET.get("watchlist_name", "default")
 
@@ -272,14 +331,15 @@ class WatchlistView(BaseMixin, ListView):
         return watchlist
 
     def get_queryset(self):
-        queryset = self.get_watchlist(self.request).get_stellenangebote()
+        # Only load the columns that the watchlist table renders:
+        queryset = self.get_watchlist(self.request).get_stellenangebote().only(*WATCHLIST_COLUMNS)
         search_form = WatchlistSearchForm(data=self.request.GET.dict())
         if search_form.is_valid():
             filters = search_form.get_filter_params(search_form.cleaned_data)
             q = filters.pop("q", None)
             queryset = queryset.filter(**filters)
             if q:
-                queryset = queryset.search(q)
+                queryset = queryset.text_search(q)
         return queryset
 
     def get_watchlist_names(self):
@@ -307,19 +367,23 @@ def watchlist_toggle(request):
     try:
         obj = Stellenangebot.objects.get(refnr=refnr)
     except Stellenangebot.DoesNotExist:  # noqa
-        # Create a new Stellenangebot instance from the POST data:
-        form = StellenangebotForm(data=request.POST)
+        # Create a new Stellenangebot instance from the data of the search hit
+        # stored for the results page. Do not wait for the description; fill
+        # it in later in the background instead.
+        data = get_cached_hit(request.POST.get("page_token", ""), refnr)
+        if data is None:
+            # The data of the results page has expired (or the page token is
+            # invalid).
+            return JsonResponse({"error": HITS_EXPIRED_MESSAGE}, status=400)
+        form = StellenangebotForm(data=data, fetch_beschreibung=False)
         if form.is_valid():
             obj = form.save()
+            if not obj.beschreibung:
+                schedule_description_fill(obj)
         else:
             return HttpResponseBadRequest()
 
-    if watchlist.on_watchlist(obj):
-        watchlist.remove_watchlist_item(obj)
-        on_watchlist = False
-    else:
-        watchlist.add_watchlist_item(obj)
-        on_watchlist = True
+    on_watchlist = watchlist.toggle_watchlist_item(obj)
     return JsonResponse({"on_watchlist": on_watchlist, "link_url": obj.as_url()})
 
 
@@ -357,54 +421,44 @@ def watchlist_remove_all(request):
         # exist.
         pass
     else:
-        for item in watchlist.items.all():
-            watchlist.remove_watchlist_item(item.stellenangebot)
+        watchlist.remove_all_watchlist_items()
     return JsonResponse({})
 
 
-# The id of the element on the job details page that contains the description:
-DETAILS_BESCHREIBUNG_ID = "detail-beschreibung-beschreibung"
-# The id of the link on the job details page that links to the external page
-# that contains the job description:
-EXTERNAL_BESCHREIBUNG_LINK = "detail-beschreibung-externe-url-btn"
-
-
-def _get_beschreibung(refnr):
+def _get_beschreibung(refnr, api_name=""):
     """
-    Fetch the job details page of the job with the given refnr, and return the
-    'beschreibung' part of the page.
+    Return the 'beschreibung' of the job with the given refnr.
+
+    If a Stellenangebot with that refnr and a description has been saved,
+    return the saved description. Otherwise, ask the API with the given name
+    for the description.
     """
-    # TODO: this should get the details URL from the registry
-    #   Maybe the API implementations (i.e. BundesagenturAPI) should be
-    #   responsible for finding the description.
-    response = requests.get(f"https://www.arbeitsagentur.de/jobsuche/jobdetail/{refnr}")
-    if not response.status_code == 200:
-        raise BadRequest
-
-    soup = BeautifulSoup(response.content, "html.parser")
-    if beschreibung := soup.find(id=DETAILS_BESCHREIBUNG_ID):
-        return "".join(str(elem) for elem in beschreibung.children)
-    elif extern_link := soup.find(id=EXTERNAL_BESCHREIBUNG_LINK):
-        return f"""Beschreibung auf externer Seite: <a href="{extern_link["href"]}">{extern_link.string}</a>"""
-    else:
-        return "Keine Beschreibung gegeben!"
+    saved = (
+        Stellenangebot.objects.filter(refnr=refnr)
+        .exclude(beschreibung="")
+        .values_list("beschreibung", flat=True)
+        .first()
+    )
+    if saved:
+        return saved
+    return registry.get_description(api_name, refnr)
 
 
 def get_beschreibung(request, refnr=""):
-    """Get the job description HTML from the details page on arbeitsagentur.de."""
+    """Get the job description HTML from the API given in the request."""
     try:
-        beschreibung = _get_beschreibung(refnr)
+        beschreibung = _get_beschreibung(refnr, request.GET.get("api", ""))
     except BadRequest:
         return HttpResponseBadRequest()
     return HttpResponse(beschreibung)
 
 
-class PapierkorbView(BaseMixin, ListView):
+class PapierkorbView(BaseMixin, KeysetPaginationMixin, ListView):
     site_title = "Papierkorb"
     template_name = "jobby/papierkorb.html"
 
     def get_queryset(self):
-        return Stellenangebot.objects.exclude(Exists(WatchlistItem.objects.filter(stellenangebot_id=OuterRef("id"))))
+        return Stellenangebot.objects.orphans().only(*PAPIERKORB_COLUMNS)
 
 
 @csrf_protect
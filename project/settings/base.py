@@ -19,6 +19,7 @@ INSTALLED_APPS = [
     "django.contrib.sessions",
     "django.contrib.messages",
     "django.contrib.staticfiles",
+    "django.contrib.postgres",
     "jobby",
     "django_bootstrap5",
     "mod_wsgi.server",
@@ -108,3 +109,45 @@ BOOTSTRAP5 = {
 FORMS_URLFIELD_ASSUME_HTTPS = True
 
 MEDIA_URL = "/media/"
+
+# Cache
+# https://docs.djangoproject.com/en/5.0/topics/cache/
+# The database cache is shared between all server processes. Create the cache
+# tables with: python manage.py createcachetable
+# The "search" cache stores the responses of the job search APIs; TIMEOUT is
+# the lifetime of a cached response (in seconds) and MAX_ENTRIES the number of
+# responses to keep. The "hits" cache stores the data of the search results of
+# the rendered results pages, for adding results to the watchlist. The
+# "descriptions" cache stores the job descriptions fetched from the job details
+# pages.
+
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.db.DatabaseCache",
+        "LOCATION": "jobby_cache",
+    },
+    "search": {
+        "BACKEND": "django.core.cache.backends.db.DatabaseCache",
+        "LOCATION": "jobby_search_cache",
+        "TIMEOUT": 600,
+        "OPTIONS": {"MAX_ENTRIES": 1000},
+    },
+    "hits": {
+        "BACKEND": "django.core.cache.backends.db.DatabaseCache",
+        "LOCATION": "jobby_hits_cache",
+        "TIMEOUT": 6 * 60 * 60,
+        "OPTIONS": {"MAX_ENTRIES": 2000},
+    },
+    "descriptions": {
+        "BACKEND": "django.core.cache.backends.db.DatabaseCache",
+        "LOCATION": "jobby_description_cache",
+        "TIMEOUT": 30 * 24 * 60 * 60,
+        "OPTIONS": {"MAX_ENTRIES": 5000},
+    },
+}
+
+# The minimum word similarity of a search term and a Stellenangebot for the
+# Stellenangebot to be included in the results of the watchlist search. The
+# database connections must set pg_trgm.word_similarity_threshold to this
+# value (see the "options" of the DATABASES setting).
+JOBBY_SEARCH_THRESHOLD = 0.2
@@ -18,6 +18,10 @@ DATABASES = {
         # This way, we don't have to create an extra user for the dev database.
         # https://www.postgresql.org/docs/current/auth-peer.html
         "USER": getpass.getuser(),
+        "OPTIONS": {
+            # The word similarity threshold used by the watchlist search:
+            "options": f"-c pg_trgm.word_similarity_threshold={JOBBY_SEARCH_THRESHOLD}",  # noqa
+        },
     }
 }
 
@@ -48,6 +48,10 @@ DATABASES = {
         "HOST": os.environ.get("DB_HOST", "localhost"),
         "PORT": os.environ.get("DB_PORT", 5432),
         "PASSWORD": password,
+        "OPTIONS": {
+            # The word similarity threshold used by the watchlist search:
+            "options": f"-c pg_trgm.word_similarity_threshold={JOBBY_SEARCH_THRESHOLD}",  # noqa
+        },
     }
 }
 
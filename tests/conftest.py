@@ -2,10 +2,20 @@ from datetime import datetime
 
 # noinspection PyPackageRequirements
 import pytest
+from django.core.cache import caches
 from django.utils.timezone import make_aware
 
 from tests.factories import StellenangebotFactory, WatchlistFactory, WatchlistItemFactory
 
+
+@pytest.fixture(autouse=True)
+def clear_caches():
+    """Clear the caches after each test."""
+    yield
+    for cache in caches.all():
+        cache.clear()
+
+
 ################################################################################
 # MODELS
 ################################################################################
@@ -36,6 +36,7 @@ ALWAYS_INSTALLED_APPS = [
     "django.contrib.sessions",
     "django.contrib.messages",
     "django.contrib.staticfiles",
+    "django.contrib.postgres",
     "jobby",
     "django_bootstrap5",
     "mizdb_inlines",
@@ -80,6 +81,10 @@ WSGI_APPLICATION = "project.wsgi.application"
 # Database
 # https://docs.djangoproject.com/en/5.0/ref/settings/#databases
 
+# The minimum word similarity of a search term and a Stellenangebot for the
+# Stellenangebot to be included in the results of the watchlist search:
+JOBBY_SEARCH_THRESHOLD = 0.2
+
 DATABASES = {
     "default": {
         "ENGINE": "django.db.backends.postgresql",
@@ -87,6 +92,10 @@ DATABASES = {
         # Utilize the peer authentication method to connect to the database.
         # This way, we don't have to create an extra user for the test database.
         "USER": getpass.getuser(),
+        "OPTIONS": {
+            # The word similarity threshold used by the watchlist search:
+            "options": f"-c pg_trgm.word_similarity_threshold={JOBBY_SEARCH_THRESHOLD}",
+        },
     }
 }
 
@@ -140,6 +149,27 @@ BOOTSTRAP5 = {
 # setting to True to opt into using 'https' as the new default scheme.
 FORMS_URLFIELD_ASSUME_HTTPS = True
 
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    },
+    "search": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "search",
+    },
+    "hits": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "hits",
+    },
+    "descriptions": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "descriptions",
+    },
+}
+
+# Do not check for expired Stellenangebote in the background during tests:
+JOBBY_EXPIRY_CHECK_INTERVAL = None
+
 STORAGES = {
     "default": {
         "BACKEND": "django.core.files.storage.InMemoryStorage",
@@ -0,0 +1,123 @@
+from unittest.mock import Mock, PropertyMock, patch
+
+import pytest
+from django.core.cache import cache
+from jobby.apis.auth import TokenManager
+
+
+@pytest.fixture
+def cache_key():
+    return "test:token"
+
+
+@pytest.fixture
+def expires_in():
+    """Return the lifetime of the tokens returned by the fetch_token mock."""
+    return 300
+
+
+@pytest.fixture
+def fetch_token_mock(expires_in):
+    return Mock(return_value=("new token", expires_in))
+
+
+@pytest.fixture
+def token_manager(cache_key, fetch_token_mock):
+    return TokenManager(cache_key, fetch_token_mock)
+
+
+class TestTokenManager:
+
+    def test_get_token(self, token_manager, fetch_token_mock):
+        """Assert that ``get_token`` fetches a token if there is none."""
+        assert token_manager.get_token() == "new token"
+        fetch_token_mock.assert_called_once()
+
+    def test_get_token_cached(self, token_manager, fetch_token_mock, cache_key):
+        """Assert that ``get_token`` returns the cached token if there is one."""
+        cache.set(cache_key, "cached token")
+        assert token_manager.get_token() == "cached token"
+        fetch_token_mock.assert_not_called()
+
+    def test_get_token_reuses_token(self, token_manager, fetch_token_mock):
+        """Assert that consecutive calls of ``get_token`` only fetch one token."""
+        token_manager.get_token()
+        token_manager.get_token()
+        fetch_token_mock.assert_called_once()
+
+    @pytest.mark.parametrize("expires_in", [300])
+    def test_refresh_timeout(self, token_manager, cache_key, expires_in):
+        """
+        Assert that ``refresh`` stores the token with a timeout that is shorter
+        than the token's lifetime.
+        """
+        cache_mock = Mock()
+        cache_mock.get.return_value = None
+        cache_mock.add.return_value = True
+        with patch.object(TokenManager, "cache", new=PropertyMock(return_value=cache_mock)):
+            token_manager.refresh()
+        cache_mock.set.assert_called_with(cache_key, "new token", expires_in - token_manager.leeway)
+
+    @pytest.mark.parametrize("expires_in", [0])
+    def test_refresh_timeout_minimum(self, token_manager, cache_key, expires_in):
+        """Assert that the timeout of a token is at least one second."""
+        cache_mock = Mock()
+        cache_mock.get.return_value = None
+        cache_mock.add.return_value = True
+        with patch.object(TokenManager, "cache", new=PropertyMock(return_value=cache_mock)):
+            token_manager.refresh()
+        cache_mock.set.assert_called_with(cache_key, "new token", 1)
+
+    def test_refresh_releases_lock(self, token_manager):
+        """Assert that ``refresh`` releases the lock after fetching the token."""
+        token_manager.refresh()
+        assert cache.get(token_manager.lock_key) is None
+
+    def test_refresh_releases_lock_on_error(self, token_manager, fetch_token_mock):
+        """Assert that ``refresh`` releases the lock if fetching the token fails."""
+        fetch_token_mock.side_effect = Exception
+        with pytest.raises(Exception):
+            token_manager.refresh()
+        assert cache.get(token_manager.lock_key) is None
+
+    def test_refresh_locked(self, token_manager, fetch_token_mock, cache_key):
+        """
+        Assert that ``refresh`` waits for the token of another process instead
+        of fetching a token itself, if the lock is held by that process.
+        """
+        cache.add(token_manager.lock_key, True)
+
+        def sleep(_seconds):
+            # The other process stores its token while this process waits.
+            cache.set(cache_key, "other token")
+
+        with patch("jobby.apis.auth.time.sleep", new=Mock(side_effect=sleep)):
+            assert token_manager.refresh() == "other token"
+        fetch_token_mock.assert_not_called()
+        # The lock belongs to the other process and must not be released:
+        assert cache.get(token_manager.lock_key)
+
+    def test_refresh_locked_wait_timeout(self, token_manager, fetch_token_mock):
+        """
+        Assert that ``refresh`` fetches a token itself if the process holding
+        the lock does not provide a token in time.
+        """
+        cache.add(token_manager.lock_key, True)
+        token_manager.lock_timeout = 0
+        assert token_manager.refresh() == "new token"
+        fetch_token_mock.assert_called_once()
+
+    def test_invalidate(self, token_manager, cache_key):
+        """Assert that ``invalidate`` removes the given token from the cache."""
+        cache.set(cache_key, "token")
+        token_manager.invalidate("token")
+        assert cache.get(cache_key) is None
+
+    def test_invalidate_not_current_token(self, token_manager, cache_key):
+        """
+        Assert that ``invalidate`` does not remove the cached token if it is
+        not the given token.
+        """
+        cache.set(cache_key, "newer token")
+        token_manager.invalidate("token")
+        assert cache.get(cache_key) == "newer token"
@@ -2,8 +2,19 @@ from unittest.mock import Mock, PropertyMock, patch
 
 # noinspection PyPackageRequirements
 import pytest
-from jobby.apis.bundesagentur_api import BundesagenturAPI, BundesagenturResponse
-from jobby.models import Stellenangebot
+import requests
+from django.core.exceptions import BadRequest
+from jobby.apis.bundesagentur_api import (
+    DETAILS_BESCHREIBUNG_ID,
+    BundesagenturAPI,
+    BundesagenturResponse,
+    _find_element,
+    _parse_details_page,
+    _parse_jobdetails,
+)
+from jobby.models import SearchHit, Stellenangebot
+
+from tests.factories import StellenangebotFactory
 
 pytestmark = [pytest.mark.django_db]
 
@@ -39,17 +50,268 @@ class TestBundesagenturAPI:
     def test_get_details_url(self, search_mock, api, refnr):
         assert api.get_details_url(refnr) == f"https://www.arbeitsagentur.de/jobsuche/jobdetail/{refnr}"
 
+    @pytest.fixture
+    def fetch_jwt_mock(self, api):
+        """Mock out the method that requests new tokens."""
+        with patch.object(api.token_manager, "fetch_token") as m:
+            m.side_effect = [("first token", 300), ("second token", 300)]
+            yield m
+
+    @pytest.fixture
+    def jobs_url(self):
+        return "https://rest.arbeitsagentur.de/jobboerse/jobsuche-service/pc/v4/app/jobs"
+
+    def test_get_jwt_reuses_token(self, api, fetch_jwt_mock):
+        """Assert that ``_get_jwt`` only requests a new token once."""
+        assert api._get_jwt() == "first token"
+        assert api._get_jwt() == "first token"
+        fetch_jwt_mock.assert_called_once()
+
+    def test_search_uses_cached_token(self, api, fetch_jwt_mock, requests_mock, jobs_url):
+        """Assert that consecutive searches use the same token."""
+        requests_mock.get(jobs_url, json={})
+        api._search(was="foo")
+        api._search(was="bar")
+        fetch_jwt_mock.assert_called_once()
+        assert all(r.headers["OAuthAccessToken"] == "first token" for r in requests_mock.request_history)
+
+    def test_search_unauthorized_retries_with_new_token(self, api, fetch_jwt_mock, requests_mock, jobs_url):
+        """
+        Assert that ``_search`` retries the search once with a new token if the
+        API rejected the token.
+        """
+        requests_mock.get(jobs_url, [{"status_code": 401}, {"status_code": 200, "json": {}}])
+        response = api._search(was="foo")
+        assert response.status_code == 200
+        assert [r.headers["OAuthAccessToken"] for r in requests_mock.request_history] == [
+            "first token",
+            "second token",
+        ]
+
+    def test_search_unauthorized_retries_once(self, api, fetch_jwt_mock, requests_mock, jobs_url):
+        """Assert that ``_search`` does not retry the search more than once."""
+        requests_mock.get(jobs_url, status_code=401)
+        response = api._search(was="foo")
+        assert response.status_code == 401
+        assert requests_mock.call_count == 2
+
+
+class TestGetDescription:
+
+    @pytest.fixture(autouse=True)
+    def fetch_jwt_mock(self, api):
+        with patch.object(api.token_manager, "fetch_token") as m:
+            m.side_effect = [("first token", 300), ("second token", 300)]
+            yield m
+
+    @pytest.fixture
+    def jobdetails_url(self, refnr):
+        # The refnr "789-456-1230", encoded with base64:
+        return "https://rest.arbeitsagentur.de/jobboerse/jobsuche-service/pc/v2/jobdetails/Nzg5LTQ1Ni0xMjMw"
+
+    @pytest.fixture
+    def details_url(self, refnr):
+        return f"https://www.arbeitsagentur.de/jobsuche/jobdetail/{refnr}"
+
+    def test_get_jobdetails_url(self, api, refnr, jobdetails_url):
+        assert api.get_jobdetails_url(refnr) == jobdetails_url
+
+    def test_get_description(self, api, refnr, requests_mock, jobdetails_url):
+        """
+        Assert that ``get_description`` returns the description from the job
+        details endpoint, requested with the cached token.
+        """
+        requests_mock.get(jobdetails_url, json={"stellenbeschreibung": "Beschreibung"})
+        assert api.get_description(refnr) == "<p>Beschreibung</p>"
+        assert requests_mock.last_request.headers["OAuthAccessToken"] == "first token"
+
+    def test_get_description_stored(self, api, refnr, requests_mock, jobdetails_url):
+        """Assert that repeated calls do not request the job details again."""
+        requests_mock.get(jobdetails_url, json={"stellenbeschreibung": "Beschreibung"})
+        api.get_description(refnr)
+        assert api.get_description(refnr) == "<p>Beschreibung</p>"
+        assert requests_mock.call_count == 1
+
+    def test_get_description_unauthorized_retries_with_new_token(self, api, refnr, requests_mock, jobdetails_url):
+        """
+        Assert that the job details are requested again with a new token if
+        the API rejected the token.
+        """
+        requests_mock.get(
+            jobdetails_url,
+            [{"status_code": 401}, {"status_code": 200, "json": {"stellenbeschreibung": "Beschreibung"}}],
+        )
+        assert api.get_description(refnr) == "<p>Beschreibung</p>"
+        assert [r.headers["OAuthAccessToken"] for r in requests_mock.request_history] == [
+            "first token",
+            "second token",
+        ]
+
+    def test_get_description_falls_back_to_details_page(self, api, refnr, requests_mock, jobdetails_url, details_url):
+        """
+        Assert that ``get_description`` uses the job details page if the job
+        details endpoint does not respond with the job details.
+        """
+        requests_mock.get(jobdetails_url, status_code=404)
+        requests_mock.get(details_url, text=f'<div id="{DETAILS_BESCHREIBUNG_ID}"><p>Beschreibung</p></div>')
+        assert api.get_description(refnr) == "<p>Beschreibung</p>"
+
+    def test_get_description_invalid_json_falls_back(self, api, refnr, requests_mock, jobdetails_url, details_url):
+        """
+        Assert that ``get_description`` uses the job details page if the job
+        details endpoint responds with invalid data.
+        """
+        requests_mock.get(jobdetails_url, text="<html>Wartungsarbeiten</html>")
+        requests_mock.get(details_url, text=f'<div id="{DETAILS_BESCHREIBUNG_ID}"><p>Beschreibung</p></div>')
+        assert api.get_description(refnr) == "<p>Beschreibung</p>"
+
+    def test_get_description_token_error_falls_back(
+        self, api, refnr, requests_mock, jobdetails_url, details_url, fetch_jwt_mock
+    ):
+        """
+        Assert that ``get_description`` uses the job details page if no token
+        could be fetched.
+        """
+        fetch_jwt_mock.side_effect = requests.ConnectionError
+        requests_mock.get(details_url, text=f'<div id="{DETAILS_BESCHREIBUNG_ID}"><p>Beschreibung</p></div>')
+        assert api.get_description(refnr) == "<p>Beschreibung</p>"
+
+    def test_get_description_bad_request(self, api, refnr, requests_mock, jobdetails_url, details_url):
+        """Assert that ``get_description`` raises BadRequest if both sources fail."""
+        requests_mock.get(jobdetails_url, status_code=404)
+        requests_mock.get(details_url, status_code=requests.codes.server_error)
+        with pytest.raises(BadRequest):
+            api.get_description(refnr)
+
+
+class TestParseJobdetails:
+
+    def test_parse_jobdetails(self):
+        """Assert that the plain text description is returned as escaped HTML."""
+        text = '{"stellenbeschreibung": "Wir suchen:\\n<Entwickler>\\n\\nBewerben!"}'
+        assert _parse_jobdetails(text) == "<p>Wir suchen:<br>&lt;Entwickler&gt;</p>\n\n<p>Bewerben!</p>"
+
+    @pytest.mark.parametrize("url_key", ["externeUrl", "allianzpartnerUrl"])
+    def test_parse_jobdetails_externe_url(self, url_key):
+        text = f'{{"{url_key}": "www.foobar.com"}}'
+        assert _parse_jobdetails(text) == (
+            """Beschreibung auf externer Seite: <a href="www.foobar.com">www.foobar.com</a>"""
+        )
+
+    def test_parse_jobdetails_no_beschreibung(self):
+        assert _parse_jobdetails("{}") == "Keine Beschreibung gegeben!"
+
+    @pytest.mark.parametrize("text", ["<html></html>", "[]"])
+    def test_parse_jobdetails_invalid(self, text):
+        """Assert that a BadRequest is raised for data that is not a JSON object."""
+        with pytest.raises(BadRequest):
+            _parse_jobdetails(text)
+
+
+class TestParseDetailsPage:
+
+    @pytest.fixture
+    def beschreibung_html(self):
+        return """<p>A paragraph</p><ul><li>Some list item</li><li>Another list item</li></ul>"""
+
+    def test_parse_details_page(self, beschreibung_html):
+        html = f"""<div>This is not the beschreibung</div><p id="{DETAILS_BESCHREIBUNG_ID}">{beschreibung_html}</p>"""
+        assert _parse_details_page(html) == beschreibung_html
+
+    def test_parse_details_page_no_beschreibung(self, beschreibung_html):
+        """
+        Assert that a short message is returned if the job details page does
+        not contain an element with the 'beschreibung id'.
+        """
+        assert _parse_details_page(f'<p id="foo">{beschreibung_html}</p>') == "Keine Beschreibung gegeben!"
+
+    def test_parse_details_page_externe_url(self):
+        """Assert that links to external descriptions are also checked."""
+        html = """<div id="detail-beschreibung-extern">
+                <a id="detail-beschreibung-externe-url-btn" href="www.foobar.com">www.foobar.com</a>
+                </div>"""
+        assert _parse_details_page(html) == (
+            """Beschreibung auf externer Seite: <a href="www.foobar.com">www.foobar.com</a>"""
+        )
+
+
+class TestFindElement:
+
+    @pytest.mark.parametrize(
+        "html",
+        [
+            '<div id="foo"><p>Foo</p></div>',
+            "<div id='foo'><p>Foo</p></div>",
+            "<div id=foo><p>Foo</p></div>",
+            '<div class="bar"\n     id = "foo"><p>Foo</p></div>',
+        ],
+    )
+    def test_find_element(self, html):
+        element = _find_element(f"<html><body><p>Other</p>{html}<p>After</p></body></html>", "foo")
+        assert element is not None
+        assert element.decode_contents() == "<p>Foo</p>"
+
+    @pytest.mark.parametrize(
+        "html",
+        ['<div id="foobar"></div>', '<div data-id="foo"></div>', '<div class="id-foo"></div>', "<p>id=foo</p>"],
+    )
+    def test_find_element_not_found(self, html):
+        assert _find_element(html, "foo") is None
+
+    def test_find_element_no_match_not_parsed(self):
+        """Assert that the document is not parsed if it does not contain the id."""
+        with patch("jobby.apis.bundesagentur_api.BeautifulSoup") as soup_mock:
+            assert _find_element("<html><body><p>Foo</p></body></html>", "foo") is None
+        soup_mock.assert_not_called()
+
+    def test_find_element_only_parses_element(self):
+        """
+        Assert that only the part of the document that contains the element is
+        parsed.
+        """
+        html = '<html><head><title>Foo</title></head><body><div id="foo">Foo</div></body></html>'
+        with patch("jobby.apis.bundesagentur_api.BeautifulSoup") as soup_mock:
+            _find_element(html, "foo")
+        assert soup_mock.call_args.args[0] == '<div id="foo">Foo</div>'
+
+    @pytest.mark.parametrize(
+        "html, expected",
+        [
+            (
+                '<div id="foo"><div>Foo</div><p>Bar</p></div><div>After</div>',
+                '<div id="foo"><div>Foo</div><p>Bar</p></div>',
+            ),
+            ('<DIV id="foo">Foo</Div><div>After</div>', '<DIV id="foo">Foo</Div>'),
+            ('<img id="foo" src="foo.png"><div>After</div>', '<img id="foo" src="foo.png">'),
+            ('<span id="foo"/><div>After</div>', '<span id="foo"/>'),
+            ('<div id="foo"><p>Foo</p>', '<div id="foo"><p>Foo</p>'),
+        ],
+    )
+    def test_find_element_stops_at_end_tag(self, html, expected):
+        """
+        Assert that the part of the document that is parsed ends with the end
+        tag of the element.
+        """
+        with patch("jobby.apis.bundesagentur_api.BeautifulSoup") as soup_mock:
+            _find_element(f"<p>Before</p>{html}", "foo")
+        assert soup_mock.call_args.args[0] == expected
+
+    def test_find_element_nested_element(self):
+        """Assert that nested elements with the same name are part of the element."""
+        element = _find_element('<div id="foo"><div>Foo</div><p>Bar</p></div><p>After</p>', "foo")
+        assert element.decode_contents() == "<div>Foo</div><p>Bar</p>"
+
 
 class TestBundesagenturResponse:
 
     def test_get_results(self, search_response):
         """
-        Assert that ``_get_results`` returns the expected Stellenangebot
-        instances.
+        Assert that ``_get_results`` returns search hits for the results that
+        have not been saved.
         """
         results = search_response._get_results(search_response.data)
         assert len(results) == 1
-        assert isinstance(results[0], Stellenangebot)
+        assert isinstance(results[0], SearchHit)
         assert results[0].titel == "Software Entwickler"
 
     def test_results_api_set(self, search_response):
@@ -94,16 +356,35 @@ class TestBundesagenturResponse:
 
     def test_get_results_updates_existing(self, search_response, stellenangebot):
         """
-        Assert that ``_get_results`` calls the function that updates existing
-        Stellenangebot instances.
+        Assert that ``_get_results`` updates existing Stellenangebot instances
+        with the data of the search results.
         """
-        with patch("jobby.apis.bundesagentur_api._update_stellenangebot") as update_mock:
-            search_response._get_results(search_response.data)
-        update_mock.assert_called()
+        results = search_response._get_results(search_response.data)
+        assert results == [stellenangebot]
+        assert results[0].titel == "Software Entwickler"
+        stellenangebot.refresh_from_db()
+        assert stellenangebot.titel == "Software Entwickler"
+
+    def test_get_results_same_fingerprint_no_update(self, search_response, stellenangebot, django_assert_num_queries):
+        """
+        Assert that ``_get_results`` does not update existing Stellenangebot
+        instances whose fingerprint matches the fingerprint of the result.
+        """
+        (result,) = search_response._process_results(search_response.data["stellenangebote"])
+        Stellenangebot.objects.filter(pk=stellenangebot.pk).update(fingerprint=result.fingerprint, titel="Old")
+        with django_assert_num_queries(1):
+            (result,) = search_response._get_results(search_response.data)
+        assert result.titel == "Old"
+
+    def test_get_results_stores_fingerprint(self, search_response, stellenangebot):
+        """Assert that ``_get_results`` stores the fingerprint of updated instances."""
+        search_response._get_results(search_response.data)
+        stellenangebot.refresh_from_db()
+        assert stellenangebot.fingerprint
 
     def test_process_results(self, search_response):
         """
-        Assert that ``_process_results`` returns the expected Stellenangebot
+        Assert that ``_process_results`` returns the expected SearchHit
         instances.
         """
         search_result = {
@@ -122,7 +403,7 @@ class TestBundesagenturResponse:
                 results = search_response._process_results([search_result])
                 assert len(results) == 1
                 result = results[0]
-                assert isinstance(result, Stellenangebot)
+                assert isinstance(result, SearchHit)
                 assert result.titel == search_result["titel"]
                 assert result.refnr == search_result["refnr"]
                 assert result.beruf == search_result["beruf"]
@@ -134,6 +415,20 @@ class TestBundesagenturResponse:
                 assert result.modified == "2024-06-06"
                 make_aware_mock.assert_called_with(search_result["modifikationsTimestamp"])
                 assert result.externe_url == "www.foobar.com"
+                assert result.fingerprint
+
+    def test_process_results_fingerprint(self, search_response):
+        """
+        Assert that ``_process_results`` sets a fingerprint that only changes
+        if the data of the search result changes.
+        """
+        search_result = {"titel": "Software Developer", "modifikationsTimestamp": "2024-05-22T09:00:15.099"}
+        first, second = search_response._process_results([search_result, search_result])
+        assert first.fingerprint == second.fingerprint
+        (changed,) = search_response._process_results(
+            [{**search_result, "modifikationsTimestamp": "2024-05-23T09:00:15.099"}]
+        )
+        assert changed.fingerprint != first.fingerprint
 
     @pytest.mark.parametrize(
         "ort_data, expected",
@@ -146,3 +441,40 @@ class TestBundesagenturResponse:
     def test_parse_arbeitsort(self, search_response, ort_data, expected):
         """Assert that ``_parse_arbeitsort`` returns the expected strings."""
         assert search_response._parse_arbeitsort(ort_data) == expected
+
+
+class TestBundesagenturResponseQueryCount:
+
+    @pytest.fixture
+    def existing_count(self):
+        """Return the number of search results that already exist in the database."""
+        return 1
+
+    @pytest.fixture
+    def search_results(self, existing_count):
+        """Create search results for Stellenangebot instances that already exist."""
+        results = []
+        for i in range(existing_count):
+            existing = StellenangebotFactory(titel="Old")
+            results.append({"titel": f"New {i}", "refnr": existing.refnr, "eintrittsdatum": "2024-07-01"})
+        return results
+
+    @pytest.mark.parametrize("existing_count", [1, 5, 20])
+    def test_get_results_query_count(self, search_response, existing_count, django_assert_num_queries):
+        """
+        Assert that the number of queries made by ``_get_results`` does not
+        depend on the number of existing Stellenangebot instances.
+        """
+        with django_assert_num_queries(2):  # one SELECT and one UPDATE
+            results = search_response._get_results(search_response.data)
+        assert len(results) == existing_count
+        assert not Stellenangebot.objects.filter(titel="Old").exists()
+
+    def test_get_results_no_changes_no_update(self, search_response, stellenangebot, django_assert_num_queries):
+        """
+        Assert that ``_get_results`` does not make an UPDATE query if the
+        search results have not changed.
+        """
+        search_response._get_results(search_response.data)
+        with django_assert_num_queries(1):
+            search_response._get_results(search_response.data)
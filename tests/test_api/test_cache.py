@@ -0,0 +1,131 @@
+import pytest
+from django.core.cache import caches
+from jobby.apis.bundesagentur_api import BundesagenturAPI, BundesagenturResponse
+from jobby.apis.cache import (
+    CachedResponse,
+    cache_hits,
+    cache_response,
+    get_cached_hit,
+    get_cached_response,
+    get_hits_cache,
+    get_search_cache,
+    make_cache_key,
+)
+from jobby.models import SearchHit
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def api():
+    return BundesagenturAPI()
+
+
+@pytest.fixture
+def search_response(response_mock, api):
+    return BundesagenturResponse(response_mock, api)
+
+
+class TestMakeCacheKey:
+
+    def test_make_cache_key_order(self):
+        """Assert that the order of the parameters does not affect the key."""
+        assert make_cache_key("api", {"was": "foo", "page": 1}) == make_cache_key("api", {"page": 1, "was": "foo"})
+
+    def test_make_cache_key_ignores_none(self):
+        """Assert that parameters with None values do not affect the key."""
+        assert make_cache_key("api", {"was": "foo", "wo": None}) == make_cache_key("api", {"was": "foo"})
+
+    @pytest.mark.parametrize(
+        "other_params", [{"was": "bar"}, {"was": "foo", "page": 2}, {"was": "foo", "zeitarbeit": False}]
+    )
+    def test_make_cache_key_different_params(self, other_params):
+        """Assert that different parameters result in different keys."""
+        assert make_cache_key("api", {"was": "foo"}) != make_cache_key("api", other_params)
+
+    def test_make_cache_key_different_api(self):
+        """Assert that the searches of different APIs have different keys."""
+        assert make_cache_key("foo", {"was": "foo"}) != make_cache_key("bar", {"was": "foo"})
+
+
+class TestSearchCache:
+
+    def test_get_cached_response_not_cached(self, api):
+        assert get_cached_response(api, {"was": "foo"}) is None
+
+    def test_get_cached_response(self, api, search_response):
+        """
+        Assert that ``get_cached_response`` returns a response of the API's
+        response class with the data of the cached response.
+        """
+        cache_response(api, {"was": "foo"}, search_response)
+        cached = get_cached_response(api, {"was": "foo"})
+        assert isinstance(cached, BundesagenturResponse)
+        assert isinstance(cached.response, CachedResponse)
+        assert cached.status_code == 200
+        assert cached.data == search_response.data
+        assert [r.refnr for r in cached.results] == [r.refnr for r in search_response.results]
+
+    @pytest.mark.parametrize("response_status_code", [400])
+    def test_cache_response_not_ok(self, api, search_response, response_status_code):
+        """Assert that ``cache_response`` does not cache unsuccessful responses."""
+        cache_response(api, {"was": "foo"}, search_response)
+        assert get_cached_response(api, {"was": "foo"}) is None
+
+    def test_get_search_cache(self):
+        """Assert that the responses are stored in the 'search' cache."""
+        assert get_search_cache() is caches["search"]
+
+    def test_get_search_cache_default(self, settings):
+        """
+        Assert that ``get_search_cache`` falls back to the default cache if
+        there is no 'search' cache.
+        """
+        settings.CACHES = {"default": settings.CACHES["default"]}
+        assert get_search_cache() is caches["default"]
+
+
+class TestCacheHits:
+
+    @pytest.fixture
+    def hits(self):
+        return [SearchHit(refnr="1", titel="Eins"), SearchHit(refnr="2", titel="Zwei", arbeitsort="Dortmund")]
+
+    def test_cache_hits(self, hits):
+        page_token = cache_hits(hits)
+        assert get_cached_hit(page_token, "1") == {"titel": "Eins", "refnr": "1"}
+        assert get_cached_hit(page_token, "2") == {"titel": "Zwei", "refnr": "2", "arbeitsort": "Dortmund"}
+
+    def test_cache_hits_saved_results(self, stellenangebot):
+        """
+        Assert that only the search hit data of saved results is stored, and
+        not the data added by the user.
+        """
+        stellenangebot.notizen = "Notiz"
+        page_token = cache_hits([stellenangebot])
+        data = get_cached_hit(page_token, stellenangebot.refnr)
+        assert data["titel"] == stellenangebot.titel
+        assert "notizen" not in data
+        assert "id" not in data
+
+    def test_cache_hits_same_token(self, hits):
+        """Assert that the same hits are stored under the same token."""
+        assert cache_hits(hits) == cache_hits(list(hits))
+        assert cache_hits(hits) != cache_hits(hits[:1])
+
+    def test_get_hits_cache(self, hits, settings):
+        """
+        Assert that the hits are stored in the 'hits' cache, apart from the
+        search responses, or in the default cache if there is no 'hits' cache.
+        """
+        assert get_hits_cache() is caches["hits"]
+        cache_hits(hits)
+        assert not caches["search"]._cache
+        settings.CACHES = {"default": settings.CACHES["default"]}
+        assert get_hits_cache() is caches["default"]
+
+    def test_get_cached_hit_unknown(self, hits):
+        page_token = cache_hits(hits)
+        assert get_cached_hit(page_token, "3") is None
+        assert get_cached_hit("foo", "1") is None
+        assert get_cached_hit("", "1") is None
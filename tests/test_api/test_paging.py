@@ -0,0 +1,82 @@
+from unittest.mock import Mock
+
+import pytest
+from jobby.apis.paging import PagedSearchResponse, get_api_pages, get_api_params
+
+
+@pytest.mark.parametrize(
+    "page, page_size, api_page_size, expected_pages, expected_offset",
+    [
+        (1, 100, 50, [1, 2], 0),
+        (2, 100, 50, [3, 4], 0),
+        (1, 50, 100, [1], 0),
+        (2, 50, 100, [1], 50),
+        (3, 50, 100, [2], 0),
+        (2, 100, 30, [4, 5, 6, 7], 10),
+        (1, 100, 100, [1], 0),
+    ],
+)
+def test_get_api_pages(page, page_size, api_page_size, expected_pages, expected_offset):
+    """Assert that ``get_api_pages`` returns the API pages that cover the page."""
+    pages, offset = get_api_pages(page, page_size, api_page_size)
+    assert list(pages) == expected_pages
+    assert offset == expected_offset
+
+
+def test_get_api_params():
+    """Assert that ``get_api_params`` returns the parameters for each API page."""
+    params, offset = get_api_params({"was": "foo", "page": 2, "size": 50}, 100)
+    assert params == [{"was": "foo", "page": 3, "size": 50}, {"was": "foo", "page": 4, "size": 50}]
+    assert offset == 0
+
+
+def test_get_api_params_no_size():
+    """Assert that the API pages have the page size if no size is given."""
+    params, offset = get_api_params({"was": "foo"}, 100)
+    assert params == [{"was": "foo", "page": 1, "size": 100}]
+
+
+def get_response_mock(refnrs, status_code=200, result_count=100):
+    return Mock(
+        results=[Mock(refnr=refnr) for refnr in refnrs],
+        status_code=status_code,
+        result_count=result_count,
+    )
+
+
+class TestPagedSearchResponse:
+
+    def test_results(self):
+        """Assert that the results of the pages are merged in order."""
+        response = PagedSearchResponse([get_response_mock(["1", "2"]), get_response_mock(["3", "4"])], 0, 4)
+        assert [r.refnr for r in response.results] == ["1", "2", "3", "4"]
+
+    def test_results_offset(self):
+        """Assert that only the results of the page are returned."""
+        response = PagedSearchResponse([get_response_mock(["1", "2", "3"]), get_response_mock(["4", "5", "6"])], 1, 4)
+        assert [r.refnr for r in response.results] == ["2", "3", "4", "5"]
+
+    def test_results_dedupe(self):
+        """Assert that results that show up on more than one page are removed."""
+        response = PagedSearchResponse([get_response_mock(["1", "2"]), get_response_mock(["2", "3"])], 0, 4)
+        assert [r.refnr for r in response.results] == ["1", "2", "3"]
+
+    def test_results_without_refnr_are_kept(self):
+        """Assert that results without a refnr are not removed as duplicates."""
+        response = PagedSearchResponse([get_response_mock(["", ""])], 0, 2)
+        assert len(response.results) == 2
+
+    def test_results_failed_page(self):
+        """Assert that the results of pages after a failed page are ignored."""
+        responses = [
+            get_response_mock(["1", "2"]),
+            get_response_mock([], status_code=500),
+            get_response_mock(["5", "6"]),
+        ]
+        response = PagedSearchResponse(responses, 0, 6)
+        assert [r.refnr for r in response.results] == ["1", "2"]
+
+    def test_result_count(self):
+        """Assert that the result count is taken from the first page."""
+        response = PagedSearchResponse([get_response_mock([], result_count=42), get_response_mock([])], 0, 2)
+        assert response.result_count == 42
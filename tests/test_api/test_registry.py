@@ -1,8 +1,11 @@
+import threading
 from unittest.mock import Mock, PropertyMock, create_autospec, patch
 
 import pytest
+from django.core.exceptions import BadRequest
 from jobby.apis.base import BaseAPI, SearchResponse
 from jobby.apis.registry import APIRegistry, RegistryResponse
+from jobby.models import SearchHit
 
 pytestmark = [pytest.mark.django_db]
 
@@ -27,6 +30,7 @@ def get_search_response_mock(search_results, status_code, result_count):
     type(m).results = PropertyMock(return_value=search_results)
     type(m).status_code = PropertyMock(return_value=status_code)
     type(m).result_count = PropertyMock(return_value=result_count)
+    m.data = {"results": search_results}
     return m
 
 
@@ -34,6 +38,7 @@ def get_api_mock(search_response_mock, api_name):
     m = create_autospec(BaseAPI)
     m.search.return_value = search_response_mock
     m.name = api_name
+    m.response_class = Mock()
     return m
 
 
@@ -161,10 +166,47 @@ class TestAPIRegistry:
 
     @pytest.mark.parametrize("api_one", [Mock()])
     def test_search_api_raises_exception(self, registry, set_apis, api_one, response_api_two, registry_response_mock):
-        """Assert that ``search`` ignores exceptions raised by an API."""
+        """
+        Assert that ``search`` reports APIs that raised an exception as failed
+        and still returns the responses of the other APIs.
+        """
         api_one.search.side_effect = Exception
         registry.search(foo="bar")
-        registry_response_mock.assert_called_with(response_api_two)
+        registry_response_mock.assert_called_with(response_api_two, timed_out=[], failed=[api_one.name])
+
+    def test_search_api_times_out(self, registry, set_apis, api_one, name_api_one, response_api_two, settings):
+        """
+        Assert that ``search`` reports APIs that did not respond in time as
+        timed out and still returns the responses of the other APIs.
+        """
+        settings.JOBBY_SEARCH_TIMEOUT = 0.1
+        event = threading.Event()
+        api_one.search.side_effect = lambda **kwargs: event.wait(5)
+        try:
+            registry_response = registry.search(foo="bar")
+        finally:
+            event.set()
+        assert registry_response.timed_out == [name_api_one]
+        assert registry_response.search_responses == (response_api_two,)
+
+    def test_search_runs_concurrently(self, registry, set_apis, api_one, api_two, response_api_one, response_api_two):
+        """Assert that ``search`` calls the search methods of the APIs concurrently."""
+        # Each search waits for the other one to start. If the searches ran
+        # one after another, the barrier would raise a BrokenBarrierError.
+        barrier = threading.Barrier(2, timeout=5)
+
+        def search(response):
+            def inner(**kwargs):
+                barrier.wait()
+                return response
+
+            return inner
+
+        api_one.search.side_effect = search(response_api_one)
+        api_two.search.side_effect = search(response_api_two)
+        registry_response = registry.search(foo="bar")
+        assert registry_response.search_responses == (response_api_one, response_api_two)
+        assert not registry_response.failed
 
     def test_search_aggregates_results(self, registry, set_apis, results_api_one, results_api_two):
         """Assert that ``search`` returns the results of every response."""
@@ -173,6 +215,119 @@ class TestAPIRegistry:
         assert set(results_api_one).issubset(registry_response.results)
         assert set(results_api_two).issubset(registry_response.results)
 
+    def test_search_caches_responses(self, registry, set_apis, api_one, api_two):
+        """
+        Assert that ``search`` uses the cached responses for a search with the
+        same parameters.
+        """
+        registry.search(foo="bar", page=1)
+        registry.search(page=1, foo="bar", baz=None)
+        api_one.search.assert_called_once()
+        api_two.search.assert_called_once()
+        api_one.response_class.assert_called_once()
+        assert api_one.response_class.call_args.args[0].json() == {"results": ["foo"]}
+
+    def test_search_caches_responses_different_params(self, registry, set_apis, api_one):
+        """Assert that ``search`` does not use cached responses of other searches."""
+        registry.search(foo="bar", page=1)
+        registry.search(foo="bar", page=2)
+        assert api_one.search.call_count == 2
+
+    def test_search_page_size(self, registry, api_one):
+        """
+        Assert that ``search`` requests every API page that covers the page of
+        the given page size.
+        """
+        registry._apis = [api_one]
+        api_one.search.side_effect = lambda **params: get_search_response_mock(
+            [SearchHit(refnr=f"{params['page']}-{i}") for i in range(params["size"])], 200, 101
+        )
+        registry_response = registry.search(page_size=4, page=2, size=2, foo="bar")
+        assert api_one.search.call_count == 2
+        api_one.search.assert_any_call(foo="bar", page=3, size=2)
+        api_one.search.assert_any_call(foo="bar", page=4, size=2)
+        assert [r.refnr for r in registry_response.search_responses[0].results] == ["3-0", "3-1", "4-0", "4-1"]
+        assert registry_response.result_count == 101
+
+    def test_search_page_size_fetches_pages_concurrently(self, registry, api_one, response_api_one):
+        """Assert that ``search`` requests the API pages of a page concurrently."""
+        barrier = threading.Barrier(2, timeout=5)
+
+        def search(**kwargs):
+            barrier.wait()
+            return response_api_one
+
+        registry._apis = [api_one]
+        api_one.search.side_effect = search
+        registry_response = registry.search(page_size=100, size=50)
+        assert api_one.search.call_count == 2
+        assert not registry_response.failed
+
+    def test_search_page_size_page_fails(self, registry, set_apis, api_one, name_api_one, response_api_two):
+        """
+        Assert that an API is reported as failed if the requests for its pages
+        raise an exception.
+        """
+        api_one.search.side_effect = Exception
+        registry_response = registry.search(page_size=100, size=50)
+        assert registry_response.failed == [name_api_one]
+        assert len(registry_response.search_responses) == 1
+        assert registry_response.search_responses[0].search_responses == [response_api_two, response_api_two]
+
+    @pytest.mark.parametrize("status_code_api_one", [400])
+    def test_search_does_not_cache_failed_responses(self, registry, set_apis, api_one, api_two):
+        """Assert that ``search`` does not cache responses that were not ok."""
+        registry.search(foo="bar")
+        registry.search(foo="bar")
+        assert api_one.search.call_count == 2
+        api_two.search.assert_called_once()
+
+    def test_prefetch(self, registry, set_apis, api_one, api_two):
+        """Assert that ``prefetch`` runs the search in the background."""
+        with patch("jobby.apis.registry.background.submit") as submit_mock:
+            assert registry.prefetch(foo="bar")
+        submit_mock.assert_called_with(registry.search, foo="bar")
+
+    def test_prefetch_caches_responses(self, registry, set_apis, api_one):
+        """
+        Assert that a search with the parameters of a prefetch is served from
+        the cache.
+        """
+        assert registry.prefetch(foo="bar", page=2)
+        # Wait for the prefetch to finish:
+        for _ in range(registry.max_prefetches):
+            assert registry._prefetch_semaphore.acquire(timeout=5)
+        registry.search(foo="bar", page=2)
+        api_one.search.assert_called_once()
+
+    def test_prefetch_limit(self, registry, set_apis, api_one):
+        """
+        Assert that ``prefetch`` does not start more prefetches than
+        ``max_prefetches``, and starts prefetches again when a running
+        prefetch is done.
+        """
+        registry._prefetch_semaphore = threading.BoundedSemaphore(1)
+        event = threading.Event()
+        api_one.search.side_effect = lambda **kwargs: event.wait(5)
+        try:
+            assert registry.prefetch(foo="bar")
+            assert not registry.prefetch(foo="baz")
+        finally:
+            event.set()
+        # Wait for the first prefetch to release the semaphore:
+        assert registry._prefetch_semaphore.acquire(timeout=5)
+        registry._prefetch_semaphore.release()
+        with patch("jobby.apis.registry.background.submit"):
+            assert registry.prefetch(foo="baz")
+
+    def test_prefetch_submit_fails(self, registry):
+        """Assert that ``prefetch`` releases the semaphore if submitting fails."""
+        with patch("jobby.apis.registry.background.submit", new=Mock(side_effect=RuntimeError)):
+            with pytest.raises(RuntimeError):
+                registry.prefetch(foo="bar")
+        for _ in range(registry.max_prefetches):
+            assert registry._prefetch_semaphore.acquire(blocking=False)
+
     def test_get_details_url(self, registry, set_apis, refnr, name_api_two, api_one, api_two):
         """
         Assert ``get_details_url`` calls the get_details_url method of the API
@@ -182,6 +337,35 @@ class TestAPIRegistry:
         api_two.get_details_url.assert_called_with(refnr)
         api_one.get_details_url.assert_not_called()
 
+    def test_get_description(self, registry, set_apis, refnr, name_api_two, api_one, api_two):
+        """
+        Assert that ``get_description`` returns the description provided by
+        the API with the given name.
+        """
+        api_two.get_description.return_value = "Beschreibung"
+        assert registry.get_description(name_api_two, refnr) == "Beschreibung"
+        api_two.get_description.assert_called_with(refnr)
+        api_one.get_description.assert_not_called()
+
+    def test_get_description_unknown_api(self, registry, set_apis, refnr, api_one, api_two):
+        """
+        Assert that ``get_description`` asks each API in turn if there is no
+        API with the given name.
+        """
+        api_one.get_description.side_effect = BadRequest
+        api_two.get_description.return_value = "Beschreibung"
+        assert registry.get_description("", refnr) == "Beschreibung"
+        api_one.get_description.assert_called_with(refnr)
+
+    def test_get_description_not_found(self, registry, set_apis, refnr, name_api_one, api_one):
+        """
+        Assert that ``get_description`` raises a BadRequest if no API could
+        provide the description.
+        """
+        api_one.get_description.side_effect = BadRequest
+        with pytest.raises(BadRequest):
+            registry.get_description(name_api_one, refnr)
+
 
 class TestRegistryResponse:
 
@@ -0,0 +1,31 @@
+from unittest.mock import Mock, patch
+
+import pytest
+from jobby import background
+
+
+class TestSubmit:
+
+    def test_submit(self):
+        """Assert that ``submit`` runs the given function in another thread."""
+        func = Mock(return_value="foo")
+        future = background.submit(func, 1, bar=2)
+        assert future.result(timeout=5) == "foo"
+        func.assert_called_with(1, bar=2)
+
+    def test_submit_closes_connections(self):
+        """Assert that jobs close the database connections they no longer need."""
+        with patch("jobby.background.close_old_connections") as close_mock:
+            background.submit(Mock()).result(timeout=5)
+        assert close_mock.call_count == 2
+
+    def test_submit_logs_exceptions(self, caplog):
+        """Assert that exceptions of jobs are logged."""
+        future = background.submit(Mock(side_effect=ValueError("foo")))
+        with pytest.raises(ValueError):
+            future.result(timeout=5)
+        assert "failed" in caplog.text
+
+    def test_get_executor(self):
+        """Assert that ``get_executor`` returns the same executor every time."""
+        assert background.get_executor() is background.get_executor()
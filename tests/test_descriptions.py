@@ -0,0 +1,172 @@
+from unittest.mock import Mock, patch
+
+import pytest
+import requests
+from django.core.cache import caches
+from django.core.exceptions import BadRequest
+from jobby.descriptions import fetch_description, fill_description, get_description_cache, get_text, schedule_fill
+
+URL = "https://www.arbeitsagentur.de/jobsuche/jobdetail/123"
+
+
+@pytest.fixture
+def parse_mock():
+    return Mock(side_effect=lambda html: html)
+
+
+@pytest.fixture
+def details_mock(requests_mock):
+    """Mock the details page with validators."""
+    return requests_mock.get(
+        URL,
+        text="Beschreibung",
+        headers={"ETag": '"abc"', "Last-Modified": "Wed, 21 Oct 2015 07:28:00 GMT"},
+    )
+
+
+@pytest.fixture
+def time_mock():
+    with patch("jobby.descriptions.time.time") as m:
+        m.return_value = 1000
+        yield m
+
+
+class TestFetchDescription:
+
+    def test_fetch_description(self, details_mock, parse_mock):
+        assert fetch_description("123", URL, parse_mock) == "Beschreibung"
+        parse_mock.assert_called_with("Beschreibung")
+
+    def test_fetch_description_stored(self, details_mock, parse_mock):
+        """Assert that a stored description is returned without a request."""
+        fetch_description("123", URL, parse_mock)
+        assert fetch_description("123", URL, parse_mock) == "Beschreibung"
+        assert details_mock.call_count == 1
+        parse_mock.assert_called_once()
+
+    def test_fetch_description_revalidate(self, requests_mock, details_mock, parse_mock, time_mock, settings):
+        """
+        Assert that a stale description is revalidated with the validators of
+        the previous response, and used again if the page has not changed.
+        """
+        settings.JOBBY_DESCRIPTION_TTL = 60
+        fetch_description("123", URL, parse_mock)
+        time_mock.return_value += 61
+        requests_mock.get(URL, status_code=304)
+        assert fetch_description("123", URL, parse_mock) == "Beschreibung"
+        headers = requests_mock.last_request.headers
+        assert headers["If-None-Match"] == '"abc"'
+        assert headers["If-Modified-Since"] == "Wed, 21 Oct 2015 07:28:00 GMT"
+        parse_mock.assert_called_once()
+        # The description is fresh again:
+        fetch_description("123", URL, parse_mock)
+        assert requests_mock.call_count == 2
+
+    def test_fetch_description_changed(self, requests_mock, details_mock, parse_mock, time_mock, settings):
+        """Assert that a stale description is replaced if the page has changed."""
+        settings.JOBBY_DESCRIPTION_TTL = 60
+        fetch_description("123", URL, parse_mock)
+        time_mock.return_value += 61
+        requests_mock.get(URL, text="Neue Beschreibung")
+        assert fetch_description("123", URL, parse_mock) == "Neue Beschreibung"
+
+    def test_fetch_description_no_validators(self, requests_mock, parse_mock, time_mock, settings):
+        """Assert that no conditional headers are sent if there are no validators."""
+        settings.JOBBY_DESCRIPTION_TTL = 60
+        requests_mock.get(URL, text="Beschreibung")
+        fetch_description("123", URL, parse_mock)
+        time_mock.return_value += 61
+        fetch_description("123", URL, parse_mock)
+        assert "If-None-Match" not in requests_mock.last_request.headers
+        assert "If-Modified-Since" not in requests_mock.last_request.headers
+
+    @pytest.mark.parametrize("status_code", [304, 404, 500])
+    def test_fetch_description_bad_response(self, requests_mock, parse_mock, status_code):
+        """Assert that a BadRequest is raised if the page could not be fetched."""
+        requests_mock.get(URL, status_code=status_code)
+        with pytest.raises(BadRequest):
+            fetch_description("123", URL, parse_mock)
+
+    def test_fetch_description_request_exception(self, requests_mock, parse_mock):
+        """Assert that a BadRequest is raised if the request fails."""
+        requests_mock.get(URL, exc=requests.ConnectionError)
+        with pytest.raises(BadRequest):
+            fetch_description("123", URL, parse_mock)
+
+    def test_fetch_description_stored_per_source(self, requests_mock, details_mock, parse_mock):
+        """Assert that descriptions from different sources are stored separately."""
+        other_url = "https://example.com/123"
+        requests_mock.get(other_url, text="Andere Beschreibung")
+        fetch_description("123", URL, parse_mock)
+        assert fetch_description("123", other_url, parse_mock) == "Andere Beschreibung"
+        assert fetch_description("123", URL, parse_mock) == "Beschreibung"
+        assert requests_mock.call_count == 2
+
+    def test_fetch_description_encoding(self, requests_mock, parse_mock):
+        """
+        Assert that a response without a declared encoding is not decoded as
+        ISO-8859-1.
+        """
+        requests_mock.get(URL, content="Größe".encode("utf-8"), headers={"Content-Type": "text/html"})
+        assert fetch_description("123", URL, parse_mock) == "Größe"
+
+    def test_get_description_cache(self, settings):
+        assert get_description_cache() is caches["descriptions"]
+        settings.CACHES = {"default": settings.CACHES["default"]}
+        assert get_description_cache() is caches["default"]
+
+
+class TestGetText:
+
+    @pytest.mark.parametrize(
+        "content, content_type",
+        [
+            ("<p>Größe</p>".encode("utf-8"), "text/html"),
+            ("<p>Größe</p>".encode("latin-1"), "text/html; charset=ISO-8859-1"),
+            ('<meta charset="ISO-8859-1"><p>Größe</p>'.encode("latin-1"), "text/html"),
+            ('{"beschreibung": "Größe"}'.encode("utf-8"), "application/json"),
+        ],
+    )
+    def test_get_text(self, requests_mock, content, content_type):
+        """Assert that the content is decoded with the declared encoding or UTF-8."""
+        requests_mock.get(URL, content=content, headers={"Content-Type": content_type})
+        assert "Größe" in get_text(requests.get(URL))
+
+
+@pytest.mark.django_db
+class TestFillDescription:
+
+    @pytest.fixture
+    def get_description_mock(self):
+        with patch("jobby.descriptions.registry.get_description") as m:
+            m.return_value = "<p>Beschreibung</p>"
+            yield m
+
+    def test_fill_description(self, stellenangebot, get_description_mock):
+        assert fill_description(stellenangebot.pk)
+        get_description_mock.assert_called_with(stellenangebot.api, stellenangebot.refnr)
+        stellenangebot.refresh_from_db()
+        assert stellenangebot.beschreibung == "<p>Beschreibung</p>"
+        assert stellenangebot.beschreibung_text == "Beschreibung"
+
+    @pytest.mark.parametrize("stellenangebot_extra_data", [{"beschreibung": "Gespeichert"}])
+    def test_fill_description_has_description(self, stellenangebot, get_description_mock):
+        """Assert that an existing description is not replaced."""
+        assert not fill_description(stellenangebot.pk)
+        get_description_mock.assert_not_called()
+        stellenangebot.refresh_from_db()
+        assert stellenangebot.beschreibung == "Gespeichert"
+
+    def test_fill_description_bad_request(self, stellenangebot, get_description_mock):
+        get_description_mock.side_effect = BadRequest
+        assert not fill_description(stellenangebot.pk)
+        stellenangebot.refresh_from_db()
+        assert not stellenangebot.beschreibung
+
+    def test_schedule_fill(self, stellenangebot, django_capture_on_commit_callbacks):
+        """Assert that the fill-in is submitted once the transaction is committed."""
+        with patch("jobby.descriptions.background.submit") as submit_mock:
+            with django_capture_on_commit_callbacks(execute=True):
+                schedule_fill(stellenangebot)
+                submit_mock.assert_not_called()
+        submit_mock.assert_called_with(fill_description, stellenangebot.pk)
@@ -0,0 +1,147 @@
+from datetime import timedelta
+from unittest.mock import Mock, patch
+
+import pytest
+from django.core.management import call_command
+from django.utils import timezone
+from jobby import expiry
+from jobby.models import Stellenangebot
+
+from tests.factories import StellenangebotFactory, WatchlistItemFactory
+
+pytestmark = [pytest.mark.django_db]
+
+DETAILS_URL = "https://www.arbeitsagentur.de/jobsuche/jobdetail/"
+
+
+@pytest.fixture
+def details_url(refnr):
+    return f"{DETAILS_URL}{refnr}"
+
+
+@pytest.fixture
+def stellenangebot(refnr):
+    """Create a Stellenangebot of the Bundesagentur API."""
+    return StellenangebotFactory(refnr=refnr, api="bundesagentur")
+
+
+class TestIsExpired:
+
+    @pytest.mark.parametrize("status_code, expected", [(404, True), (200, False), (500, None)])
+    def test_is_expired(self, requests_mock, details_url, status_code, expected):
+        """Assert that ``is_expired`` evaluates the status code of a HEAD request."""
+        requests_mock.head(details_url, status_code=status_code)
+        assert expiry.is_expired(details_url) is expected
+        assert requests_mock.last_request.method == "HEAD"
+
+    @pytest.mark.parametrize("status_code", [405, 501])
+    def test_is_expired_head_not_allowed(self, requests_mock, details_url, status_code):
+        """
+        Assert that ``is_expired`` makes a GET request if the server does not
+        allow HEAD requests.
+        """
+        requests_mock.head(details_url, status_code=status_code)
+        requests_mock.get(details_url, status_code=404)
+        assert expiry.is_expired(details_url)
+        assert requests_mock.last_request.method == "GET"
+
+    def test_is_expired_exception(self, details_url):
+        """
+        Assert that ``is_expired`` catches exceptions raised by requests and
+        returns None instead.
+        """
+        with patch("jobby.expiry.get_session") as get_session_mock:
+            get_session_mock.return_value.head = Mock(side_effect=Exception)
+            assert expiry.is_expired(details_url) is None
+
+
+class TestCheckExpired:
+
+    @pytest.fixture
+    def checked(self, watchlist):
+        """A watchlisted Stellenangebot that was checked recently."""
+        obj = StellenangebotFactory(api="bundesagentur", last_checked=timezone.now())
+        WatchlistItemFactory(watchlist=watchlist, stellenangebot=obj)
+        return obj
+
+    @pytest.fixture
+    def not_on_watchlist(self):
+        return StellenangebotFactory(api="bundesagentur")
+
+    def test_get_due(self, watchlist_item, stellenangebot, checked, not_on_watchlist):
+        """
+        Assert that ``get_due`` only returns watchlisted Stellenangebot objects
+        that were not checked within the check interval.
+        """
+        assert list(expiry.get_due()) == [stellenangebot]
+
+    def test_get_due_checked_long_ago(self, watchlist_item, stellenangebot):
+        Stellenangebot.objects.update(last_checked=timezone.now() - timedelta(seconds=expiry.CHECK_INTERVAL + 1))
+        assert list(expiry.get_due()) == [stellenangebot]
+
+    def test_get_due_expired(self, watchlist_item, stellenangebot):
+        """Assert that ``get_due`` does not return objects that already expired."""
+        Stellenangebot.objects.update(expired=True)
+        assert not expiry.get_due().exists()
+
+    def test_check_batch(self, watchlist, requests_mock):
+        """Assert that ``check_batch`` saves the results of the checks."""
+        expired, available, unknown = StellenangebotFactory.create_batch(3, api="bundesagentur")
+        requests_mock.head(f"{DETAILS_URL}{expired.refnr}", status_code=404)
+        requests_mock.head(f"{DETAILS_URL}{available.refnr}", status_code=200)
+        requests_mock.head(f"{DETAILS_URL}{unknown.refnr}", status_code=500)
+        assert expiry.check_batch([expired, available, unknown]) == 1
+        for obj in (expired, available, unknown):
+            obj.refresh_from_db()
+        assert expired.expired and expired.last_checked
+        assert not available.expired and available.last_checked
+        assert not unknown.expired and not unknown.last_checked
+
+    def test_check_expired_batches(self, watchlist):
+        """Assert that ``check_expired`` checks the due objects in batches."""
+        for obj in StellenangebotFactory.create_batch(5, api="bundesagentur"):
+            WatchlistItemFactory(watchlist=watchlist, stellenangebot=obj)
+        with patch("jobby.expiry.check_batch", new=Mock(return_value=1)) as check_batch_mock:
+            assert expiry.check_expired(batch_size=2, max_workers=3) == 3
+        assert [len(c.args[0]) for c in check_batch_mock.call_args_list] == [2, 2, 1]
+        assert all(c.args[1] == 3 for c in check_batch_mock.call_args_list)
+
+    def test_check_expired(self, watchlist_item, stellenangebot, details_url, requests_mock):
+        requests_mock.head(details_url, status_code=404)
+        assert expiry.check_expired() == 1
+        stellenangebot.refresh_from_db()
+        assert stellenangebot.expired
+
+    def test_command(self, watchlist_item, stellenangebot, details_url, requests_mock, capsys):
+        requests_mock.head(details_url, status_code=404)
+        call_command("check_expired", "--batch-size=10")
+        assert "1" in capsys.readouterr().out
+        stellenangebot.refresh_from_db()
+        assert stellenangebot.expired
+
+
+class TestScheduleCheck:
+
+    @pytest.fixture(autouse=True)
+    def submit_mock(self):
+        with patch("jobby.expiry.background.submit") as m:
+            yield m
+
+    def test_schedule_check(self, settings, submit_mock):
+        """Assert that ``schedule_check`` starts a check in the background."""
+        settings.JOBBY_EXPIRY_CHECK_INTERVAL = 60
+        assert expiry.schedule_check()
+        submit_mock.assert_called_with(expiry.check_expired, interval=60)
+
+    def test_schedule_check_once_per_interval(self, settings, submit_mock):
+        """Assert that ``schedule_check`` starts only one check per interval."""
+        settings.JOBBY_EXPIRY_CHECK_INTERVAL = 60
+        assert expiry.schedule_check()
+        assert not expiry.schedule_check()
+        submit_mock.assert_called_once()
+
+    def test_schedule_check_disabled(self, settings, submit_mock):
+        """Assert that no checks are started if the check interval is None."""
+        settings.JOBBY_EXPIRY_CHECK_INTERVAL = None
+        assert not expiry.schedule_check()
+        submit_mock.assert_not_called()
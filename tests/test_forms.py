@@ -134,7 +134,29 @@ class TestStellenangebotForm:
         """
         form.cleaned_data = cleaned_data
         assert form.clean_beschreibung() == beschreibung
-        get_beschreibung_mock.assert_called_with(refnr)
+        get_beschreibung_mock.assert_called_with(refnr, "")
+
+    @pytest.mark.parametrize("form_data", [{"api": "bundesagentur"}])
+    def test_clean_beschreibung_api(self, form, cleaned_data, get_beschreibung_mock, refnr, form_data):
+        """
+        Assert that ``clean_beschreibung`` asks the API given in the form data
+        for the description.
+        """
+        form.cleaned_data = cleaned_data
+        form.clean_beschreibung()
+        get_beschreibung_mock.assert_called_with(refnr, "bundesagentur")
+
+    def test_clean_beschreibung_fetch_beschreibung_false(
+        self, form_class, form_data, cleaned_data, get_beschreibung_mock
+    ):
+        """
+        Assert that ``clean_beschreibung`` does not call ``_get_beschreibung``
+        if the form should not fetch descriptions.
+        """
+        form = form_class(data=form_data, fetch_beschreibung=False)
+        form.cleaned_data = cleaned_data
+        assert form.clean_beschreibung() == ""
+        get_beschreibung_mock.assert_not_called()
 
     def test_clean_beschreibung_bad_request(self, form, cleaned_data, get_beschreibung_mock, beschreibung):
         """
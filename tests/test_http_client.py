@@ -0,0 +1,94 @@
+from unittest.mock import patch
+
+import pytest
+from jobby import http_client
+from jobby.http_client import TimeoutHTTPAdapter, close_session, create_session, get_config, get_session
+
+
+@pytest.fixture(autouse=True)
+def reset_session():
+    """Make sure that every test starts without a session."""
+    close_session()
+    yield
+    close_session()
+
+
+class TestGetConfig:
+
+    def test_defaults(self, settings):
+        """Assert that ``get_config`` returns the defaults if nothing is configured."""
+        if hasattr(settings, "JOBBY_HTTP"):
+            del settings.JOBBY_HTTP
+        assert get_config() == http_client.DEFAULTS
+
+    def test_override(self, settings):
+        """Assert that the values from the JOBBY_HTTP setting override the defaults."""
+        settings.JOBBY_HTTP = {"TIMEOUT": 1}
+        config = get_config()
+        assert config["TIMEOUT"] == 1
+        assert config["RETRIES"] == http_client.DEFAULTS["RETRIES"]
+
+
+class TestCreateSession:
+
+    @pytest.fixture
+    def config(self):
+        return {
+            **http_client.DEFAULTS,
+            "POOL_CONNECTIONS": 3,
+            "POOL_MAXSIZE": 5,
+            "TIMEOUT": (1, 2),
+            "RETRIES": 4,
+            "BACKOFF_FACTOR": 0.5,
+        }
+
+    @pytest.fixture
+    def adapter(self, config):
+        return create_session(config).get_adapter("https://rest.arbeitsagentur.de")
+
+    def test_adapter(self, adapter):
+        """Assert that the session uses the timeout adapter for https requests."""
+        assert isinstance(adapter, TimeoutHTTPAdapter)
+
+    def test_pool_sizes(self, adapter, config):
+        """Assert that the adapter's connection pools are configured as requested."""
+        assert adapter._pool_connections == config["POOL_CONNECTIONS"]
+        assert adapter._pool_maxsize == config["POOL_MAXSIZE"]
+
+    def test_timeout(self, adapter, config):
+        assert adapter.timeout == config["TIMEOUT"]
+
+    def test_retries(self, adapter, config):
+        assert adapter.max_retries.total == config["RETRIES"]
+        assert adapter.max_retries.backoff_factor == config["BACKOFF_FACTOR"]
+        assert set(adapter.max_retries.status_forcelist) == set(config["STATUS_FORCELIST"])
+
+
+class TestTimeoutHTTPAdapter:
+
+    def test_send_default_timeout(self):
+        """Assert that ``send`` uses the default timeout if none is given."""
+        adapter = TimeoutHTTPAdapter(timeout=5)
+        with patch("jobby.http_client.HTTPAdapter.send") as super_send_mock:
+            adapter.send("request")
+        super_send_mock.assert_called_with("request", timeout=5)
+
+    def test_send_explicit_timeout(self):
+        """Assert that ``send`` uses the timeout given with the request."""
+        adapter = TimeoutHTTPAdapter(timeout=5)
+        with patch("jobby.http_client.HTTPAdapter.send") as super_send_mock:
+            adapter.send("request", timeout=1)
+        super_send_mock.assert_called_with("request", timeout=1)
+
+
+class TestGetSession:
+
+    def test_reuses_session(self):
+        """Assert that ``get_session`` returns the same session on every call."""
+        assert get_session() is get_session()
+
+    def test_close_session(self):
+        """Assert that ``close_session`` discards the current session."""
+        session = get_session()
+        close_session()
+        assert get_session() is not session
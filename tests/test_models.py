@@ -1,16 +1,33 @@
-from datetime import datetime
-from unittest.mock import Mock, create_autospec, patch
+from datetime import date, datetime
+from unittest.mock import Mock, call, create_autospec, patch
 
 # noinspection PyPackageRequirements
 import pytest
+from django.core.cache import cache
 from django.core.files import File
-from django.db import models
+from django.db import IntegrityError, connection, models, transaction
 from django.urls import path
 from django.utils.timezone import make_aware
-from jobby.forms import StellenangebotForm
-from jobby.models import Stellenangebot, StellenangebotKontakt, _as_dict, _update_stellenangebot
-
-from tests.factories import StellenangebotFactory
+from jobby.models import (
+    ORPHAN_COUNT_CACHE_KEY,
+    SEARCH_FIELDS,
+    SearchHit,
+    Stellenangebot,
+    StellenangebotKontakt,
+    StellenangebotQuerySet,
+    StellenangebotURLs,
+    WatchlistItem,
+    _as_dict,
+    _get_dict_fields,
+    _merge_stellenangebot,
+    get_orphan_count,
+    get_search_threshold,
+    html_to_text,
+    invalidate_orphan_count,
+    make_fingerprint,
+)
+
+from tests.factories import StellenangebotFactory, WatchlistFactory, WatchlistItemFactory
 
 pytestmark = [pytest.mark.django_db]
 
@@ -29,44 +46,152 @@ def other(refnr):
     )
 
 
-class TestUpdateStellenangebot:
+class TestMergeStellenangebot:
 
-    def test_update_stellenangebot(self, stellenangebot, other):
+    def test_merge_stellenangebot(self, stellenangebot, other):
         """
-        Assert that ``_update_stellenangebot`` updates the given Stellenangebot
-        instance with the data from the other.
+        Assert that ``_merge_stellenangebot`` updates the given Stellenangebot
+        instance with the data from the other and returns the changed fields.
         """
-        assert _update_stellenangebot(stellenangebot, other)
-        stellenangebot.refresh_from_db()
+        changed = _merge_stellenangebot(stellenangebot, other)
+        assert set(changed) == {"titel", "beruf"}
         assert stellenangebot.titel == other.titel
         assert stellenangebot.beruf == other.beruf
 
-    def test_update_stellenangebot_identical(self, stellenangebot, django_assert_num_queries):
+    def test_merge_stellenangebot_does_not_save(self, stellenangebot, other, django_assert_num_queries):
+        """Assert that ``_merge_stellenangebot`` does not perform any queries."""
+        with django_assert_num_queries(0):
+            _merge_stellenangebot(stellenangebot, other)
+        stellenangebot.refresh_from_db()
+        assert stellenangebot.titel != other.titel
+
+    def test_merge_stellenangebot_identical(self, stellenangebot):
         """
-        Assert that ``_update_stellenangebot`` does not perform any queries if the
+        Assert that ``_merge_stellenangebot`` does not change anything if the
         two Stellenangebot arguments are identical.
         """
-        with django_assert_num_queries(0):
-            assert not _update_stellenangebot(stellenangebot, stellenangebot)
+        assert not _merge_stellenangebot(stellenangebot, stellenangebot)
 
-    def test_update_stellenangebot_different_refnr(self, stellenangebot, other, django_assert_num_queries):
+    def test_merge_stellenangebot_date_strings(self, stellenangebot, other):
+        """
+        Assert that ``_merge_stellenangebot`` treats date strings as equal to
+        the same date.
         """
-        Assert that ``_update_stellenangebot`` does not perform any queries if the
+        other.titel = stellenangebot.titel
+        other.beruf = stellenangebot.beruf
+        assert stellenangebot.eintrittsdatum == date(2024, 7, 1)
+        assert not _merge_stellenangebot(stellenangebot, other)
+
+    def test_merge_stellenangebot_different_refnr(self, stellenangebot, other):
+        """
+        Assert that ``_merge_stellenangebot`` does not change anything if the
         two Stellenangebot do not have the same refnr.
         """
         other.refnr = "1"
-        with django_assert_num_queries(0):
-            assert not _update_stellenangebot(stellenangebot, other)
+        assert not _merge_stellenangebot(stellenangebot, other)
+        assert stellenangebot.titel != other.titel
 
-    def test_update_stellenangebot_not_stellenangebot_instances(self, stellenangebot, other):
+    def test_merge_stellenangebot_keeps_user_data(self, stellenangebot, other):
         """
-        Assert that ``_update_stellenangebot`` raises a TypeError if either of
+        Assert that ``_merge_stellenangebot`` does not overwrite the data that
+        was not provided by an API.
+        """
+        stellenangebot.notizen = "Foo"
+        stellenangebot.bewerbungsstatus = Stellenangebot.BewerbungChoices.BEWORBEN
+        stellenangebot.beschreibung = "Bar"
+        _merge_stellenangebot(stellenangebot, other)
+        assert stellenangebot.notizen == "Foo"
+        assert stellenangebot.bewerbungsstatus == Stellenangebot.BewerbungChoices.BEWORBEN
+        assert stellenangebot.beschreibung == "Bar"
+        assert stellenangebot.api == "test_api"
+
+    def test_merge_stellenangebot_same_fingerprint(self, stellenangebot, other):
+        """
+        Assert that ``_merge_stellenangebot`` skips the comparison of the
+        fields if both Stellenangebot have the same fingerprint.
+        """
+        stellenangebot.fingerprint = other.fingerprint = "foo"
+        assert not _merge_stellenangebot(stellenangebot, other)
+        assert stellenangebot.titel != other.titel
+
+    def test_merge_stellenangebot_new_fingerprint(self, stellenangebot, other):
+        """
+        Assert that ``_merge_stellenangebot`` updates the fingerprint if the
+        fingerprint of the other Stellenangebot is different.
+        """
+        stellenangebot.fingerprint = "foo"
+        other.fingerprint = "bar"
+        changed = _merge_stellenangebot(stellenangebot, other)
+        assert set(changed) == {"fingerprint", "titel", "beruf"}
+        assert stellenangebot.fingerprint == "bar"
+
+    def test_merge_stellenangebot_no_fingerprint(self, stellenangebot, other):
+        """
+        Assert that ``_merge_stellenangebot`` does not remove the fingerprint
+        if the other Stellenangebot does not have a fingerprint.
+        """
+        stellenangebot.fingerprint = "foo"
+        changed = _merge_stellenangebot(stellenangebot, other)
+        assert "fingerprint" not in changed
+        assert stellenangebot.fingerprint == "foo"
+
+    def test_merge_stellenangebot_not_stellenangebot_instances(self, stellenangebot, other):
+        """
+        Assert that ``_merge_stellenangebot`` raises a TypeError if either of
         the arguments is not a Stellenangebot instance.
         """
         with pytest.raises(TypeError):
-            _update_stellenangebot(stellenangebot, "foo")
+            _merge_stellenangebot(stellenangebot, "foo")
         with pytest.raises(TypeError):
-            _update_stellenangebot("bar", other)
+            _merge_stellenangebot("bar", other)
+
+    def test_merge_stellenangebot_search_hit(self, stellenangebot):
+        """Assert that the data of search hits can be merged into Stellenangebote."""
+        hit = SearchHit(refnr=stellenangebot.refnr, titel="Neuer Titel", eintrittsdatum="2024-07-01")
+        changed = _merge_stellenangebot(stellenangebot, hit)
+        assert "titel" in changed
+        assert stellenangebot.titel == "Neuer Titel"
+        assert stellenangebot.eintrittsdatum == date(2024, 7, 1)
+
+
+class TestHtmlToText:
+
+    @pytest.mark.parametrize(
+        "html, expected",
+        [
+            ("", ""),
+            ("Foo", "Foo"),
+            ("<p>Foo</p><p>Bar</p>", "Foo Bar"),
+            ("<ul>\n  <li>Foo</li>\n  <li>Bar</li>\n</ul>", "Foo Bar"),
+            ('<a href="https://foo.bar">Foo &amp; Bar</a>', "Foo & Bar"),
+        ],
+    )
+    def test_html_to_text(self, html, expected):
+        assert html_to_text(html) == expected
+
+
+class TestMakeFingerprint:
+
+    @pytest.fixture
+    def data(self):
+        return {"titel": "Software Entwickler", "modified": "2024-05-22T09:00:15.099"}
+
+    def test_make_fingerprint_same_data(self, data):
+        """Assert that ``make_fingerprint`` returns the same hash for the same data."""
+        assert make_fingerprint(data) == make_fingerprint(dict(data))
+
+    @pytest.mark.parametrize("field_name", ["titel", "modified"])
+    def test_make_fingerprint_different_data(self, data, field_name):
+        """Assert that ``make_fingerprint`` returns a new hash if any value changes."""
+        assert make_fingerprint(data) != make_fingerprint({**data, field_name: "foo"})
+
+    def test_make_fingerprint_ignores_other_fields(self, data):
+        """Assert that ``make_fingerprint`` only considers the API fields."""
+        assert make_fingerprint(data) == make_fingerprint({**data, "notizen": "foo"})
+
+    def test_make_fingerprint_empty_values(self, data):
+        """Assert that ``make_fingerprint`` treats missing values and None as empty."""
+        assert make_fingerprint(data) == make_fingerprint({**data, "beruf": None})
 
 
 class AsDictTestModel(models.Model):
@@ -97,6 +222,49 @@ class TestAsDict:
         expected = {"name": "test", "empty": "not empty"}
         assert _as_dict(instance, default=False) == expected
 
+    def test_as_dict_caches_fields(self):
+        """Assert that the fields of a model are only looked up once."""
+        _get_dict_fields.cache_clear()
+        _as_dict(AsDictTestModel(name="foo"))
+        _as_dict(AsDictTestModel(name="bar"))
+        assert _get_dict_fields.cache_info().misses == 1
+
+
+@pytest.mark.urls(__name__)
+class TestSearchHit:
+
+    @pytest.fixture
+    def hit(self):
+        return SearchHit(
+            refnr="123",
+            api="bundesagentur",
+            fingerprint="abc",
+            titel="Software Entwickler",
+            arbeitsort="Dortmund",
+            eintrittsdatum="2024-07-01",
+        )
+
+    def test_slots(self, hit):
+        """Assert that search hits do not have an instance dictionary."""
+        assert not hasattr(hit, "__dict__")
+        with pytest.raises(AttributeError):
+            hit.notizen = "Foo"
+
+    def test_missing_fields_empty(self, hit):
+        assert hit.beruf == ""
+        assert hit.pk is None
+
+    def test_as_url(self, hit):
+        """
+        Assert that ``as_url`` returns the same URL as for an unsaved
+        Stellenangebot with the same data.
+        """
+        assert hit.as_url() == Stellenangebot(**_as_dict(hit)).as_url()
+        assert hit.as_url().startswith("/foo/?")
+
+    def test_as_dict(self, hit):
+        assert _as_dict(hit) == _as_dict(Stellenangebot(**{name: getattr(hit, name) for name in hit.__slots__}))
+
 
 urlpatterns = [
     path("foo/<int:id>", lambda r: None, name="stellenangebot_edit"),
@@ -110,11 +278,6 @@ class TestStellenangebot:
     def test_str(self, stellenangebot):
         assert stellenangebot.__str__() == stellenangebot.titel
 
-    def test_search_result_form(self, stellenangebot):
-        form = stellenangebot.as_search_result_form()
-        assert isinstance(form, StellenangebotForm)
-        assert form.instance == stellenangebot
-
     def test_as_url_saved_instance(self, stellenangebot):
         """
         Assert that ``as_url`` returns the URL to the instance's edit page if
@@ -131,6 +294,41 @@ class TestStellenangebot:
         with patch("jobby.models._as_dict", new=Mock(return_value={"titel": "foo", "refnr": 1234})):
             assert stellenangebot.as_url() == "/foo/?titel=foo&refnr=1234"
 
+    def test_save_beschreibung_text(self, stellenangebot):
+        """Assert that ``save`` stores the plain text of the beschreibung."""
+        stellenangebot.beschreibung = "<p>Wir suchen</p><ul><li>Entwickler &amp; Tester</li></ul>"
+        stellenangebot.save()
+        stellenangebot.refresh_from_db()
+        assert stellenangebot.beschreibung_text == "Wir suchen Entwickler & Tester"
+
+    def test_save_beschreibung_text_update_fields(self, stellenangebot):
+        """
+        Assert that ``save`` also updates the plain text if the beschreibung
+        is in ``update_fields``.
+        """
+        stellenangebot.beschreibung = "<p>Foo</p>"
+        stellenangebot.save(update_fields=["beschreibung"])
+        stellenangebot.refresh_from_db()
+        assert stellenangebot.beschreibung_text == "Foo"
+
+    def test_save_beschreibung_text_other_update_fields(self, stellenangebot):
+        """
+        Assert that the plain text is not computed again if the beschreibung
+        is not among the update_fields.
+        """
+        with patch("jobby.models.html_to_text") as html_to_text_mock:
+            stellenangebot.notizen = "Foo"
+            stellenangebot.save(update_fields=["notizen"])
+        html_to_text_mock.assert_not_called()
+
+    def test_search_ignores_html(self):
+        """Assert that the search does not find the tags and attributes of the HTML."""
+        StellenangebotFactory(
+            titel="Pilot", arbeitgeber="", arbeitsort="", beschreibung='<p class="software">Fliegt.</p>'
+        )
+        assert not Stellenangebot.objects.search("software").exists()
+        assert not Stellenangebot.objects.fulltext("software").exists()
+
     def test_has_user_data(self, stellenangebot):
         """
         Assert that ``has_user_data`` returns False if the user has not added
@@ -215,6 +413,212 @@ class TestStellenangebotQuerySet:
         assert arbeitsort_obj in search_queryset
         assert not_found_obj not in search_queryset
 
+    def test_search_uses_word_similarity_operator(self, search_queryset):
+        """
+        Assert that ``search`` filters with the word similarity operator that
+        the trigram indexes support.
+        """
+        assert "%>" in str(search_queryset.query)
+
+    def test_search_uses_trigram_indexes(self, titel_obj, search_queryset):
+        """Assert that the database can use the trigram indexes for a search."""
+        with connection.cursor() as cursor:
+            cursor.execute("SET LOCAL enable_seqscan = off")
+            plan = search_queryset.explain()
+        for field_name in SEARCH_FIELDS:
+            assert f"jobby_{field_name}_trgm" in plan
+
+    def test_word_similarity_threshold(self):
+        """
+        Assert that the word similarity threshold of the database connection
+        is set to the search threshold.
+        """
+        with connection.cursor() as cursor:
+            cursor.execute("SHOW pg_trgm.word_similarity_threshold")
+            assert float(cursor.fetchone()[0]) == get_search_threshold()
+
+    def test_search_threshold_setting(self, titel_obj, settings):
+        """Assert that ``search`` uses the JOBBY_SEARCH_THRESHOLD setting."""
+        settings.JOBBY_SEARCH_THRESHOLD = 0.99
+        assert not Stellenangebot.objects.search("sftwr").exists()
+        assert Stellenangebot.objects.search("Software Developer").exists()
+
+    def test_fulltext(self):
+        """Assert that ``fulltext`` finds the German word forms of the query."""
+        obj = StellenangebotFactory(titel="Entwicklern gesucht")
+        StellenangebotFactory(titel="Pilot")
+        assert list(Stellenangebot.objects.fulltext("Entwickler")) == [obj]
+
+    def test_fulltext_rank(self):
+        """
+        Assert that ``fulltext`` ranks matches in the titel above matches in
+        the other fields.
+        """
+        beschreibung_obj = StellenangebotFactory(titel="Pilot", beschreibung="<p>Wir suchen einen Entwickler</p>")
+        arbeitgeber_obj = StellenangebotFactory(titel="Pilot", arbeitgeber="Entwickler GmbH")
+        titel_obj = StellenangebotFactory(titel="Entwickler")
+        assert list(Stellenangebot.objects.fulltext("Entwickler")) == [titel_obj, arbeitgeber_obj, beschreibung_obj]
+
+    def test_fulltext_arbeitsort(self):
+        """Assert that ``fulltext`` also searches the arbeitsort."""
+        arbeitsort_obj = StellenangebotFactory(titel="Pilot", arbeitsort="Dortmund")
+        beschreibung_obj = StellenangebotFactory(titel="Pilot", beschreibung="<p>Arbeiten in Dortmund</p>")
+        StellenangebotFactory(titel="Pilot", arbeitsort="Bochum")
+        assert list(Stellenangebot.objects.text_search("Dortmund")) == [arbeitsort_obj, beschreibung_obj]
+
+    def test_fulltext_websearch_syntax(self):
+        """Assert that ``fulltext`` supports the web search syntax."""
+        obj = StellenangebotFactory(titel="Java Entwickler")
+        StellenangebotFactory(titel="Python Entwickler")
+        assert list(Stellenangebot.objects.fulltext("Entwickler -Python")) == [obj]
+
+    def test_text_search_fulltext(self):
+        """Assert that ``text_search`` uses the full-text search if it finds matches."""
+        with patch.object(StellenangebotQuerySet, "search") as search_mock:
+            obj = StellenangebotFactory(titel="Entwickler")
+            assert list(Stellenangebot.objects.text_search("Entwickler")) == [obj]
+        search_mock.assert_not_called()
+
+    def test_text_search_short_query_fallback(self, titel_obj, not_found_obj):
+        """
+        Assert that ``text_search`` falls back to the trigram search for short
+        queries that the full-text search does not find.
+        """
+        assert not Stellenangebot.objects.fulltext("Sofware").exists()
+        assert titel_obj in Stellenangebot.objects.text_search("Sofware")
+
+    def test_text_search_long_query_no_fallback(self, titel_obj):
+        """Assert that ``text_search`` only falls back to trigram for short queries."""
+        assert not Stellenangebot.objects.text_search("Sofware Develper in Dortmund").exists()
+
+    def test_orphans(self, watchlist_item, stellenangebot):
+        """
+        Assert that ``orphans`` returns the Stellenangebot instances that are
+        not on any watchlist.
+        """
+        orphan = StellenangebotFactory()
+        assert list(Stellenangebot.objects.orphans()) == [orphan]
+
+    def test_without_user_data(self):
+        """
+        Assert that ``without_user_data`` excludes the Stellenangebot instances
+        that have user data.
+        """
+        no_user_data = StellenangebotFactory()
+        StellenangebotFactory(notizen="Foo")
+        StellenangebotURLs.objects.create(angebot=StellenangebotFactory(), url="http://example.com")
+        StellenangebotKontakt.objects.create(angebot=StellenangebotFactory())
+        assert list(Stellenangebot.objects.without_user_data()) == [no_user_data]
+
+    def test_with_user_data(self, django_assert_num_queries):
+        """
+        Assert that ``with_user_data`` annotates whether there is user data
+        with a single query.
+        """
+        no_user_data = StellenangebotFactory()
+        notizen = StellenangebotFactory(notizen="Foo")
+        urls = StellenangebotFactory()
+        StellenangebotURLs.objects.create(angebot=urls, url="http://example.com")
+        kontakt = StellenangebotFactory()
+        StellenangebotKontakt.objects.create(angebot=kontakt)
+        with django_assert_num_queries(1):
+            user_data = {obj.pk: obj.user_data for obj in Stellenangebot.objects.with_user_data()}
+        assert user_data == {no_user_data.pk: False, notizen.pk: True, urls.pk: True, kontakt.pk: True}
+
+
+# The orphan count is invalidated after the commit; let the changes of each
+# test be committed:
+@pytest.mark.django_db(transaction=True)
+class TestOrphanCount:
+
+    @pytest.fixture
+    def orphan(self):
+        return StellenangebotFactory()
+
+    def test_get_orphan_count(self, watchlist_item, orphan):
+        assert get_orphan_count() == 1
+
+    def test_get_orphan_count_cached(self, orphan, django_assert_num_queries):
+        """Assert that ``get_orphan_count`` only counts the orphans once."""
+        get_orphan_count()
+        with django_assert_num_queries(0):
+            assert get_orphan_count() == 1
+
+    def test_invalidate_orphan_count(self, orphan, django_assert_num_queries):
+        get_orphan_count()
+        invalidate_orphan_count()
+        with django_assert_num_queries(1):
+            get_orphan_count()
+
+    def test_invalidated_on_stellenangebot_create(self, orphan):
+        get_orphan_count()
+        StellenangebotFactory()
+        assert get_orphan_count() == 2
+
+    def test_not_invalidated_on_stellenangebot_update(self, orphan, django_assert_num_queries):
+        get_orphan_count()
+        orphan.notizen = "Foo"
+        orphan.save()
+        with django_assert_num_queries(0):
+            get_orphan_count()
+
+    def test_invalidated_on_stellenangebot_delete(self, orphan):
+        get_orphan_count()
+        orphan.delete()
+        assert get_orphan_count() == 0
+
+    def test_invalidated_on_watchlist_item_create(self, watchlist, orphan):
+        get_orphan_count()
+        WatchlistItemFactory(watchlist=watchlist, stellenangebot=orphan)
+        assert get_orphan_count() == 0
+
+    def test_invalidated_on_watchlist_item_delete(self, watchlist_item, orphan):
+        get_orphan_count()
+        watchlist_item.delete()
+        assert get_orphan_count() == 2
+
+    def test_invalidated_on_queryset_delete(self, watchlist, watchlist_item, orphan):
+        get_orphan_count()
+        watchlist.items.all().delete()
+        assert get_orphan_count() == 2
+
+    def test_invalidated_after_commit(self, orphan):
+        """
+        Assert that the orphan count is only invalidated once the transaction
+        has been committed.
+        """
+        get_orphan_count()
+        with transaction.atomic():
+            StellenangebotFactory()
+            assert cache.get(ORPHAN_COUNT_CACHE_KEY) == 1
+        assert cache.get(ORPHAN_COUNT_CACHE_KEY) is None
+
+    def test_invalidated_once_per_transaction(self, orphan):
+        """
+        Assert that many invalidations in one transaction only remove the
+        count once.
+        """
+        with patch("jobby.models.cache") as cache_mock:
+            with transaction.atomic():
+                for _ in range(3):
+                    invalidate_orphan_count()
+                cache_mock.delete.assert_not_called()
+        cache_mock.delete.assert_called_once_with(ORPHAN_COUNT_CACHE_KEY)
+
+    def test_invalidated_after_rollback(self, orphan):
+        """
+        Assert that an invalidation of a rolled back transaction does not
+        prevent the invalidation in the next transaction.
+        """
+        with pytest.raises(ZeroDivisionError):
+            with transaction.atomic():
+                invalidate_orphan_count()
+                1 / 0
+        get_orphan_count()
+        with transaction.atomic():
+            invalidate_orphan_count()
+        assert cache.get(ORPHAN_COUNT_CACHE_KEY) is None
+
 
 class TestWatchlist:
 
@@ -242,6 +646,83 @@ class TestWatchlist:
         assert not added
         assert watchlist.items.filter(stellenangebot=stellenangebot).exists()
 
+    def test_add_watchlist_item_query_count(self, watchlist, stellenangebot, django_assert_num_queries):
+        """Assert that ``add_watchlist_item`` adds the item with a single query."""
+        with django_assert_num_queries(1):
+            watchlist.add_watchlist_item(stellenangebot)
+
+    def test_add_watchlist_item_invalidates_orphan_count(self, watchlist, stellenangebot):
+        with patch("jobby.models.invalidate_orphan_count") as invalidate_mock:
+            watchlist.add_watchlist_item(stellenangebot)
+        invalidate_mock.assert_called_once()
+
+    def test_unique_watchlist_item(self, watchlist, watchlist_item, stellenangebot):
+        """
+        Assert that a Stellenangebot cannot be added to the same watchlist
+        twice.
+        """
+        with pytest.raises(IntegrityError):
+            with transaction.atomic():
+                WatchlistItem.objects.create(watchlist=watchlist, stellenangebot=stellenangebot)
+
+    def test_toggle_watchlist_item_add(self, watchlist, stellenangebot):
+        """
+        Assert that ``toggle_watchlist_item`` adds a Stellenangebot that is not
+        on the watchlist.
+        """
+        assert watchlist.toggle_watchlist_item(stellenangebot)
+        assert watchlist.on_watchlist(stellenangebot)
+
+    def test_toggle_watchlist_item_remove(self, watchlist, watchlist_item, stellenangebot):
+        """
+        Assert that ``toggle_watchlist_item`` removes a Stellenangebot that is
+        on the watchlist, and deletes it if there is no user data.
+        """
+        stellenangebot_pk = stellenangebot.pk
+        assert not watchlist.toggle_watchlist_item(stellenangebot)
+        assert not watchlist.items.exists()
+        assert not Stellenangebot.objects.filter(pk=stellenangebot_pk).exists()
+        assert stellenangebot.pk is None
+
+    @pytest.mark.parametrize("stellenangebot_extra_data", [{"notizen": "Foo"}])
+    def test_toggle_watchlist_item_remove_has_user_data(self, watchlist, watchlist_item, stellenangebot):
+        """
+        Assert that ``toggle_watchlist_item`` does not delete a removed
+        Stellenangebot with user data.
+        """
+        assert not watchlist.toggle_watchlist_item(stellenangebot)
+        assert Stellenangebot.objects.filter(pk=stellenangebot.pk).exists()
+
+    def test_toggle_watchlist_item_remove_other_watchlists(self, watchlist, watchlist_item, stellenangebot):
+        """
+        Assert that ``toggle_watchlist_item`` removes a deleted Stellenangebot
+        from the other watchlists as well.
+        """
+        other = WatchlistItemFactory(watchlist=WatchlistFactory(name="other"), stellenangebot=stellenangebot)
+        assert not watchlist.toggle_watchlist_item(stellenangebot)
+        assert not WatchlistItem.objects.filter(pk=other.pk).exists()
+
+    def test_toggle_watchlist_item_add_query_count(self, watchlist, stellenangebot, django_assert_num_queries):
+        """Assert that adding an item with ``toggle_watchlist_item`` is one query."""
+        with django_assert_num_queries(1):
+            watchlist.toggle_watchlist_item(stellenangebot)
+
+    def test_toggle_watchlist_item_remove_query_count(
+        self, watchlist, watchlist_item, stellenangebot, django_assert_num_queries
+    ):
+        """
+        Assert that removing an item and deleting its Stellenangebot with
+        ``toggle_watchlist_item`` is one query.
+        """
+        with django_assert_num_queries(1):
+            watchlist.toggle_watchlist_item(stellenangebot)
+        assert not Stellenangebot.objects.exists()
+
+    def test_toggle_watchlist_item_invalidates_orphan_count(self, watchlist, stellenangebot):
+        with patch("jobby.models.invalidate_orphan_count") as invalidate_mock:
+            watchlist.toggle_watchlist_item(stellenangebot)
+        invalidate_mock.assert_called_once()
+
     def test_remove_watchlist_item(self, watchlist, watchlist_item, stellenangebot):
         """
         Assert that ``remove_watchlist_item`` removes the given Stellenangebot
@@ -257,19 +738,101 @@ class TestWatchlist:
         instance if the user has not added extra data to it.
         """
         stellenangebot_pk = stellenangebot.pk
-        with patch.object(stellenangebot, "has_user_data", new=Mock(return_value=False)):
-            watchlist.remove_watchlist_item(stellenangebot)
-            assert not Stellenangebot.objects.filter(pk=stellenangebot_pk).exists()
+        assert watchlist.remove_watchlist_item(stellenangebot)
+        assert not Stellenangebot.objects.filter(pk=stellenangebot_pk).exists()
+        # Like after Model.delete(), the instance has no primary key anymore:
+        assert stellenangebot.pk is None
 
+    @pytest.mark.parametrize("stellenangebot_extra_data", [{"notizen": "Foo"}])
     def test_remove_watchlist_item_stellenangebot_has_user_data(self, watchlist, watchlist_item, stellenangebot):
         """
         Assert that ``remove_watchlist_item`` does not delete the Stellenangebot
         instance if the user has added extra data to it.
         """
         stellenangebot_pk = stellenangebot.pk
-        with patch.object(stellenangebot, "has_user_data", new=Mock(return_value=True)):
+        assert not watchlist.remove_watchlist_item(stellenangebot)
+        assert Stellenangebot.objects.filter(pk=stellenangebot_pk).exists()
+        assert stellenangebot.pk == stellenangebot_pk
+
+    @pytest.mark.parametrize("stellenangebot_extra_data", [{"notizen": "Foo"}])
+    def test_remove_watchlist_item_user_data_query_count(
+        self, watchlist, watchlist_item, stellenangebot, django_assert_num_queries
+    ):
+        """
+        Assert that ``remove_watchlist_item`` checks for user data with a
+        single query.
+        """
+        # SAVEPOINT, DELETE the item, DELETE the watchlist items and the
+        # Stellenangebot without user data, RELEASE SAVEPOINT:
+        with django_assert_num_queries(5):
+            watchlist.remove_watchlist_item(stellenangebot)
+
+    def test_remove_watchlist_item_invalidates_orphan_count(self, watchlist, watchlist_item, stellenangebot):
+        with patch("jobby.models.invalidate_orphan_count") as invalidate_mock:
             watchlist.remove_watchlist_item(stellenangebot)
-            assert Stellenangebot.objects.filter(pk=stellenangebot_pk).exists()
+        invalidate_mock.assert_called_once()
+
+    def test_remove_all_watchlist_items(self, watchlist, watchlist_item, stellenangebot):
+        """
+        Assert that ``remove_all_watchlist_items`` removes all items from the
+        watchlist and deletes the Stellenangebot instances without user data.
+        """
+        stellenangebot_pk = stellenangebot.pk
+        watchlist.remove_all_watchlist_items()
+        assert not watchlist.items.exists()
+        assert not Stellenangebot.objects.filter(pk=stellenangebot_pk).exists()
+
+    @pytest.mark.parametrize("stellenangebot_extra_data", [{"notizen": "Foo"}])
+    def test_remove_all_watchlist_items_has_user_data(self, watchlist, watchlist_item, stellenangebot):
+        """
+        Assert that ``remove_all_watchlist_items`` does not delete Stellenangebot
+        instances with user data.
+        """
+        watchlist.remove_all_watchlist_items()
+        assert not watchlist.items.exists()
+        assert Stellenangebot.objects.filter(pk=stellenangebot.pk).exists()
+
+    def test_remove_all_watchlist_items_other_watchlists(self, watchlist, watchlist_item):
+        """Assert that the items of other watchlists are not removed."""
+        other = WatchlistItemFactory(watchlist=WatchlistFactory(name="other"), stellenangebot=StellenangebotFactory())
+        watchlist.remove_all_watchlist_items()
+        assert WatchlistItem.objects.filter(pk=other.pk).exists()
+
+    def test_remove_all_watchlist_items_on_other_watchlist(self, watchlist, watchlist_item, stellenangebot):
+        """
+        Assert that the items of other watchlists that refer to a deleted
+        Stellenangebot are removed as well.
+        """
+        other = WatchlistItemFactory(watchlist=WatchlistFactory(name="other"), stellenangebot=stellenangebot)
+        watchlist.remove_all_watchlist_items()
+        assert not WatchlistItem.objects.filter(pk=other.pk).exists()
+        assert not Stellenangebot.objects.filter(pk=stellenangebot.pk).exists()
+
+    @pytest.mark.parametrize("item_count", [1, 150])
+    def test_remove_all_watchlist_items_query_count(
+        self, watchlist, item_count, django_assert_num_queries, django_capture_on_commit_callbacks
+    ):
+        """
+        Assert that the number of queries and cache calls does not depend on
+        the number of items on the watchlist.
+        """
+        # Create the objects without signals, so that the orphan count is not
+        # invalidated before the removal:
+        stellenangebote = Stellenangebot.objects.bulk_create(StellenangebotFactory.build_batch(item_count))
+        WatchlistItem.objects.bulk_create(WatchlistItem(watchlist=watchlist, stellenangebot=s) for s in stellenangebote)
+        with patch("jobby.models.cache") as cache_mock:
+            with django_capture_on_commit_callbacks(execute=True):
+                # SAVEPOINT, SELECT the ids, DELETE the items, DELETE the
+                # Stellenangebote, RELEASE SAVEPOINT:
+                with django_assert_num_queries(5):
+                    watchlist.remove_all_watchlist_items()
+        assert not Stellenangebot.objects.exists()
+        assert cache_mock.method_calls == [call.delete(ORPHAN_COUNT_CACHE_KEY)]
+
+    def test_remove_all_watchlist_items_invalidates_orphan_count(self, watchlist, watchlist_item):
+        with patch("jobby.models.invalidate_orphan_count") as invalidate_mock:
+            watchlist.remove_all_watchlist_items()
+        invalidate_mock.assert_called_once()
 
     def test_get_stellenangebote(self, watchlist, watchlist_item, stellenangebot, django_assert_num_queries):
         """
@@ -0,0 +1,123 @@
+import base64
+import datetime
+import json
+
+import pytest
+from jobby.models import Stellenangebot
+from jobby.pagination import KeysetPaginator, get_list_page_size
+
+from tests.factories import StellenangebotFactory
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def objects():
+    return [StellenangebotFactory(titel=f"Angebot {i}") for i in range(5)]
+
+
+@pytest.fixture
+def per_page():
+    return 2
+
+
+@pytest.fixture
+def paginator(objects, per_page):
+    return KeysetPaginator(Stellenangebot.objects.all(), per_page)
+
+
+def get_all_pages(paginator):
+    """Follow the cursors and return the object lists of all pages."""
+    pages = [paginator.page()]
+    while pages[-1].has_next:
+        pages.append(paginator.page(pages[-1].next_cursor))
+    return [page.object_list for page in pages]
+
+
+class TestKeysetPaginator:
+
+    def test_page(self, paginator, objects):
+        page = paginator.page()
+        assert page.object_list == objects[:2]
+        assert page.is_first
+        assert page.has_next
+
+    def test_page_cursor(self, paginator, objects):
+        """Assert that a page continues after the last object of the previous page."""
+        page = paginator.page(paginator.page().next_cursor)
+        assert page.object_list == objects[2:4]
+        assert not page.is_first
+
+    def test_last_page(self, paginator, objects):
+        assert get_all_pages(paginator) == [objects[:2], objects[2:4], objects[4:]]
+
+    @pytest.mark.parametrize("per_page", [5])
+    def test_single_page(self, paginator):
+        """Assert that a page that contains the last object has no next page."""
+        assert not paginator.page().has_next
+
+    @pytest.mark.parametrize("cursor", ["foo", "Zm9v", "WzEsIDJd"])
+    def test_invalid_cursor(self, paginator, objects, cursor):
+        """Assert that the first page is returned for invalid cursors."""
+        page = paginator.page(cursor)
+        assert page.object_list == objects[:2]
+        assert page.is_first
+
+    @pytest.mark.parametrize("values", [["foo"], [[1]], [{"pk": 1}]])
+    def test_invalid_cursor_values(self, paginator, objects, values):
+        """
+        Assert that the first page is returned for well-formed cursors whose
+        values do not fit the types of their fields.
+        """
+        cursor = base64.urlsafe_b64encode(json.dumps(values).encode("utf-8")).decode("ascii")
+        page = paginator.page(cursor)
+        assert page.object_list == objects[:2]
+        assert page.is_first
+
+    @pytest.mark.parametrize("rank", ["foo", [1]])
+    def test_invalid_cursor_values_annotation(self, rank):
+        """Assert that the values of annotations are checked against their type."""
+        obj = StellenangebotFactory(titel="Entwickler")
+        paginator = KeysetPaginator(Stellenangebot.objects.fulltext("Entwickler"), 1)
+        cursor = base64.urlsafe_b64encode(json.dumps([rank, obj.pk]).encode("utf-8")).decode("ascii")
+        assert paginator.page(cursor).is_first
+
+    def test_cursor_values_converted(self):
+        """Assert that the values of a cursor are converted to their types."""
+        paginator = KeysetPaginator(Stellenangebot.objects.order_by("eintrittsdatum"), 1)
+        cursor = paginator.encode_cursor(StellenangebotFactory.build(pk=1, eintrittsdatum=datetime.date(2024, 7, 1)))
+        assert paginator.decode_cursor(cursor) == [datetime.date(2024, 7, 1), 1]
+
+    def test_query_count(self, paginator, django_assert_num_queries):
+        """Assert that each page is fetched with a single query and no COUNT."""
+        cursor = paginator.page().next_cursor
+        with django_assert_num_queries(1):
+            paginator.page(cursor)
+
+    def test_ordering_descending(self, objects):
+        paginator = KeysetPaginator(Stellenangebot.objects.all(), 2, ordering=["-titel"])
+        assert sum(get_all_pages(paginator), []) == objects[::-1]
+
+    def test_ordering_ties(self):
+        """Assert that the primary key breaks ties of the ordering."""
+        objects = [StellenangebotFactory(arbeitsort="Dortmund") for _ in range(3)]
+        objects.append(StellenangebotFactory(arbeitsort="Bochum"))
+        paginator = KeysetPaginator(Stellenangebot.objects.all(), 2, ordering=["-arbeitsort"])
+        assert sum(get_all_pages(paginator), []) == objects
+
+    def test_ordering_of_queryset(self, objects):
+        """Assert that the ordering of the queryset is used by default."""
+        paginator = KeysetPaginator(Stellenangebot.objects.order_by("-titel"), 2)
+        assert paginator.ordering == ["-titel", "pk"]
+
+    def test_ordering_rank(self):
+        """Assert that the pages of a full-text search can be followed."""
+        for titel in ["Python Entwickler", "Entwickler", "Python Python Entwickler", "Java Entwickler"]:
+            StellenangebotFactory(titel=titel, arbeitgeber="", arbeitsort="")
+        queryset = Stellenangebot.objects.fulltext("Entwickler")
+        paginator = KeysetPaginator(queryset, 1)
+        assert sum(get_all_pages(paginator), []) == list(queryset.order_by("-rank", "pk"))
+
+    def test_get_list_page_size(self, settings):
+        settings.JOBBY_LIST_PAGE_SIZE = 10
+        assert get_list_page_size() == 10
@@ -3,7 +3,7 @@ import re
 
 import pytest
 from django.urls import reverse
-from jobby.views import DETAILS_BESCHREIBUNG_ID
+from jobby.apis.bundesagentur_api import DETAILS_BESCHREIBUNG_ID
 
 # https://github.com/microsoft/playwright-python/issues/439
 # https://github.com/microsoft/playwright-pytest/issues/29#issuecomment-731515676
@@ -35,9 +35,16 @@ def get_url(live_server):
 
 @pytest.fixture
 def jobdetails_url():
+    """Return the URL of the job details page."""
     return "https://www.arbeitsagentur.de/jobsuche/jobdetail/"
 
 
+@pytest.fixture
+def jobdetails_api_url():
+    """Return the URL of the job details endpoint of the API."""
+    return "https://rest.arbeitsagentur.de/jobboerse/jobsuche-service/pc/v2/jobdetails/"
+
+
 @pytest.fixture
 def job_description_text():
     return "Job Description"
@@ -49,7 +56,29 @@ def job_description_html(job_description_text):
 
 
 @pytest.fixture(autouse=True)
-def get_jobdetails_request_mock(requests_mock, jobdetails_url, job_description_html):
+def get_jwt_request_mock(requests_mock):
+    """Provide a mock response for a request to fetch an access token."""
+    requests_mock.post("https://rest.arbeitsagentur.de/oauth/gettoken_cc", json={"access_token": "foo"})
+
+
+@pytest.fixture
+def jobdetails_api_status_code():
+    """Return the status code of the responses of the job details endpoint."""
+    return 200
+
+
+@pytest.fixture(autouse=True)
+def get_jobdetails_request_mock(requests_mock, jobdetails_api_url, jobdetails_api_status_code, job_description_text):
+    """Provide a mock response for a request to the job details endpoint."""
+    requests_mock.get(
+        re.compile(jobdetails_api_url),
+        status_code=jobdetails_api_status_code,
+        json={"stellenbeschreibung": job_description_text},
+    )
+
+
+@pytest.fixture(autouse=True)
+def get_jobdetails_page_request_mock(requests_mock, jobdetails_url, job_description_html):
     """Provide a mock response for a request to fetch the details page of a job."""
     requests_mock.get(
         re.compile(jobdetails_url),
@@ -6,6 +6,7 @@ import pytest
 from django.utils.formats import localize
 from django.utils.http import urlencode
 from django.utils.timezone import make_aware
+from jobby.apis.bundesagentur_api import BundesagenturAPI
 from jobby.models import Stellenangebot
 from playwright.sync_api import expect
 
@@ -231,6 +232,12 @@ def test_detail_page_add_data(detail_page, add, add_data):
     expect(detail_page.get_by_title("Eintrittsdatum")).to_contain_text(localized_date)
 
 
+@pytest.fixture
+def beschreibung_url(get_url, add_data):
+    """Return the URL of the view that fetches the job description."""
+    return get_url("get_angebot_beschreibung", kwargs={"refnr": add_data["refnr"]}) + "?api="
+
+
 @pytest.mark.parametrize("add", [True])
 def test_add_gets_jobdetails(
     detail_page,
@@ -239,26 +246,49 @@ def test_add_gets_jobdetails(
     requests_mock,
     jobdetails_url,
     job_description_text,
-    get_url,
+    beschreibung_url,
     wait_for_url,
 ):
     """
     Assert that the Stellenangebot add page automatically fetches the job
-    description from the job's original detail page.
+    description from the job details endpoint of the API.
     """
-    wait_for_url(get_url("get_angebot_beschreibung", kwargs={"refnr": add_data["refnr"]}))
-    assert requests_mock.request_history[0].url == jobdetails_url + add_data["refnr"]
+    wait_for_url(beschreibung_url)
+    requested_urls = [r.url for r in requests_mock.request_history]
+    assert BundesagenturAPI.get_jobdetails_url(add_data["refnr"]) in requested_urls
+    assert not any(url.startswith(jobdetails_url) for url in requested_urls)
     expect(detail_page.get_by_test_id("job-description")).to_contain_text(job_description_text)
 
 
 @pytest.mark.parametrize("add", [True])
-def test_add_saves_job_description(
+@pytest.mark.parametrize("jobdetails_api_status_code", [404])
+def test_add_gets_jobdetails_from_details_page(
     detail_page,
     add,
     add_data,
+    jobdetails_api_status_code,
+    requests_mock,
     jobdetails_url,
+    job_description_text,
+    beschreibung_url,
+    wait_for_url,
+):
+    """
+    Assert that the Stellenangebot add page fetches the job description from
+    the job's original details page if the job details endpoint fails.
+    """
+    wait_for_url(beschreibung_url)
+    assert jobdetails_url + add_data["refnr"] in [r.url for r in requests_mock.request_history]
+    expect(detail_page.get_by_test_id("job-description")).to_contain_text(job_description_text)
+
+
+@pytest.mark.parametrize("add", [True])
+def test_add_saves_job_description(
+    detail_page,
+    add,
+    add_data,
     job_description_html,
-    get_url,
+    beschreibung_url,
     wait_for_url,
     save_button,
 ):
@@ -266,7 +296,7 @@ def test_add_saves_job_description(
     Assert that saving from the details page adds the fetched job description
     to the Stellenangebot instance.
     """
-    wait_for_url(get_url("get_angebot_beschreibung", kwargs={"refnr": add_data["refnr"]}))
+    wait_for_url(beschreibung_url)
     with detail_page.expect_request_finished():
         save_button.click()
     saved = Stellenangebot.objects.get(refnr=add_data["refnr"])
@@ -317,12 +347,3 @@ def test_expired_save_buttons_disabled(
     expect(save_button).to_have_class(re.compile("disabled"))
     expect(save_button_suche).to_have_class(re.compile("disabled"))
     expect(save_button_merkliste).to_have_class(re.compile("disabled"))
-
-
-@pytest.mark.parametrize("add", [False])
-def test_checks_if_expired(detail_page, add, wait_for_url, jobdetails_url, requests_mock, refnr):
-    """Assert that the details page checks if the Stellenangebot has expired."""
-    # TODO: the registry/API should generate this URL:
-    url = f"{jobdetails_url}{refnr}"
-    wait_for_url(url)
-    assert requests_mock.request_history[0].url == url
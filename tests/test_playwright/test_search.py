@@ -3,6 +3,7 @@ import re
 from pathlib import Path
 
 import pytest
+from jobby.views import PAGE_SIZE
 from playwright.sync_api import expect
 
 from tests.factories import StellenangebotFactory, WatchlistItemFactory
@@ -39,6 +40,12 @@ def search_results_parsed(load_search_results):
     return json.loads(load_search_results[0]), json.loads(load_search_results[1])
 
 
+@pytest.fixture(scope="session")
+def all_search_results(search_results_parsed):
+    """Return the Stellenangebot results of both search result pages, in order."""
+    return search_results_parsed[0]["stellenangebote"] + search_results_parsed[1]["stellenangebote"]
+
+
 @pytest.fixture
 def get_search_results(search_results_parsed):
     """
@@ -71,17 +78,23 @@ def search_response_status_code():
 
 
 @pytest.fixture(autouse=True)
-def search_request_mock(requests_mock, load_search_results, search_response_status_code):
+def search_request_mock(requests_mock, search_results_parsed, all_search_results, search_response_status_code):
     """Provide mock responses for search requests against the API."""
 
-    def text_callback(request, _context):
-        # Return the results of the requested page:
-        page_number = int(request.qs["page"][0]) - 1  # qs["page"] is a list with a single value
-        return load_search_results[page_number]
+    def json_callback(request, _context):
+        # Return the results of the requested page for the requested page
+        # size (qs values are lists with a single value):
+        page_number, size = int(request.qs["page"][0]), int(request.qs["size"][0])
+        return {
+            **search_results_parsed[0],
+            "page": page_number,
+            "size": size,
+            "stellenangebote": all_search_results[(page_number - 1) * size : page_number * size],
+        }
 
     requests_mock.get(
         "https://rest.arbeitsagentur.de/jobboerse/jobsuche-service/pc/v4/app/jobs",
-        text=text_callback,
+        json=json_callback,
         status_code=search_response_status_code,
     )
 
@@ -140,14 +153,17 @@ def test_search_pagination(page, do_search, get_search_results):
     expect(page_links).to_have_count(10)
 
 
-def test_search_page_2(page, do_search, get_search_results):
+def test_search_page_2(page, do_search, all_search_results):
     """Assert that the user can navigate to the second page of results."""
     page_links = get_page_links(page)
     with page.expect_request_finished():
         page_links.nth(1).click()
-    search_results = get_search_results(page_number=2)
+    # The second page starts with the result after the last result of the
+    # first page, whatever the page size of the API requests:
     result_items = get_result_items(page)
-    expect(get_result_link(result_items.first)).to_have_text(search_results[0]["titel"])
+    expect(result_items).to_have_count(PAGE_SIZE)
+    expect(get_result_link(result_items.first)).to_have_text(all_search_results[PAGE_SIZE]["titel"])
+    expect(get_result_link(result_items.last)).to_have_text(all_search_results[2 * PAGE_SIZE - 1]["titel"])
 
 
 def test_search_angebot_details(page, do_search, get_search_results):
@@ -1,3 +1,4 @@
+from unittest import mock
 from urllib.parse import parse_qs, urlparse
 
 # noinspection PyPackageRequirements
@@ -5,7 +6,7 @@ import pytest
 from django.http import HttpResponse, QueryDict
 from django.urls import path, reverse
 from django.utils.http import urlencode
-from jobby.templatetags.jobby import add_search_filters, paginator_url
+from jobby.templatetags.jobby import PreparedSearchFilters, add_search_filters, paginator_url
 from jobby.views import PAGE_VAR
 
 
@@ -53,3 +54,39 @@ def test_add_search_params_url_for_search_page(add_search_params_context):
     params = get_query_params(url)
     assert params["was"] == "Foo"
     assert params["wo"] == "Bar"
+
+
+@pytest.mark.urls(__name__)
+def test_add_search_params_keeps_url_query_string(add_search_params_context):
+    """Assert that the query string parameters of the url are kept."""
+    url = add_search_filters(add_search_params_context, reverse("not_suche") + "?titel=Foo+Bar")
+    params = get_query_params(url)
+    assert params["_search_filters"] == "was=Foo&wo=Bar"
+    assert params["titel"] == "Foo Bar"
+
+
+def test_add_search_params_no_filters():
+    """Assert that the url is returned unchanged if there are no filters."""
+    assert add_search_filters({"preserved_search_filters": ""}, "/not_suche/?foo=bar") == "/not_suche/?foo=bar"
+
+
+@pytest.mark.urls(__name__)
+def test_add_search_params_uses_prepared_filters(add_search_params_context):
+    """
+    Assert that add_search_filters uses the prepared search filters of the
+    context, if there are any.
+    """
+    context = {"prepared_search_filters": PreparedSearchFilters(add_search_params_context["preserved_search_filters"])}
+    url = add_search_filters(context, reverse("not_suche"))
+    assert get_query_params(url)["_search_filters"] == "was=Foo&wo=Bar"
+
+
+@pytest.mark.urls(__name__)
+def test_prepared_search_filters_resolves_once(add_search_params_context):
+    """Assert that the search page URL is only looked up once."""
+    prepared = PreparedSearchFilters(add_search_params_context["preserved_search_filters"])
+    with mock.patch("jobby.templatetags.jobby.reverse") as reverse_mock:
+        for _ in range(3):
+            prepared.add_to(reverse("not_suche"))
+            prepared.add_to(reverse("suche"))
+    reverse_mock.assert_not_called()
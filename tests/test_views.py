@@ -1,18 +1,21 @@
 import json
 from unittest.mock import Mock, patch
+from urllib.parse import urlparse
 
 # noinspection PyPackageRequirements
 import pytest
-import requests
 from django.contrib import messages
 from django.core.exceptions import BadRequest
 from django.core.paginator import Paginator
 from django.db.models import QuerySet
-from django.http import HttpResponse, HttpResponseRedirect
+from django.http import HttpResponse, HttpResponseRedirect, QueryDict
 from django.urls import path, reverse
-from jobby.models import Stellenangebot, Watchlist
+from jobby import expiry
+from jobby.apis.cache import cache_hits, get_cached_hit, get_hits_cache
+from jobby.models import SearchHit, Stellenangebot, Watchlist
 from jobby.views import (
-    DETAILS_BESCHREIBUNG_ID,
+    HITS_EXPIRED_MESSAGE,
+    PAGE_SIZE,
     PAGE_VAR,
     BaseMixin,
     PapierkorbView,
@@ -60,6 +63,8 @@ def search_response_mock(search_results):
     return Mock(
         results=search_results,
         result_count=len(search_results),
+        timed_out=[],
+        failed=[],
     )
 
 
@@ -178,9 +183,33 @@ class TestSucheView:
                 view.form_valid(form_mock)
 
         render_mock.assert_called()
+        search_mock.assert_called_with(page_size=PAGE_SIZE, **form_mock.cleaned_data)
         results_context_mock.assert_called_with(search_response_mock)
         pagination_context_mock.assert_called_with(len(search_results))
 
+    @pytest.mark.parametrize(
+        "cleaned_data, result_count, expected_page",
+        [
+            ({"was": "foo"}, 101, 2),
+            ({"was": "foo", "page": 2, "size": 50}, 201, 3),
+            ({"was": "foo", "page": 2, "size": 50}, 101, None),
+            ({"was": "foo"}, 100, None),
+        ],
+    )
+    def test_prefetch_next_page(self, view, registry_mock, form_mock, cleaned_data, result_count, expected_page):
+        """Assert that ``_prefetch_next_page`` prefetches the next page, if any."""
+        view._prefetch_next_page(form_mock, result_count)
+        if expected_page:
+            registry_mock.prefetch.assert_called_with(page_size=PAGE_SIZE, **{**cleaned_data, "page": expected_page})
+        else:
+            registry_mock.prefetch.assert_not_called()
+
+    def test_form_valid_prefetches_next_page(self, view, search_mock, form_mock):
+        """Assert that ``form_valid`` prefetches the next page of the results."""
+        with patch.object(view, "_prefetch_next_page") as prefetch_mock:
+            view.form_valid(form_mock)
+        prefetch_mock.assert_called_with(form_mock, 2)
+
     @pytest.mark.parametrize("search_results", [[]])
     def test_form_valid_no_results(self, view, search_mock, form_mock, search_results):
         """
@@ -203,6 +232,26 @@ class TestSucheView:
             view.form_valid(form_mock)
             send_message_mock.assert_called()
 
+    @pytest.mark.parametrize(
+        "timed_out, failed, expected_messages",
+        [
+            ([], [], []),
+            (["foo"], [], ["Zeitüberschreitung bei der Suche: foo"]),
+            ([], ["foo", "bar"], ["Fehler bei der Suche: foo, bar"]),
+            (["foo"], ["bar"], ["Zeitüberschreitung bei der Suche: foo", "Fehler bei der Suche: bar"]),
+        ],
+    )
+    def test_send_unavailable_message(self, view, search_response_mock, timed_out, failed, expected_messages):
+        """
+        Assert that ``_send_unavailable_message`` tells the user about APIs
+        that timed out or failed.
+        """
+        search_response_mock.timed_out = timed_out
+        search_response_mock.failed = failed
+        with patch("jobby.views.messages") as messages_mock:
+            view._send_unavailable_message(search_response_mock)
+        assert [c.kwargs["message"] for c in messages_mock.add_message.call_args_list] == expected_messages
+
     def test_get_watchlisted_ids(self, view, watchlist_item, stellenangebot):
         """
         Assert that ``_get_watchlisted_ids`` returns the ids of the
@@ -239,6 +288,17 @@ class TestSucheView:
         assert ctx["results"] == [(stellenangebot, True), (new, False)]
         assert ctx["result_count"] == 2
 
+    def test_get_results_context_page_token(self, view, search_response_mock, stellenangebot):
+        """
+        Assert that ``get_results_context`` stores the data of all results
+        under the page token.
+        """
+        hit = SearchHit(refnr="123", titel="Neu")
+        search_response_mock.results = [stellenangebot, hit]
+        ctx = view.get_results_context(search_response_mock)
+        assert get_cached_hit(ctx["page_token"], "123") == {"titel": "Neu", "refnr": "123"}
+        assert get_cached_hit(ctx["page_token"], stellenangebot.refnr)["titel"] == stellenangebot.titel
+
     @pytest.mark.parametrize("request_data", [{PAGE_VAR: "2"}])
     def test_get_pagination_context(self, view, request_data):
         """Assert that ``get_pagination_context`` returns the expected data."""
@@ -284,6 +344,12 @@ class TestWatchlistView:
         response = client.get(reverse("watchlist"))
         assert response.status_code == 200
 
+    def test_get_schedules_expiry_check(self, client):
+        """Assert that the watchlist page starts the expiry checks."""
+        with patch("jobby.views.schedule_expiry_check") as schedule_mock:
+            client.get(reverse("watchlist"))
+        schedule_mock.assert_called()
+
     @pytest.mark.parametrize("request_data", [{"watchlist_name": "foo"}])
     def test_current_watchlist_name(self, view, get_request, request_data):
         """Assert that ``current_watchlist_name`` returns the expected data."""
@@ -302,18 +368,36 @@ class TestWatchlistView:
     @pytest.mark.parametrize("request_data", [{"q": "Foo"}])
     def test_get_queryset_search(self, view, watchlist_item, request_data):
         """
-        Assert that ``get_queryset`` calls the search method of the queryset if
-        the request contains a search term.
+        Assert that ``get_queryset`` calls the text search method of the
+        queryset if the request contains a search term.
         """
         search_mock = Mock()
         search_mock.name = "my search mock"
-        queryset_mock = Mock(search=search_mock)
+        queryset_mock = Mock(text_search=search_mock)
+        queryset_mock.only.return_value = queryset_mock
         queryset_mock.filter.return_value = queryset_mock
         with patch.object(view, "get_watchlist") as m:
             m.return_value.get_stellenangebote.return_value = queryset_mock
             view.get_queryset()
             search_mock.assert_called_with("Foo")
 
+    def test_get_queryset_only_rendered_columns(self, view, watchlist_item):
+        """Assert that ``get_queryset`` does not load the long text columns."""
+        obj = view.get_queryset().get()
+        assert {"beschreibung", "notizen"} <= obj.get_deferred_fields()
+
+    def test_paginated(self, client, watchlist, settings):
+        """Assert that the watchlist is paginated, with a link to the next page."""
+        settings.JOBBY_LIST_PAGE_SIZE = 2
+        for _ in range(3):
+            WatchlistItemFactory(watchlist=watchlist, stellenangebot=StellenangebotFactory())
+        response = client.get(reverse("watchlist"), data={"watchlist_name": watchlist.name})
+        assert len(response.context["stellenangebot_list"]) == 2
+        next_page = client.get(reverse("watchlist") + response.context["next_page_url"])
+        assert len(next_page.context["stellenangebot_list"]) == 1
+        assert "next_page_url" not in next_page.context
+        assert not next_page.context["keyset_page"].is_first
+
     def test_get_watchlist_names(self, view, watchlist, watchlist_name):
         """Assert that ``get_watchlist_names`` returns the expected list of names."""
         assert list(view.get_watchlist_names()) == [watchlist_name]
@@ -338,17 +422,14 @@ class TestWatchlistToggle:
         return "foo"
 
     @pytest.fixture
-    def includes_beschreibung(self):
-        """Return whether the POST data contains a 'beschreibung'."""
-        return True
+    def page_token(self, stellenangebot):
+        """Store the search hit data of the Stellenangebot and return the page token."""
+        return cache_hits([SearchHit(refnr=stellenangebot.refnr, titel=stellenangebot.titel)])
 
     @pytest.fixture
-    def request_data(self, stellenangebot, watchlist_name, includes_beschreibung, beschreibung):
+    def request_data(self, stellenangebot, watchlist_name, page_token):
         """Return the data for the request."""
-        data = {"titel": stellenangebot.titel, "refnr": stellenangebot.refnr, "watchlist_name": watchlist_name}
-        if includes_beschreibung:
-            data["beschreibung"] = beschreibung
-        return data
+        return {"refnr": stellenangebot.refnr, "watchlist_name": watchlist_name, "page_token": page_token}
 
     @pytest.fixture
     def get_beschreibung_mock(self, beschreibung):
@@ -386,6 +467,30 @@ class TestWatchlistToggle:
         assert not json.loads(response.content)["on_watchlist"]
         assert not watchlist.items.filter(stellenangebot=stellenangebot).exists()
 
+    @pytest.mark.parametrize("on_watchlist", [True, False])
+    def test_watchlist_toggle_query_count(
+        self, client, watchlist, stellenangebot, on_watchlist, django_assert_num_queries
+    ):
+        """
+        Assert that toggling a saved Stellenangebot takes a query each for the
+        watchlist, the Stellenangebot and the toggle itself.
+        """
+        if on_watchlist:
+            WatchlistItemFactory(watchlist=watchlist, stellenangebot=stellenangebot)
+        with django_assert_num_queries(3):
+            response = client.post(reverse("watchlist_toggle"), data={"refnr": stellenangebot.refnr})
+        assert json.loads(response.content)["on_watchlist"] != on_watchlist
+
+    def test_watchlist_toggle_removed_link_url(self, post_request, watchlist, watchlist_item, stellenangebot):
+        """
+        Assert that ``watchlist_toggle`` returns the URL of the add page if the
+        removed Stellenangebot was deleted.
+        """
+        response = watchlist_toggle(post_request)
+        link_url = json.loads(response.content)["link_url"]
+        assert link_url.startswith(reverse("stellenangebot_add") + "?")
+        assert QueryDict(urlparse(link_url).query)["refnr"] == stellenangebot.refnr
+
     @pytest.mark.parametrize("stellenangebot", [StellenangebotFactory.build()])
     def test_watchlist_toggle_new_angebot(self, post_request, watchlist, stellenangebot):
         """
@@ -399,44 +504,99 @@ class TestWatchlistToggle:
         saved_angebot = Stellenangebot.objects.get(refnr=stellenangebot.refnr)
         assert watchlist.items.filter(stellenangebot=saved_angebot).exists()
 
+    @pytest.fixture
+    def schedule_fill_mock(self):
+        with patch("jobby.views.schedule_description_fill") as m:
+            yield m
+
     @pytest.mark.parametrize("stellenangebot", [StellenangebotFactory.build()])
-    @pytest.mark.parametrize("includes_beschreibung", [False])
     def test_watchlist_toggle_new_angebot_beschreibung(
         self,
         post_request,
         stellenangebot,
-        includes_beschreibung,
-        beschreibung,
         get_beschreibung_mock,
+        schedule_fill_mock,
     ):
         """
-        Assert that a 'beschreibung' is added to new Stellenangebot objects
-        when they are being added to the watchlist via the toggle.
+        Assert that the 'beschreibung' of new Stellenangebot objects is filled
+        in later, instead of being fetched during the toggle.
         """
         response = watchlist_toggle(post_request)
         assert response.status_code == 200
-        get_beschreibung_mock.assert_called_with(stellenangebot.refnr)
+        get_beschreibung_mock.assert_not_called()
         saved_angebot = Stellenangebot.objects.get(refnr=stellenangebot.refnr)
-        assert saved_angebot.beschreibung == beschreibung
+        assert not saved_angebot.beschreibung
+        schedule_fill_mock.assert_called_with(saved_angebot)
 
     @pytest.mark.parametrize("stellenangebot", [StellenangebotFactory.build()])
-    @pytest.mark.parametrize("includes_beschreibung", [False])
-    def test_watchlist_toggle_new_angebot_beschreibung_bad_request(
+    def test_watchlist_toggle_new_angebot_includes_beschreibung(
         self,
         post_request,
         stellenangebot,
-        includes_beschreibung,
-        get_beschreibung_mock,
+        beschreibung,
+        schedule_fill_mock,
     ):
         """
-        Assert that no 'beschreibung' is added to new Stellenangebot objects if
-        ``_get_beschreibung`` raises a BadRequest during the toggle process.
+        Assert that no fill-in is scheduled for new Stellenangebot objects if
+        the stored data includes a 'beschreibung'.
         """
-        get_beschreibung_mock.side_effect = BadRequest
-        response = watchlist_toggle(post_request)
-        assert response.status_code == 200
+        data = {"titel": stellenangebot.titel, "refnr": stellenangebot.refnr, "beschreibung": beschreibung}
+        with patch("jobby.views.get_cached_hit", return_value=data):
+            watchlist_toggle(post_request)
         saved_angebot = Stellenangebot.objects.get(refnr=stellenangebot.refnr)
-        assert not saved_angebot.beschreibung
+        assert saved_angebot.beschreibung == beschreibung
+        schedule_fill_mock.assert_not_called()
+
+    def test_watchlist_toggle_page_token(self, client, watchlist):
+        """
+        Assert that ``watchlist_toggle`` creates a new Stellenangebot from the
+        data stored under the page token.
+        """
+        page_token = cache_hits([SearchHit(refnr="123", titel="Neu", eintrittsdatum="2024-07-01")])
+        response = client.post(reverse("watchlist_toggle"), data={"refnr": "123", "page_token": page_token})
+        assert response.status_code == 200
+        obj = Stellenangebot.objects.get(refnr="123")
+        assert obj.titel == "Neu"
+        assert watchlist.on_watchlist(obj)
+
+    def test_watchlist_toggle_page_token_deleted_angebot(self, client, watchlist, watchlist_item, stellenangebot):
+        """
+        Assert that a saved result can be added to the watchlist again after
+        it was deleted by removing it from the watchlist.
+        """
+        page_token = cache_hits([stellenangebot])
+        data = {"refnr": stellenangebot.refnr, "page_token": page_token}
+        response = client.post(reverse("watchlist_toggle"), data=data)
+        assert response.status_code == 200
+        assert not Stellenangebot.objects.filter(refnr=stellenangebot.refnr).exists()
+        response = client.post(reverse("watchlist_toggle"), data=data)
+        assert response.status_code == 200
+        assert json.loads(response.content)["on_watchlist"]
+        assert Stellenangebot.objects.get(refnr=stellenangebot.refnr).titel == stellenangebot.titel
+
+    def test_watchlist_toggle_page_token_expired(self, client):
+        """
+        Assert that ``watchlist_toggle`` returns a response with status code
+        400 and an error message if there is no data for a new Stellenangebot.
+        """
+        response = client.post(reverse("watchlist_toggle"), data={"refnr": "123", "page_token": "foo"})
+        assert response.status_code == 400
+        assert json.loads(response.content) == {"error": HITS_EXPIRED_MESSAGE}
+        assert not Stellenangebot.objects.filter(refnr="123").exists()
+
+    def test_watchlist_toggle_page_token_evicted(self, client, watchlist):
+        """
+        Assert that a search hit cannot be added to the watchlist after its
+        data was removed from the cache, even if the request includes the
+        data of the Stellenangebot.
+        """
+        page_token = cache_hits([SearchHit(refnr="123", titel="Neu")])
+        get_hits_cache().clear()
+        data = {"refnr": "123", "page_token": page_token, "titel": "Neu"}
+        response = client.post(reverse("watchlist_toggle"), data=data)
+        assert response.status_code == 400
+        assert json.loads(response.content) == {"error": HITS_EXPIRED_MESSAGE}
+        assert not Stellenangebot.objects.filter(refnr="123").exists()
 
     @pytest.mark.parametrize("request_data", [{}])
     def test_watchlist_toggle_no_refnr(self, post_request, request_data):
@@ -490,13 +650,6 @@ class TestStellenangebotView:
         super_mock.return_value.get = Mock(side_effect=get)
         return response_mock
 
-    @pytest.fixture
-    def is_expired_mock(self):
-        """Mock out the view's is_expired method."""
-        with patch("jobby.views.StellenangebotView.is_expired") as m:
-            m.return_value = False
-            yield m
-
     @pytest.fixture
     def messages_mock(self):
         """Mock out the django messages package."""
@@ -526,7 +679,7 @@ class TestStellenangebotView:
         response = client.get(reverse("stellenangebot_edit", kwargs={"id": stellenangebot.pk}))
         assert response.status_code == 200
 
-    def test_edit_save(self, client, stellenangebot, formset_mock, is_expired_mock):
+    def test_edit_save(self, client, stellenangebot, formset_mock):
         stellenangebot.notizen = "foo"
         stellenangebot.save()
         request_data = {
@@ -550,7 +703,7 @@ class TestStellenangebotView:
         assert view.get_object() is None
 
     @pytest.mark.parametrize("view_extra_context", [{"add": False}])
-    def test_get_object_edit(self, view, view_extra_context, super_mock, is_expired_mock):
+    def test_get_object_edit(self, view, view_extra_context, super_mock):
         """
         Assert that ``get_object`` calls the super method if this is an 'edit'
         view.
@@ -694,48 +847,34 @@ class TestStellenangebotView:
 
     @pytest.mark.parametrize("view_extra_context", [{"add": False}])
     def test_check_if_expired(
-        self,
-        view,
-        view_extra_context,
-        get_request,
-        stellenangebot,
-        is_expired_mock,
-        messages_mock,
+        self, view, view_extra_context, get_request, stellenangebot, messages_mock, requests_mock
     ):
         """
-        Assert that ``check_if_expired`` calls the is_expired method and
-        updates the view's Stellenangebot if it has expired.
+        Assert that ``check_if_expired`` only schedules a background check
+        and does not make any requests itself.
         """
         view.object = stellenangebot
         view.add = False
-        is_expired_mock.return_value = True
-        view.check_if_expired(get_request)
-        is_expired_mock.assert_called()
-        stellenangebot.refresh_from_db()
-        assert stellenangebot.expired
-
-    @pytest.mark.parametrize("view_extra_context", [{"add": False}])
-    def test_is_expired(self, view, view_extra_context, requests_mock):
-        """
-        Assert that ``is_expired`` returns whether the response for the
-        external job details page was ok.
-        """
-        details_url = "http://foo.bar"
-        with patch.object(view, "get_details_url") as get_details_url_mock:
-            get_details_url_mock.return_value = details_url
-            requests_mock.get(details_url, status_code=404)
-            assert view.is_expired()
+        with patch("jobby.views.schedule_expiry_check") as schedule_mock:
+            assert not view.check_if_expired(get_request)
+        schedule_mock.assert_called_once_with()
+        assert not requests_mock.called
 
     @pytest.mark.parametrize("view_extra_context", [{"add": False}])
-    def test_is_expired_exception(self, view, view_extra_context):
+    def test_check_if_expired_submits_check_to_background(
+        self, view, view_extra_context, get_request, stellenangebot, messages_mock, requests_mock, settings
+    ):
         """
-        Assert that ``is_expired`` catches exceptions raised by requests and
-        returns False instead.
+        Assert that ``check_if_expired`` submits the expiry check to the
+        background instead of running it during the request.
         """
-        with patch.object(view, "get_details_url"):
-            with patch("jobby.views.requests") as requests_mock:
-                requests_mock.get = Mock(side_effect=Exception)
-                assert not view.is_expired()
+        settings.JOBBY_EXPIRY_CHECK_INTERVAL = 60
+        view.object = stellenangebot
+        view.add = False
+        with patch("jobby.expiry.background.submit") as submit_mock:
+            view.check_if_expired(get_request)
+        submit_mock.assert_called_once_with(expiry.check_expired, interval=60)
+        assert not requests_mock.called
 
     @pytest.mark.parametrize("view_extra_context", [{"add": False}])
     @pytest.mark.parametrize("stellenangebot_extra_data", [{"expired": True}, {"expired": False}])
@@ -747,7 +886,6 @@ class TestStellenangebotView:
         stellenangebot,
         stellenangebot_extra_data,
         messages_mock,
-        is_expired_mock,
     ):
         """Assert that ``check_if_expired`` emits a user message if the view
         object has expired.
@@ -900,87 +1038,55 @@ class TestWatchlistRemoveAll:
 class TestGetBeschreibung:
 
     @pytest.fixture
-    def details_url(self, refnr):
-        return f"https://www.arbeitsagentur.de/jobsuche/jobdetail/{refnr}"
-
-    @pytest.fixture
-    def beschreibung_html(self):
-        return """<p>A paragraph</p><ul><li>Some list item</li><li>Another list item</li></ul>"""
-
-    @pytest.fixture
-    def beschreibung_id(self):
-        return DETAILS_BESCHREIBUNG_ID
-
-    @pytest.fixture
-    def details_html(self, beschreibung_html, beschreibung_id):
-        return f"""<div>This is not the beschreibung</div><p id="{beschreibung_id}">{beschreibung_html}</p>"""
-
-    @pytest.fixture
-    def status_code(self):
-        """Return the status code of the job details response."""
-        return requests.codes["ok"]
-
-    @pytest.fixture
-    def jobdetails_request_mock(self, requests_mock, details_url, details_html, status_code):
-        requests_mock.get(details_url, text=details_html, status_code=status_code)
+    def request_data(self):
+        return {"api": "bundesagentur"}
 
     @pytest.fixture
-    def get_request(self, jobdetails_request_mock, get_request):
-        """Create a mocked response for the job details request call."""
-        return get_request
+    def get_description_mock(self, registry_mock):
+        registry_mock.get_description.return_value = "<p>Beschreibung</p>"
+        return registry_mock.get_description
 
     @pytest.fixture
-    def get_beschreibung_response(self, get_request, refnr):
+    def get_beschreibung_response(self, get_request, refnr, get_description_mock):
         """Call ``get_beschreibung`` and return the response."""
         return get_beschreibung(get_request, refnr=refnr)
 
-    def test(self, jobdetails_request_mock, client, refnr, beschreibung_html):
-        response = client.post(reverse("get_angebot_beschreibung", kwargs={"refnr": refnr}))
+    def test(self, get_description_mock, client, refnr):
+        url = reverse("get_angebot_beschreibung", kwargs={"refnr": refnr})
+        response = client.get(url, data={"api": "bundesagentur"})
         assert response.status_code == 200
-        assert response.content.decode("utf-8") == beschreibung_html
+        assert response.content.decode("utf-8") == "<p>Beschreibung</p>"
 
-    def test_get_beschreibung(self, get_beschreibung_response, beschreibung_html):
-        """Assert that ``get_beschreibung`` returns the expected HTML."""
-        assert get_beschreibung_response.content.decode("utf-8") == beschreibung_html
-
-    def test_get_beschreibung_url(self, get_beschreibung_response, details_url, requests_mock):
-        """Assert that ``get_beschreibung`` made a request against the expected URL."""
-        assert requests_mock.request_history[0].url == details_url
-
-    @pytest.mark.parametrize("status_code", [123])
-    def test_get_beschreibung_bad_response(self, get_beschreibung_response, status_code):
+    def test_get_beschreibung(self, get_beschreibung_response, get_description_mock, refnr):
         """
-        Assert that ``get_beschreibung`` returns a response with status code
-        400 if the fetch request was not ok.
+        Assert that ``get_beschreibung`` returns the description provided by
+        the API given in the request.
         """
-        assert get_beschreibung_response.status_code == 400
+        assert get_beschreibung_response.content.decode("utf-8") == "<p>Beschreibung</p>"
+        get_description_mock.assert_called_with("bundesagentur", refnr)
 
-    @pytest.mark.parametrize("beschreibung_id", ["foo"])
-    def test_get_beschreibung_no_beschreibung(self, get_beschreibung_response, beschreibung_id):
+    @pytest.mark.parametrize("request_data", [{}])
+    def test_get_beschreibung_no_api(self, get_beschreibung_response, get_description_mock, refnr, request_data):
+        """Assert that ``get_beschreibung`` asks the registry if no API is given."""
+        get_description_mock.assert_called_with("", refnr)
+
+    @pytest.mark.parametrize("stellenangebot_extra_data", [{"beschreibung": "Gespeichert"}])
+    def test_get_beschreibung_saved(self, get_request, stellenangebot, refnr, get_description_mock):
         """
-        Assert that ``get_beschreibung`` returns a response with a short message
-        if the job details page does not contain an element with the
-        'beschreibung id'.
+        Assert that ``get_beschreibung`` returns the saved description of a
+        Stellenangebot without asking the API.
         """
-        assert get_beschreibung_response.content.decode("utf-8") == "Keine Beschreibung gegeben!"
+        response = get_beschreibung(get_request, refnr=refnr)
+        assert response.content.decode("utf-8") == "Gespeichert"
+        get_description_mock.assert_not_called()
 
-    @pytest.mark.parametrize(
-        "details_html,beschreibung_html",
-        [
-            (
-                """<div id="detail-beschreibung-extern">
-                        <a id="detail-beschreibung-externe-url-btn" href="www.foobar.com">www.foobar.com</a>
-                        </div>""",
-                """Beschreibung auf externer Seite: <a href="www.foobar.com">www.foobar.com</a>""",
-            )
-        ],
-    )
-    def test_get_beschreibung_externe_url(self, get_beschreibung_response, details_html, beschreibung_html):
+    def test_get_beschreibung_bad_request(self, get_request, refnr, get_description_mock):
         """
-        Assert that ``get_beschreibung`` also checks links to external
-        descriptions.
+        Assert that ``get_beschreibung`` returns a response with status code
+        400 if the description could not be fetched.
         """
-        assert get_beschreibung_response.content.decode("utf-8") == beschreibung_html
+        get_description_mock.side_effect = BadRequest
+        assert get_beschreibung(get_request, refnr=refnr).status_code == 400
 
 
 class TestPapierkorbView:
@@ -1007,6 +1113,11 @@ class TestPapierkorbView:
         assert stellenangebot in queryset
         assert other_watchlist_item.stellenangebot not in queryset
 
+    def test_get_queryset_only_rendered_columns(self, view, stellenangebot):
+        """Assert that ``get_queryset`` does not load the long text columns."""
+        obj = view.get_queryset().get()
+        assert {"beschreibung", "notizen"} <= obj.get_deferred_fields()
+
 
 class TestBaseMixin:
 